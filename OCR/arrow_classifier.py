@@ -0,0 +1,247 @@
+"""
+Direction classifiers for the hint arrows of the widget.
+
+A classifier takes all the arrows of a frame as one batch and returns a
+(direction, confidence) pair per arrow, confidence being between 0 and 1:
+
+    MassClassifier  the half-mass heuristic, vectorized over the batch
+    CnnClassifier   arrow_ocr_model/arrow_direction_cnn.h5, loaded once on
+                    first use (needs tensorflow)
+    CascadeClassifier
+                    the heuristic, with only its low-confidence arrows
+                    classified again by the CNN when it is available
+
+The classifier used by detect_arrows is chosen with ARROW_CLASSIFIER in .env:
+mass (the default), cascade or cnn (every arrow through the CNN). Without
+the model, cascade and cnn keep the heuristic results. The CNN is not
+checked against recorded frames yet: compare ARROW_CLASSIFIER=cnn with mass
+on a corpus (python -m OCR.replay) before switching.
+"""
+
+import os
+import logging
+import threading
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+ARROW_CLASSIFIER = os.getenv("ARROW_CLASSIFIER", "mass")
+CNN_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "arrow_ocr_model",
+    "arrow_direction_cnn.h5",
+)
+# Input size and output classes of the CNN, see arrow_ocr_model/train_model.py
+CNN_INPUT_SIZE = (64, 64)
+# flow_from_directory sorts the class folders: East, North, South, West
+CNN_DIRECTIONS = (0, 6, 2, 4)
+# Heuristic confidence under which the cascade asks the CNN. The captured
+# arrows debug_template_0..5.png, rescaled to 12-51 px tall, are all read
+# right above 0.01 (71% of them); the wrong reads score 0, halves of equal mass
+MIN_ARROW_CONFIDENCE = 0.01
+
+
+class ArrowBatch:
+    """
+    The arrows of a frame: binary masks (arrow pixels 255) and RGB crops.
+    """
+
+    def __init__(self, masks, crops):
+        self.masks = masks
+        self.crops = crops
+
+    def __len__(self):
+        return len(self.masks)
+
+    def subset(self, indexes):
+        return ArrowBatch(
+            [self.masks[i] for i in indexes], [self.crops[i] for i in indexes]
+        )
+
+
+class ArrowClassifier:
+    """
+    Classify a batch of arrows.
+    """
+
+    name = None
+
+    def classify(self, batch):
+        """
+        Returns:
+            list: (direction, confidence) per arrow of the batch
+        """
+        raise NotImplementedError
+
+    def warm_up(self):
+        pass
+
+
+class MassClassifier(ArrowClassifier):
+    """
+    Wider than tall arrows point East or West, the others North or South;
+    the arrow head is the heavier half.
+
+    The confidence is the mass imbalance between both halves along the
+    chosen axis, minus the imbalance along the other one (the middle row or
+    column of odd sizes is left out), so a blob or an arrow read along the
+    wrong axis gets a confidence near 0.
+    """
+
+    name = "mass"
+
+    def classify(self, batch):
+        if not len(batch):
+            return []
+        heights = np.array([mask.shape[0] for mask in batch.masks])
+        widths = np.array([mask.shape[1] for mask in batch.masks])
+
+        # Zero-padded stack, so the halves of every mask are summed at once
+        stack = np.zeros((len(batch), heights.max(), widths.max()), dtype=np.float32)
+        for i, mask in enumerate(batch.masks):
+            stack[i, : mask.shape[0], : mask.shape[1]] = mask
+        total = np.maximum(stack.sum(axis=(1, 2)), 1)
+        columns = np.arange(stack.shape[2])[None, :]
+        rows = np.arange(stack.shape[1])[None, :]
+
+        def columns_mass(selected):
+            return np.einsum("nhw,nw->n", stack, selected.astype(np.float32))
+
+        def rows_mass(selected):
+            return np.einsum("nhw,nh->n", stack, selected.astype(np.float32))
+
+        left = columns_mass(columns < (widths // 2)[:, None])
+        top = rows_mass(rows < (heights // 2)[:, None])
+        horizontal = widths > heights
+        first = np.where(horizontal, left, top)
+        directions = np.where(
+            horizontal,
+            np.where(first > total - first, 4, 0),
+            np.where(first > total - first, 6, 2),
+        )
+
+        right = columns_mass(columns >= ((widths + 1) // 2)[:, None])
+        bottom = rows_mass(rows >= ((heights + 1) // 2)[:, None])
+        horizontal_balance = (left - right) / total
+        vertical_balance = (top - bottom) / total
+        # Imbalance towards the head found, and along the other axis
+        head = np.where(horizontal, horizontal_balance, vertical_balance)
+        head *= np.where(np.isin(directions, (4, 6)), 1, -1)
+        other = np.abs(np.where(horizontal, vertical_balance, horizontal_balance))
+        confidences = np.clip(head - other, 0, 1)
+        return [
+            (int(direction), float(confidence))
+            for direction, confidence in zip(directions, confidences)
+        ]
+
+
+class CnnClassifier(ArrowClassifier):
+    """
+    The trained arrow CNN, run on the RGB crops of the whole batch at once.
+
+    The model is loaded on the first call; when tensorflow or the model file
+    is missing, classify() returns nothing.
+    """
+
+    name = "cnn"
+
+    def __init__(self, path=CNN_MODEL_PATH):
+        self.path = path
+        self.model = None
+        self.load_error = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.model is None and self.load_error is None:
+                try:
+                    if not os.path.exists(self.path):
+                        raise FileNotFoundError(self.path)
+                    from tensorflow.keras.models import load_model
+
+                    self.model = load_model(self.path)
+                    log.info("Arrow CNN loaded from %s", self.path)
+                except Exception as e:
+                    self.load_error = e
+                    log.warning("Arrow CNN unavailable: %s", e)
+            return self.model
+
+    def warm_up(self):
+        self._load()
+
+    def classify(self, batch):
+        model = self._load()
+        if model is None or not len(batch):
+            return []
+        # Same input as the training: RGB, 64x64 (nearest), scaled to [0, 1]
+        inputs = np.stack(
+            [
+                cv2.resize(crop, CNN_INPUT_SIZE, interpolation=cv2.INTER_NEAREST)
+                for crop in batch.crops
+            ]
+        ).astype(np.float32)
+        inputs /= 255.0
+        probabilities = np.asarray(model(inputs, training=False))
+        best = probabilities.argmax(axis=1)
+        return [
+            (CNN_DIRECTIONS[index], float(probabilities[i, index]))
+            for i, index in enumerate(best)
+        ]
+
+
+class CascadeClassifier(ArrowClassifier):
+    """
+    The heuristic first, the CNN only for the arrows it is unsure about.
+    """
+
+    name = "cascade"
+
+    def __init__(self, first=None, second=None, min_confidence=MIN_ARROW_CONFIDENCE):
+        self.first = first or MassClassifier()
+        self.second = second or CnnClassifier()
+        self.min_confidence = min_confidence
+
+    def warm_up(self):
+        self.second.warm_up()
+
+    def classify(self, batch):
+        results = self.first.classify(batch)
+        unsure = [
+            i
+            for i, (_, confidence) in enumerate(results)
+            if confidence < self.min_confidence
+        ]
+        if unsure:
+            second = self.second.classify(batch.subset(unsure))
+            for i, (direction, confidence) in zip(unsure, second):
+                log.debug(
+                    "Arrow %d: %s %.2f -> %s %.2f (%s)",
+                    i,
+                    results[i][0],
+                    results[i][1],
+                    direction,
+                    confidence,
+                    self.second.name,
+                )
+                results[i] = (direction, confidence)
+        return results
+
+
+def create_classifier(name=ARROW_CLASSIFIER):
+    """
+    Create the classifier named in .env.
+    """
+    if name == "mass":
+        return MassClassifier()
+    if name == "cascade":
+        return CascadeClassifier()
+    if name == "cnn":
+        # Every arrow goes through the CNN, the heuristic is only kept for
+        # when the model cannot be loaded
+        return CascadeClassifier(min_confidence=float("inf"))
+    raise ValueError(f"Unknown arrow classifier: {name}")
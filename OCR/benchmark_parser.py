@@ -0,0 +1,379 @@
+"""
+Benchmark parse_ocr_output against the former regex-by-regex parser.
+
+Both parsers read the frames of OCR/parser_corpus.json (OCR'd widget lines)
+and random variants of them (merged lines, OCR noise), and must return the
+same dict for every frame. The per-frame parse cost of both is printed:
+
+    python -m OCR.benchmark_parser
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+from contextlib import redirect_stdout
+
+from OCR.screenshot import (
+    parse_ocr_output,
+    sanitize_hint_text,
+    steps_pattern,
+    startPos_pattern,
+    tries_pattern,
+    unwanted_pattern,
+)
+
+CORPUS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "parser_corpus.json"
+)
+VARIANTS_PER_FRAME = 50
+REPEAT = 20
+# Fragments mixed into the variants, as OCR tends to produce them
+NOISE = [
+    "EN COURS",
+    "ENCOURS",
+    "VALIDÉ",
+    "in",
+    "9",
+    "&",
+    "»",
+    "™",
+    "(",
+    ")",
+    "B",
+    "Q",
+    "Dofus",
+    "[1,2]",
+    "ÉTAPE : 1/4",
+    "2 essais restants",
+    "Départ [-3,4]",
+]
+
+
+def legacy_split_merged_lines(line):
+    """
+    Split a merged line into separate logical segments.
+    Returns a list of lines.
+    """
+    # First, clean up any special characters or OCR artifacts
+    line = re.sub(r"[€™Ÿÿ<>]", "", line)
+
+    # Split at any occurrence of "essais restants" with optional prefix
+    line = re.sub(
+        r"\s*(?:in\s+)?(?:\d+\s+)?essais?\s+restants?.*$",
+        "\n",
+        line,
+        flags=re.IGNORECASE,
+    )
+
+    # Known breaking points that should be on separate lines
+    break_points = [
+        (r"(ÉTAPE\s*:\s*\d+/\d+)(.+)", r"\1\n\2"),  # Split after ÉTAPE section
+        (r"(\[-?\d+,\s*-?\d+\])\s*([A-ZÀ-Ú])", r"\1\n\2"),  # Split after coordinates
+        (r"(\))\s+([A-ZÀ-Ú])", r"\1\n\2"),  # Split after closing parenthesis
+        (r"([a-zà-ú])\s+(EN\s*COURS)", r"\1\n\2"),  # Split before EN COURS
+        (r"(EN\s*COURS)\s+([A-ZÀ-Ú])", r"\1\n\2"),  # Split after EN COURS
+    ]
+
+    result = line
+    for pattern, replacement in break_points:
+        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+
+    # Split into lines and clean each line
+    lines = []
+    for line in result.split("\n"):
+        line = line.strip()
+        if line:
+            # Remove single characters that are likely OCR artifacts
+            if not re.match(r"^[a-zà-ú0-9+]$", line, re.IGNORECASE):
+                # Remove any standalone "in"
+                line = re.sub(r"(?:^|\s)in(?:\s|$)", " ", line).strip()
+                # Remove special characters from the beginning of the line
+                # line = re.sub(r'^[^a-zA-ZÀ-ÿ0-9\[\(\s]+', '', line).strip()
+                if line:  # Only append non-empty lines
+                    lines.append(line)
+
+    print(f"DEBUG - Split line '{line}' into: {lines}")
+
+    return lines
+
+
+def legacy_parse_ocr_output(lines):
+    """Extract Étape, Départ, Zone (the next line after Départ), Hints, and Remaining Tries."""
+
+    # Preprocess lines to handle merged content
+    processed_lines = []
+    for line in lines:
+        processed_lines.extend(legacy_split_merged_lines(line))
+
+    data = {
+        "start_pos_zone": None,
+        "start_pos_x": None,
+        "start_pos_y": None,
+        "step": None,
+        "total_steps": None,
+        "remaining_tries": None,
+        "hints": [],
+        "last_hint_pos_x": None,
+        "last_hint_pos_y": None,
+    }
+
+    expect_startPosZone = False
+    collecting_hints = False
+    current_hint = None
+
+    for line in processed_lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        print(f"Processing line: {line}")
+
+        match = re.search(r"Départ\s+(\[[^\]]+\])", line)
+        if match:
+            line = f"Départ {match.group(1)}"
+
+        # 1) Étape
+        m_steps = steps_pattern.search(line)
+        if m_steps:
+            data["step"] = int(m_steps.group(1))  # Extract x
+            data["total_steps"] = int(m_steps.group(2))  # Extract y
+            continue
+
+        # Remove any numeric prefix that might interfere with parsing
+        line = re.sub(r"^\d+\s+", "", line)
+
+        # 2) Départ
+        if "Départ" in line:
+            # Remove leading digit before "Départ"
+            line = re.sub(r"^\d+\s*Départ", "Départ", line)
+
+        m_startPos = startPos_pattern.search(line)
+        if m_startPos:
+            coords = m_startPos.group(1).strip("[]")  # Remove square brackets
+            try:
+                x, y = map(int, coords.split(","))
+                data["start_pos_x"] = x
+                data["start_pos_y"] = y
+            except ValueError:
+                data["start_pos_x"] = None
+                data["start_pos_y"] = None
+            expect_startPosZone = True
+            continue
+
+        # 3) Text under Départ (startPosZone)
+        if expect_startPosZone:
+            if "start_pos_zone" not in data or data["start_pos_zone"] is None:
+                data["start_pos_zone"] = ""
+
+            # Only add text up to the closing parenthesis
+            parenthesis_match = re.search(r"([^)]*\))", line)
+            if parenthesis_match:
+                data["start_pos_zone"] += f" {parenthesis_match.group(1).strip()}"
+                expect_startPosZone = False
+                collecting_hints = True
+            else:
+                data["start_pos_zone"] += f" {line.strip()}"
+            continue
+
+        # 4) Remaining Tries
+        m_tries = tries_pattern.search(line)
+        if m_tries:
+            data["remaining_tries"] = int(m_tries.group(1))
+            if current_hint:
+                sanitized_hint = sanitize_hint_text(current_hint)
+                if sanitized_hint:
+                    data["hints"].append({"hintText": sanitized_hint})
+                current_hint = None
+            collecting_hints = False
+            continue
+
+        # 5) Hints
+        if collecting_hints:
+            print(f"DEBUG: Processing potential hint line: {line}")
+
+            # Remove unwanted patterns but keep the rest
+            sanitized_line = unwanted_pattern.sub("", line).strip()
+
+            print(f"DEBUG: Sanitized line: {sanitized_line}")
+
+            # Remove specific unwanted single characters
+            if re.match(r"^[&9B?]$", sanitized_line):
+                print(f"DEBUG: Skipping single character line: {sanitized_line}")
+                continue
+
+            if sanitized_line:
+                whitelist = ["Ankama", "Dofus"]  # Dofus is whitelisted
+                blacklist = []
+                blacklist_alone = [
+                    "Q",
+                    "ff",
+                    "S",
+                    "'",
+                    "À",
+                    "?",
+                    "Dofus",
+                ]
+
+                # First remove standalone blacklisted words from the line, but protect whitelisted words
+                cleaned_line = sanitized_line
+                words = cleaned_line.split()
+                cleaned_words = [
+                    word
+                    for word in words
+                    if not (
+                        word in blacklist_alone
+                        and not any(white_word in word for white_word in whitelist)
+                    )
+                ]
+                cleaned_line = " ".join(cleaned_words)
+
+                # Then remove blacklisted words from the line, except whitelisted ones
+                for word in blacklist:
+                    if not any(white_word in word for white_word in whitelist):
+                        cleaned_line = cleaned_line.replace(word, "")
+
+                # Split line based on capitalized words
+                def is_split_word(word, index):
+                    return (
+                        index > 0
+                        and word[0].isupper()  # Capitalized word
+                        and word not in whitelist  # Not whitelisted
+                    )
+
+                words = cleaned_line.split()
+                segments = []
+                segment = []
+
+                for i, word in enumerate(words):
+                    if is_split_word(word, i):
+                        segments.append(" ".join(segment))
+                        segment = [word]  # Start new segment
+                    else:
+                        segment.append(word)
+                # Add the last segment
+                if segment:
+                    segments.append(" ".join(segment))
+
+                sanitized_segments = [
+                    sanitize_hint_text(segment) for segment in segments
+                ]
+                for segment in sanitized_segments:
+                    # Sanitize the segment
+                    cleaned_line = sanitize_hint_text(segment)
+                    print(f"DEBUG: Cleaned segment: {cleaned_line}")
+
+                    # If we have a cleaned line, always try to append it first
+                    if cleaned_line:
+                        if current_hint:
+                            current_hint += f" {cleaned_line}"
+                            print(f"DEBUG: Appending to current hint: {current_hint}")
+                        else:
+                            current_hint = cleaned_line
+                            print(f"DEBUG: Started first hint: {current_hint}")
+
+                        # Now check for splits after appending
+                        words = current_hint.split()
+                        split_points = []
+                        for i, word in enumerate(words):
+                            if (
+                                i > 0
+                                and word[0].isupper()
+                                and not any(
+                                    white_word in word for white_word in whitelist
+                                )
+                                and word not in blacklist_alone
+                            ):
+                                # Found a split point, save current hint and start new one
+                                first_part = " ".join(words[:i])
+                                second_part = " ".join(words[i:])
+
+                                # Save the first part
+                                sanitized_hint = sanitize_hint_text(first_part)
+                                if sanitized_hint:
+                                    data["hints"].append({"hintText": sanitized_hint})
+                                print(f"DEBUG: Saved split hint: {sanitized_hint}")
+
+                                # Start new hint with remaining part
+                                current_hint = second_part
+                                print(
+                                    f"DEBUG: Started new hint from split: {current_hint}"
+                                )
+                                break  # Exit after first split
+
+    # Handle last hint if exists
+    if current_hint:
+        sanitized_hint = sanitize_hint_text(current_hint)
+        if sanitized_hint:
+            data["hints"].append({"hintText": sanitized_hint})
+
+        print(f"DEBUG: Saved final hint: {sanitized_hint}")
+
+    return data
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [frame["lines"] for frame in json.load(f)]
+
+
+def variants(lines, rng):
+    """
+    Return a random variant of a frame: merged lines and injected noise.
+    """
+    lines = list(lines)
+    for _ in range(rng.randint(0, 3)):
+        if len(lines) > 1:
+            i = rng.randrange(len(lines) - 1)
+            lines[i : i + 2] = [" ".join(lines[i : i + 2])]
+    for _ in range(rng.randint(0, 3)):
+        i = rng.randrange(len(lines) + 1)
+        if i < len(lines) and rng.random() < 0.5:
+            words = lines[i].split()
+            words.insert(rng.randint(0, len(words)), rng.choice(NOISE))
+            lines[i] = " ".join(words)
+        else:
+            lines.insert(i, rng.choice(NOISE))
+    return lines
+
+
+def time_parser(parser, frames):
+    """
+    Mean seconds per frame, with the debug output discarded.
+    """
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            for lines in frames:
+                parser(lines)
+        return (time.perf_counter() - start) / (REPEAT * len(frames))
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    corpus = load_corpus()
+    frames = corpus + [
+        variants(lines, rng) for lines in corpus for _ in range(VARIANTS_PER_FRAME)
+    ]
+
+    mismatches = 0
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        results = [
+            (lines, legacy_parse_ocr_output(lines), parse_ocr_output(lines))
+            for lines in frames
+        ]
+    for lines, expected, parsed in results:
+        if expected != parsed:
+            mismatches += 1
+            print(f"Mismatch for {lines}:\n  former {expected}\n  new    {parsed}")
+    print(f"{len(frames) - mismatches}/{len(frames)} frames parsed identically")
+
+    legacy_time = time_parser(legacy_parse_ocr_output, frames)
+    new_time = time_parser(parse_ocr_output, frames)
+    print(f"Former parser: {legacy_time * 1e6:.0f} us/frame")
+    print(
+        f"Parser:        {new_time * 1e6:.0f} us/frame ({legacy_time / new_time:.1f}x)"
+    )
+    sys.exit(1 if mismatches else 0)
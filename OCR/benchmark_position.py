@@ -0,0 +1,150 @@
+"""
+Accuracy versus latency sweep of the coordinates preprocessing.
+
+Every variant of preprocess_image_pos (upscale factor, interpolation,
+sharpening, fixed or Otsu threshold) and the former PIL pipeline (800 px
+tall, LANCZOS) read the player_region captures of recorded sessions (see
+OCR/recorder.py) with PLAYER_REGION_CONFIG, and the share of coordinates
+read right is printed with the preprocessing and OCR latency of each:
+
+    python -m OCR.benchmark_position recordings/20250101-120000 [...]
+
+The POSITION_* defaults of OCR/screenshot.py reproduce the former pipeline
+with lookup tables ("800px lanczos sharpen 160"); switch them to the
+fastest variant within one point of the best accuracy once the sweep has
+run on enough recorded crops.
+"""
+
+import sys
+import time
+import itertools
+
+import cv2
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from OCR.debug_sink import debug_sink
+from OCR.engine import PLAYER_REGION_CONFIG, get_engine
+from OCR.replay import load_corpus
+from OCR.screenshot import coordinate_pattern, preprocess_image_pos
+
+SCALES = (1, 1.5, 2, 2.5, 3, 4, 6)
+INTERPOLATIONS = {"linear": cv2.INTER_LINEAR, "cubic": cv2.INTER_CUBIC}
+# Fixed threshold after the contrast stretch, or Otsu (None)
+THRESHOLDS = (160, None)
+REPEAT = 20
+
+
+def legacy_preprocess_image_pos(image):
+    """
+    Former preprocessing, on PIL images.
+    """
+    image = Image.fromarray(image).convert("RGB")
+    target_height = 800
+    target_width = int(target_height * image.width / image.height)
+    image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    image = image.convert("L")
+    image = Image.eval(image, lambda x: 255 - x)
+
+    padding = int(target_height * 0.15)
+    new_size = (target_width + 2 * padding, target_height + 2 * padding)
+    padded_image = Image.new("L", new_size, 255)
+    padded_image.paste(image, (padding, padding))
+
+    image = ImageEnhance.Contrast(padded_image).enhance(2.0)
+    image = image.filter(ImageFilter.SHARPEN)
+    image = image.point(lambda x: 0 if x < 160 else 255)
+    return np.asarray(image.convert("RGB"))
+
+
+def load_crops(directories):
+    """
+    Return (crop, (x, y)) for the player records with expected coordinates.
+    """
+    crops = []
+    for record in load_corpus(directories):
+        expected = record.get("expected")
+        if record["kind"] != "player" or not expected:
+            continue
+        crop = np.asarray(Image.open(record["image"]).convert("RGB"))
+        crops.append((crop, tuple(expected["coordinates"])))
+    return crops
+
+
+def variants():
+    """
+    Yield (label, preprocess function) for every variant of the sweep.
+    """
+    yield "legacy 800px lanczos", legacy_preprocess_image_pos
+    yield "800px lanczos sharpen 160", lambda image: preprocess_image_pos(
+        image,
+        debug=False,
+        scale=None,
+        interpolation=cv2.INTER_LANCZOS4,
+        sharpen=True,
+        threshold=160,
+    )
+    for scale, (name, interpolation), sharpen, threshold in itertools.product(
+        SCALES, INTERPOLATIONS.items(), (True, False), THRESHOLDS
+    ):
+        label = (
+            f"x{scale} {name}{' sharpen' if sharpen else ''}"
+            f" {threshold if threshold is not None else 'otsu'}"
+        )
+        yield label, lambda image, s=scale, i=interpolation, sh=sharpen, t=threshold: (
+            preprocess_image_pos(
+                image, debug=False, scale=s, interpolation=i, sharpen=sh, threshold=t
+            )
+        )
+
+
+def read_coordinates(engine, image):
+    match = coordinate_pattern.search(engine.image_to_string(image))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def sweep(crops, engine):
+    """
+    Return (label, accuracy, preprocess seconds, OCR seconds) per variant.
+    """
+    rows = []
+    for label, preprocess in variants():
+        correct, preprocess_times, ocr_times = 0, [], []
+        for crop, expected in crops:
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                image = preprocess(crop)
+            preprocess_times.append((time.perf_counter() - start) / REPEAT)
+
+            start = time.perf_counter()
+            position = read_coordinates(engine, image)
+            ocr_times.append(time.perf_counter() - start)
+            correct += position == expected
+        rows.append(
+            (
+                label,
+                correct / len(crops),
+                float(np.median(preprocess_times)),
+                float(np.median(ocr_times)),
+            )
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m OCR.benchmark_position <recording folder> [...]")
+        sys.exit(1)
+
+    debug_sink.sample_rate = 0
+    crops = load_crops(sys.argv[1:])
+    print(f"{len(crops)} coordinates crops")
+    engine = get_engine(PLAYER_REGION_CONFIG)
+    print(
+        f"Variant                    accuracy  preprocess (us)  OCR (ms)  [{engine.name}]"
+    )
+    for label, accuracy, preprocess_time, ocr_time in sweep(crops, engine):
+        print(
+            f"{label:<26} {accuracy:>8.1%} {preprocess_time * 1e6:>16.0f}"
+            f" {ocr_time * 1000:>9.1f}"
+        )
@@ -0,0 +1,229 @@
+"""
+Asynchronous, sampled sink for the OCR debug artifacts.
+
+Each pipeline stage fills a DebugFrame with its images and notes, then
+submits it. Frames are kept in an in-memory ring of the last frames as soon
+as they are started, so a stage failing half-way still leaves its artifacts.
+Submitting never blocks: only a sampled fraction of the frames is queued
+for the background writer, which drops frames when it falls behind. PNG
+encoding and plotting only ever happen on the writer thread. When a step
+fails, dump_failure writes the whole ring to debug_failures/ so the frames
+leading to the error are always available.
+
+The defaults can be changed from the environment (.env):
+
+    OCR_DEBUG_SAMPLE_RATE  fraction of frames written (0 disables, 1 = all)
+    OCR_DEBUG_QUEUE_SIZE   frames waiting to be written before dropping
+    OCR_DEBUG_RING_SIZE    frames kept in memory for failure dumps
+"""
+
+import os
+import time
+import logging
+import queue
+import random
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+DEBUG_SAMPLE_RATE = float(os.getenv("OCR_DEBUG_SAMPLE_RATE", "0.1"))
+DEBUG_QUEUE_SIZE = int(os.getenv("OCR_DEBUG_QUEUE_SIZE", "8"))
+DEBUG_RING_SIZE = int(os.getenv("OCR_DEBUG_RING_SIZE", "8"))
+FAILURES_DIR = "debug_failures"
+
+
+def snapshot(args):
+    """
+    Copy the arrays among deferred arguments: they may be views of a frame
+    buffer that is overwritten before the writer thread uses them.
+    """
+    return tuple(arg.copy() if isinstance(arg, np.ndarray) else arg for arg in args)
+
+
+class DebugFrame:
+    """
+    Debug artifacts of one run of a pipeline stage, written to one directory.
+    """
+
+    def __init__(self, stage, directory):
+        self.stage = stage
+        self.directory = directory
+        self.created = time.time()
+        self.artifacts = []
+
+    def image(self, name, image, bgr=False):
+        """
+        Add an image: a PIL image, or an RGB array (BGR if `bgr` is set).
+        """
+        if isinstance(image, np.ndarray):
+            # The caller may keep drawing on its array
+            image = image.copy()
+        self.artifacts.append((name, "bgr" if bgr else "image", image))
+
+    def text(self, name, lines):
+        """
+        Add a text file made of the given lines.
+        """
+        self.artifacts.append((name, "text", list(lines)))
+
+    def render(self, name, function, *args):
+        """
+        Add a BGR image drawn by `function(*args)` on the writer thread.
+        """
+        self.artifacts.append((name, "render", (function, snapshot(args))))
+
+    def plot(self, name, function, *args):
+        """
+        Add a file written by `function(path, *args)` on the writer thread.
+        """
+        self.artifacts.append((name, "plot", (function, snapshot(args))))
+
+    def write(self, directory=None):
+        directory = directory or self.directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        for name, kind, payload in self.artifacts:
+            path = os.path.join(directory, name) if directory else name
+            if kind == "image":
+                if isinstance(payload, np.ndarray):
+                    payload = Image.fromarray(payload)
+                payload.save(path)
+            elif kind == "bgr":
+                cv2.imwrite(path, payload)
+            elif kind == "text":
+                with open(path, "w", encoding="utf-8") as f:
+                    f.writelines(f"{line}\n" for line in payload)
+            elif kind == "render":
+                function, args = payload
+                cv2.imwrite(path, function(*args))
+            else:
+                function, args = payload
+                function(path, *args)
+
+
+class DebugSink:
+    """
+    Background writer for DebugFrames with sampling, a bounded queue and a
+    ring of the last frames.
+    """
+
+    def __init__(
+        self,
+        sample_rate=DEBUG_SAMPLE_RATE,
+        queue_size=DEBUG_QUEUE_SIZE,
+        ring_size=DEBUG_RING_SIZE,
+    ):
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self.ring = deque(maxlen=ring_size)
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        # Unbounded so failure dumps are never refused; sampled frames are
+        # bounded by queue_size in submit()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def frame(self, stage, directory=""):
+        """
+        Start a frame for a stage, written to `directory` (default: cwd),
+        and keep it in the ring.
+        """
+        frame = DebugFrame(stage, directory)
+        self.ring.append(frame)
+        return frame
+
+    def submit(self, frame):
+        """
+        Queue a completed frame for writing if it is sampled.
+
+        Returns:
+            bool: Whether the frame was queued
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        # Checked and queued under the lock, so concurrent submits cannot
+        # go past queue_size
+        with self._lock:
+            if self._queue.qsize() >= self.queue_size:
+                self.dropped += 1
+                return False
+            self._put(frame, None)
+        return True
+
+    def write(self, frame):
+        """
+        Queue a frame for writing, whatever the sample rate.
+        """
+        self._enqueue(frame, None)
+
+    def dump_failure(self, reason):
+        """
+        Write the frames in the ring to a new debug_failures/ folder.
+
+        Returns:
+            str: The folder, or None if the ring was empty
+        """
+        frames = list(self.ring)
+        self.ring.clear()
+        if not frames:
+            return None
+
+        self.failures += 1
+        directory = os.path.join(
+            FAILURES_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{self.failures}"
+        )
+        note = DebugFrame("failure", directory)
+        note.text("reason.txt", [reason])
+        self._enqueue(note, None)
+        for i, frame in enumerate(frames):
+            self._enqueue(frame, os.path.join(directory, f"{i:02d}_{frame.stage}"))
+        return directory
+
+    def flush(self, timeout=None):
+        """
+        Wait until the queued frames are written.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _enqueue(self, frame, directory):
+        with self._lock:
+            self._put(frame, directory)
+
+    def _put(self, frame, directory):
+        # Called with _lock held
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="ocr-debug-writer", daemon=True
+            )
+            self._thread.start()
+        self._queue.put((frame, directory))
+
+    def _run(self):
+        while True:
+            frame, directory = self._queue.get()
+            try:
+                frame.write(directory)
+                self.written += 1
+            except Exception as e:
+                log.warning("Debug sink: failed to write %s frame: %s", frame.stage, e)
+            finally:
+                self._queue.task_done()
+
+
+# Shared by every OCR stage
+debug_sink = DebugSink()
@@ -0,0 +1,345 @@
+"""
+OCR backends used by the screenshot readers.
+
+The persistent engine keeps initialised tesseract APIs (through tesserocr)
+alive for the whole session, one pool per config, so fra.traineddata is
+loaded once and images are handed over as NumPy buffers without temp files.
+When tesserocr is not installed or cannot load the language, pytesseract is
+used instead, which spawns a tesseract process per call.
+
+    engine = get_engine(WIDGET_CONFIG)
+    data = engine.image_to_data(image)
+"""
+
+import os
+import time
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+log = logging.getLogger(__name__)
+
+# Hint widget sections (header, zone, hints, footer)
+WIDGET_CONFIG = r"--oem 1 --psm 3 -l fra"
+# Widget section read as a single block of text, when the page layout
+# analysis of WIDGET_CONFIG fails
+WIDGET_BLOCK_CONFIG = r"--oem 1 --psm 6 -l fra"
+# A single hint row of the widget
+HINT_ROW_CONFIG = r"--oem 1 --psm 7 -l fra"
+# Single line of map coordinates read from player_region
+PLAYER_REGION_CONFIG = r"--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789,-"
+
+# Up to one API per OCR worker thread, for each config
+ENGINE_POOL_SIZE = 5
+
+# Columns of tesseract's TSV output, as returned by pytesseract.image_to_data
+TSV_COLUMNS = (
+    "level",
+    "page_num",
+    "block_num",
+    "par_num",
+    "line_num",
+    "word_num",
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "text",
+)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def parse_config(config):
+    """
+    Split a tesseract command line config into (lang, oem, psm, variables).
+    """
+    lang, oem, psm, variables = "eng", None, None, {}
+    tokens = config.split()
+    for i, token in enumerate(tokens[:-1]):
+        value = tokens[i + 1]
+        if token == "-l":
+            lang = value
+        elif token == "--oem":
+            oem = int(value)
+        elif token == "--psm":
+            psm = int(value)
+        elif token == "-c" and "=" in value:
+            name, setting = value.split("=", 1)
+            variables[name] = setting
+    return lang, oem, psm, variables
+
+
+def as_array(image):
+    """
+    Return an image as a contiguous uint8 array (grayscale, RGB or RGBA).
+    """
+    if isinstance(image, Image.Image) and image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGB")
+    pixels = np.asarray(image)
+    if pixels.dtype == bool:
+        pixels = pixels.astype(np.uint8) * 255
+    return np.ascontiguousarray(pixels, dtype=np.uint8)
+
+
+def tsv_to_dict(tsv):
+    """
+    Parse tesseract TSV rows into the same dict as pytesseract.Output.DICT.
+    """
+    data = {column: [] for column in TSV_COLUMNS}
+    for row in tsv.splitlines():
+        cells = row.split("\t")
+        if len(cells) < len(TSV_COLUMNS) - 1:
+            continue
+        # Non-word rows have no text cell
+        cells += [""] * (len(TSV_COLUMNS) - len(cells))
+        for column, cell in zip(TSV_COLUMNS[:-1], cells):
+            data[column].append(int(float(cell)))
+        data["text"].append(cells[-1])
+    return data
+
+
+class OCREngine:
+    """
+    Common interface of the OCR backends, with per-call latency tracking.
+    """
+
+    name = None
+
+    def __init__(self, config):
+        self.config = config
+        self.calls = 0
+        self.total_time = 0.0
+        self._stats_lock = threading.Lock()
+
+    def image_to_data(self, image):
+        """
+        OCR an image and return the words with their boxes, confidences
+        and line numbers, as pytesseract.Output.DICT.
+        """
+        start = time.perf_counter()
+        try:
+            return self._image_to_data(image)
+        finally:
+            self._record(start)
+
+    def image_to_string(self, image):
+        """
+        OCR an image and return the recognized text.
+        """
+        start = time.perf_counter()
+        try:
+            return self._image_to_string(image)
+        finally:
+            self._record(start)
+
+    def mean_latency(self):
+        """
+        Mean seconds per call so far.
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def _record(self, start):
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.calls += 1
+            self.total_time += elapsed
+
+    def _image_to_data(self, image):
+        raise NotImplementedError
+
+    def _image_to_string(self, image):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """
+    Fallback backend: one tesseract process per call.
+    """
+
+    name = "pytesseract"
+
+    def _image_to_data(self, image):
+        return pytesseract.image_to_data(
+            image, config=self.config, output_type=pytesseract.Output.DICT
+        )
+
+    def _image_to_string(self, image):
+        return pytesseract.image_to_string(image, config=self.config)
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Persistent backend: a pool of initialised tesseract APIs for one config.
+
+    An API is not thread safe, so each call borrows one from the pool and
+    a new one is created (up to pool_size) when all of them are busy.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, config, pool_size=ENGINE_POOL_SIZE):
+        super().__init__(config)
+        self.lang, oem, psm, self.variables = parse_config(config)
+        self.oem = oem if oem is not None else tesserocr.OEM.DEFAULT
+        self.psm = psm if psm is not None else tesserocr.PSM.AUTO
+        self.pool_size = pool_size
+        self._apis = queue.LifoQueue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+
+        # Create the first API right away so a missing language fails here
+        self._apis.put(self._create_api())
+        self._created = 1
+
+    def _create_api(self):
+        kwargs = {
+            "lang": self.lang,
+            "psm": self.psm,
+            "oem": self.oem,
+            "variables": self.variables,
+        }
+        tessdata = tessdata_path()
+        if tessdata:
+            kwargs["path"] = tessdata
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    @contextmanager
+    def _api(self):
+        try:
+            api = self._apis.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._created < self.pool_size
+                if create:
+                    self._created += 1
+            api = self._create_api() if create else self._apis.get()
+        try:
+            yield api
+        finally:
+            self._apis.put(api)
+
+    def _set_image(self, api, image):
+        pixels = as_array(image)
+        height, width = pixels.shape[:2]
+        channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+        api.SetImageBytes(pixels.tobytes(), width, height, channels, width * channels)
+
+    def _image_to_data(self, image):
+        with self._api() as api:
+            self._set_image(api, image)
+            api.Recognize()
+            return tsv_to_dict(api.GetTSVText(0))
+
+    def _image_to_string(self, image):
+        with self._api() as api:
+            self._set_image(api, image)
+            return api.GetUTF8Text()
+
+    def close(self):
+        while True:
+            try:
+                self._apis.get_nowait().End()
+            except queue.Empty:
+                break
+
+
+def tessdata_path():
+    """
+    Return the tessdata directory to load traineddata from, if known.
+
+    Uses TESSDATA_PREFIX, or the tessdata folder next to the tesseract
+    executable configured for pytesseract.
+    """
+    prefix = os.environ.get("TESSDATA_PREFIX")
+    if prefix:
+        return prefix
+    tesseract_dir = os.path.dirname(pytesseract.pytesseract.tesseract_cmd)
+    tessdata = os.path.join(tesseract_dir, "tessdata")
+    if tesseract_dir and os.path.isdir(tessdata):
+        return tessdata
+    return None
+
+
+def create_engine(config, persistent=True):
+    """
+    Create an engine for a config, falling back to pytesseract when the
+    persistent engine is unavailable.
+    """
+    if persistent and tesserocr is not None:
+        try:
+            return TesserocrEngine(config)
+        except Exception as e:
+            log.warning("Persistent OCR engine unavailable (%s), using pytesseract", e)
+    return PytesseractEngine(config)
+
+
+def get_engine(config, persistent=True):
+    """
+    Return the shared engine for a config, created on first use.
+    """
+    key = (config, persistent)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(config, persistent)
+            _engines[key] = engine
+    return engine
+
+
+def latency_report():
+    """
+    Return one line per engine used so far with its mean latency.
+    """
+    return [
+        f"{engine.name} [{engine.config}]: {engine.calls} calls, "
+        f"{engine.mean_latency() * 1000:.1f} ms/call"
+        for engine in _engines.values()
+        if engine.calls
+    ]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Compare both backends on the saved debug crops:
+    # python -m OCR.engine [widget_section.png ...]
+    widget_images = sys.argv[1:] or [
+        os.path.join("debug_ocr", name)
+        for name in (
+            "3_header.png",
+            "4_zone.png",
+            "4_hints_cropped.png",
+            "6_footer.png",
+        )
+    ]
+    position_image = os.path.join("debug_ocr_pos", "10_final.png")
+    repeat = 5
+
+    for persistent in (False, True):
+        widget = get_engine(WIDGET_CONFIG, persistent)
+        player = get_engine(PLAYER_REGION_CONFIG, persistent)
+        for _ in range(repeat):
+            for path in widget_images:
+                if os.path.exists(path):
+                    widget.image_to_data(as_array(Image.open(path)))
+            if os.path.exists(position_image):
+                player.image_to_string(as_array(Image.open(position_image)))
+
+    for line in latency_report():
+        print(line)
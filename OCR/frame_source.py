@@ -0,0 +1,228 @@
+"""
+Screen capture shared by every reader of a tick.
+
+A frame source grabs the screen once per tick into a reusable RGB buffer,
+and returns every region of config.json read by the OCR (treasure_region,
+player_region) cut from that single grab: no per-region screenshot. Only
+the bounding box of these regions is captured. The regions are read-only
+copies, so a grab by another thread (the position polling of
+run_automation) never overwrites a region still being read.
+
+    frames = create_frame_source(config_data)
+    frame = frames.capture()
+    widget = frame["treasure_region"]
+
+Backends:
+
+    mss        native grabber (XShm on X11, BitBlt on Windows), if installed
+    pyautogui  pyautogui.screenshot, always available
+    file       saved screenshots (a file or a folder of them), for offline runs
+
+The backend is chosen with FRAME_SOURCE in .env ("auto" by default: mss when
+installed, else pyautogui). FRAME_SOURCE_PATH is the file or folder replayed
+by the file backend.
+"""
+
+import os
+import logging
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+FRAME_SOURCE = os.getenv("FRAME_SOURCE", "auto")
+FRAME_SOURCE_PATH = os.getenv("FRAME_SOURCE_PATH", "")
+# Regions read from the screen (chat_region is only clicked)
+REGION_NAMES = ("player_region", "treasure_region")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def bounding_box(regions):
+    """
+    Return (left, top, width, height) covering every region.
+    """
+    left = min(region["x"] for region in regions)
+    top = min(region["y"] for region in regions)
+    right = max(region["x"] + region["width"] for region in regions)
+    bottom = max(region["y"] + region["height"] for region in regions)
+    return left, top, right - left, bottom - top
+
+
+class FrameSource:
+    """
+    Grab the screen area of the configured regions into one reused buffer.
+    """
+
+    name = None
+
+    def __init__(self, config):
+        self.regions = {
+            name: config[name]
+            for name in REGION_NAMES
+            if isinstance(config.get(name), dict)
+        }
+        if not self.regions:
+            raise ValueError("No screen region configured")
+        self.box = bounding_box(self.regions.values())
+        self.buffer = np.zeros((self.box[3], self.box[2], 3), dtype=np.uint8)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def capture(self):
+        """
+        Grab a new frame and return its regions.
+
+        Returns:
+            dict: {region name: read-only RGB array}, valid after the next grab
+        """
+        with self._lock:
+            self._grab(self.buffer)
+            frame = {}
+            for name, view in self._region_views().items():
+                region = view.copy()
+                region.flags.writeable = False
+                frame[name] = region
+            return frame
+
+    def _region_views(self):
+        """
+        Return the views of the regions in the buffer, overwritten by each grab.
+        """
+        if not self._views:
+            for name, region in self.regions.items():
+                x = region["x"] - self.box[0]
+                y = region["y"] - self.box[1]
+                self._views[name] = self.buffer[
+                    y : y + region["height"], x : x + region["width"]
+                ]
+        return self._views
+
+    def _grab(self, buffer):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MssFrameSource(FrameSource):
+    """
+    Native grabber; BGRA pixels are converted straight into the buffer.
+    """
+
+    name = "mss"
+
+    def __init__(self, config):
+        super().__init__(config)
+        left, top, width, height = self.box
+        self.monitor = {"left": left, "top": top, "width": width, "height": height}
+        # mss handles are per thread
+        self._local = threading.local()
+
+    def _grab(self, buffer):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is None:
+            grabber = self._local.grabber = mss.mss()
+        shot = grabber.grab(self.monitor)
+        pixels = np.frombuffer(shot.raw, dtype=np.uint8).reshape(
+            shot.height, shot.width, 4
+        )
+        cv2.cvtColor(pixels, cv2.COLOR_BGRA2RGB, dst=buffer)
+
+
+class PyAutoGUIFrameSource(FrameSource):
+    """
+    Portable grabber going through pyautogui.screenshot.
+    """
+
+    name = "pyautogui"
+
+    def _grab(self, buffer):
+        import pyautogui
+
+        screenshot = pyautogui.screenshot(region=self.box)
+        np.copyto(buffer, np.asarray(screenshot.convert("RGB")))
+
+
+class FileFrameSource(FrameSource):
+    """
+    Replay saved full-screen screenshots, one per grab, in name order.
+
+    The last file is repeated once the folder is exhausted.
+    """
+
+    name = "file"
+
+    def __init__(self, config, path=FRAME_SOURCE_PATH):
+        super().__init__(config)
+        if os.path.isdir(path):
+            self.paths = sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        else:
+            self.paths = [path] if path else []
+        if not self.paths:
+            raise ValueError(f"No screenshot to replay in {path!r}")
+        self.index = 0
+
+    def _grab(self, buffer):
+        path = self.paths[min(self.index, len(self.paths) - 1)]
+        self.index += 1
+        left, top, width, height = self.box
+        with Image.open(path) as screenshot:
+            np.copyto(
+                buffer,
+                np.asarray(
+                    screenshot.convert("RGB").crop(
+                        (left, top, left + width, top + height)
+                    )
+                ),
+            )
+
+
+def create_frame_source(config, backend=FRAME_SOURCE):
+    """
+    Create the frame source for the configured regions.
+    """
+    if backend == "file":
+        return FileFrameSource(config)
+    if backend in ("auto", "mss") and mss is not None:
+        try:
+            source = MssFrameSource(config)
+            source.capture()
+            return source
+        except Exception as e:
+            log.warning("mss capture unavailable (%s), using pyautogui", e)
+    elif backend == "mss":
+        log.warning("mss is not installed, using pyautogui")
+    return PyAutoGUIFrameSource(config)
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    # Compare the grab time of the backends: python -m OCR.frame_source
+    with open("config.json") as f:
+        config = json.load(f)
+
+    repeat = 50
+    for backend in ("mss", "pyautogui"):
+        source = create_frame_source(config, backend)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            source.capture()
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{source.name}: {source.box[2]}x{source.box[3]} in {elapsed:.1f} ms")
@@ -0,0 +1,234 @@
+"""
+Template-matching reader for the map coordinates shown in player_region.
+
+The coordinates use a fixed game font, so each glyph (digits, comma, minus)
+looks the same from one read to the next. The crop is thresholded, split
+into connected components, and every component is placed on a fixed canvas
+(keeping its height and its offset from the top of the text line, which
+tells a comma from a minus) and compared with the learned templates by
+normalized correlation, all glyphs at once.
+
+Templates are learned from the tesseract fallback: when a tesseract read is
+confirmed (by a second, differently preprocessed read, or by the position
+the player was expected at) and the crop has exactly one component per
+character, each component is stored as a template of its character. They
+are saved to OCR/glyph_templates.npz, so the first reads of a new setup go
+through tesseract and the following ones do not. A misread is never
+learned: its template would match perfectly from then on, and tesseract
+would never be asked again.
+"""
+
+import os
+import re
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+TEMPLATES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "glyph_templates.npz"
+)
+
+GLYPHS = "0123456789,-"
+CANVAS_HEIGHT = 32
+CANVAS_WIDTH = 24
+# Components smaller than this (in pixels) are noise
+MIN_COMPONENT_AREA = 3
+# Minimum correlation for a glyph to be trusted
+MIN_CONFIDENCE = 0.85
+# Templates kept per character
+SAMPLES_PER_GLYPH = 4
+
+coordinates_text_pattern = re.compile(r"^-?\d+,-?\d+$")
+
+
+def binarize(crop):
+    """
+    Threshold a crop so the text is white (255) on black.
+    """
+    pixels = np.asarray(crop)
+    if pixels.ndim == 3:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(pixels, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # The text covers less of the crop than the background
+    if np.count_nonzero(binary) > binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+def segment(binary):
+    """
+    Split a binarized crop into glyph canvases, left to right.
+
+    Returns:
+        np.ndarray: float32 array of shape (glyphs, CANVAS_HEIGHT * CANVAS_WIDTH)
+    """
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    boxes = [
+        (x, y, w, h, label)
+        for label, (x, y, w, h, area) in enumerate(stats[1:], start=1)
+        if area >= MIN_COMPONENT_AREA
+    ]
+    if not boxes:
+        return np.zeros((0, CANVAS_HEIGHT * CANVAS_WIDTH), dtype=np.float32)
+    boxes.sort()
+
+    line_top = min(y for _, y, _, _, _ in boxes)
+    canvases = np.zeros((len(boxes), CANVAS_HEIGHT, CANVAS_WIDTH), dtype=np.float32)
+    for i, (x, y, w, h, label) in enumerate(boxes):
+        glyph = (labels[y : y + h, x : x + w] == label).astype(np.float32)
+        top = y - line_top
+        if top + h > CANVAS_HEIGHT or w > CANVAS_WIDTH:
+            # Larger than expected (other screen scale): shrink it in place
+            scale = min((CANVAS_HEIGHT - 1) / (top + h), CANVAS_WIDTH / w)
+            glyph = cv2.resize(
+                glyph,
+                (max(int(w * scale), 1), max(int(h * scale), 1)),
+                interpolation=cv2.INTER_AREA,
+            )
+            top = int(top * scale)
+            h, w = glyph.shape
+        left = (CANVAS_WIDTH - w) // 2
+        canvases[i, top : top + h, left : left + w] = glyph
+    return canvases.reshape(len(boxes), -1)
+
+
+def normalize(vectors):
+    """
+    Zero-mean, unit-norm rows, so a dot product is a correlation.
+    """
+    vectors = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-6)
+
+
+class GlyphReader:
+    """
+    Read coordinates by matching glyphs against learned templates.
+    """
+
+    def __init__(self, path=TEMPLATES_PATH):
+        self.path = path
+        # Cleared to only read with the templates on disk (corpus replays)
+        self.learning = True
+        self.samples = {glyph: [] for glyph in GLYPHS}
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._labels = []
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    for glyph, key in zip(GLYPHS, self._keys()):
+                        if key in data:
+                            self.samples[glyph] = list(data[key])
+            except (OSError, ValueError) as e:
+                log.warning("Invalid glyph templates, ignoring them: %s", e)
+        self._rebuild()
+
+    def _keys(self):
+        return [f"glyph_{ord(glyph)}" for glyph in GLYPHS]
+
+    def _rebuild(self):
+        labels, vectors = [], []
+        for glyph, samples in self.samples.items():
+            labels += [glyph] * len(samples)
+            vectors += samples
+        self._labels = labels
+        self._matrix = (
+            normalize(np.array(vectors, dtype=np.float32)) if vectors else None
+        )
+
+    def is_ready(self):
+        """
+        Whether every character has at least one template.
+        """
+        return all(self.samples[glyph] for glyph in GLYPHS)
+
+    def read(self, crop):
+        """
+        Read the text of a crop.
+
+        Returns:
+            tuple: (text, per-glyph confidences), or (None, []) without templates
+        """
+        canvases = segment(binarize(crop))
+        with self._lock:
+            matrix, labels = self._matrix, self._labels
+        if matrix is None or not len(canvases):
+            return None, []
+
+        scores = normalize(canvases) @ matrix.T
+        best = scores.argmax(axis=1)
+        text = "".join(labels[i] for i in best)
+        confidences = [
+            round(float(score), 3) for score in scores[np.arange(len(best)), best]
+        ]
+        return text, confidences
+
+    def read_coordinates(self, crop):
+        """
+        Return ((x, y), confidences) when every glyph is trusted, else (None, confidences).
+        """
+        text, confidences = self.read(crop)
+        if (
+            text is None
+            or not coordinates_text_pattern.match(text)
+            or min(confidences) < MIN_CONFIDENCE
+        ):
+            return None, confidences
+        x, y = text.split(",")
+        return (int(x), int(y)), confidences
+
+    def learn(self, crop, text):
+        """
+        Store the glyphs of a crop whose text is known (a confirmed read).
+
+        Returns:
+            bool: Whether the glyphs were stored: learning is enabled and the
+            crop had one component per character
+        """
+        if not self.learning:
+            return False
+        canvases = segment(binarize(crop))
+        if len(canvases) != len(text) or not set(text) <= set(GLYPHS):
+            return False
+
+        with self._lock:
+            for glyph, canvas in zip(text, canvases):
+                samples = self.samples[glyph]
+                samples.append(canvas)
+                del samples[:-SAMPLES_PER_GLYPH]
+            self._rebuild()
+            self._save()
+        return True
+
+    def _save(self):
+        arrays = {
+            key: np.array(self.samples[glyph], dtype=np.float32)
+            for glyph, key in zip(GLYPHS, self._keys())
+            if self.samples[glyph]
+        }
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, self.path)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from PIL import Image
+
+    # python -m OCR.glyph_reader crop.png [expected text to learn]
+    crop = np.array(Image.open(sys.argv[1]).convert("RGB"))
+    reader = GlyphReader()
+    if len(sys.argv) > 2:
+        print(f"Learned: {reader.learn(crop, sys.argv[2])}")
+
+    repeat = 200
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = reader.read_coordinates(crop)
+    print(f"Read {result} in {(time.perf_counter() - start) / repeat * 1e6:.0f} us")
@@ -0,0 +1,175 @@
+"""
+Record mode: save the captures read during a session together with what
+the pipeline produced, as a corpus for python -m OCR.replay.
+
+Recording is enabled by setting OCR_RECORD_DIR in .env. Each session gets
+its own folder (OCR_RECORD_DIR/<date-time>/) with one PNG and one JSON per
+capture:
+
+    00001_treasure.png   treasure_region capture
+    00001_treasure.json  {"kind", "time", "output", "expected"}
+    00002_player.png     player_region capture
+    00002_player.json
+
+"expected" starts as the fields of the pipeline output. A direction forced
+with the direction buttons replaces the direction of the last hint in the
+last widget record (and in the re-read of the same step that follows).
+It can also be edited by hand to fix any other wrong read. Files are
+written by the debug sink thread, so recording does not slow the reads.
+"""
+
+import os
+import json
+import time
+import threading
+
+from dotenv import load_dotenv
+
+from OCR.debug_sink import DebugFrame, debug_sink
+
+load_dotenv()
+
+RECORD_DIR = os.getenv("OCR_RECORD_DIR", "")
+
+# Fields of read_hunt_from_screenshot compared by the replay
+HUNT_FIELDS = (
+    "start_pos_zone",
+    "start_pos_x",
+    "start_pos_y",
+    "step",
+    "total_steps",
+    "remaining_tries",
+    "last_hint_pos_x",
+    "last_hint_pos_y",
+)
+
+
+def hunt_fields(data):
+    """
+    Return the compared fields of a widget read, or None for a failed read.
+    """
+    if not isinstance(data, dict) or "error" in data:
+        return None
+    fields = {name: data.get(name) for name in HUNT_FIELDS}
+    hints = data.get("hints") or []
+    fields["hints"] = [hint.get("hintText") for hint in hints]
+    fields["directions"] = [hint.get("hintDirection") for hint in hints]
+    return fields
+
+
+def coordinates_fields(data):
+    """
+    Return the compared fields of a coordinates read, or None for a failed read.
+    """
+    if not data.get("success") or not data.get("coordinates"):
+        return None
+    position = data["coordinates"][0]
+    return {"coordinates": [position["x"], position["y"]]}
+
+
+class SessionRecorder:
+    """
+    Save captures and pipeline outputs of a session to a corpus folder.
+    """
+
+    def __init__(self, directory=RECORD_DIR):
+        self.directory = directory
+        self.session_dir = None
+        self.count = 0
+        self.last_treasure = None
+        self.forced_direction = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def record_treasure(self, image, data):
+        """
+        Record a treasure_region capture and its read_hunt_from_screenshot output.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            record = self._record("treasure", image, data, hunt_fields(data))
+            self.last_treasure = record
+            forced = self.forced_direction
+            if forced is not None and self._same_step(record, forced):
+                self._apply_direction(record, forced["direction"])
+            self._write_json(record)
+
+    def record_player(self, image, data):
+        """
+        Record a player_region capture and its process_coordinates_image output.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._write_json(
+                self._record("player", image, data, coordinates_fields(data))
+            )
+
+    def correct_direction(self, direction):
+        """
+        Use a direction forced by the user as the expected last hint direction.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            record = self.last_treasure
+            if record is None or not record["expected"]:
+                return
+            expected = record["expected"]
+            self.forced_direction = {
+                "step": expected["step"],
+                "hints": len(expected["hints"]),
+                "direction": direction,
+            }
+            if self._apply_direction(record, direction):
+                self._write_json(record)
+
+    def _record(self, kind, image, data, expected):
+        if self.session_dir is None:
+            self.session_dir = os.path.join(
+                self.directory, time.strftime("%Y%m%d-%H%M%S")
+            )
+        self.count += 1
+        name = f"{self.count:05d}_{kind}"
+        frame = DebugFrame("record", self.session_dir)
+        frame.image(f"{name}.png", image)
+        debug_sink.write(frame)
+        return {
+            "name": name,
+            "kind": kind,
+            "time": time.time(),
+            "output": data,
+            "expected": expected,
+        }
+
+    def _same_step(self, record, forced):
+        expected = record["expected"]
+        return (
+            expected is not None
+            and expected["step"] == forced["step"]
+            and len(expected["hints"]) == forced["hints"]
+        )
+
+    def _apply_direction(self, record, direction):
+        directions = record["expected"]["directions"]
+        if not directions or directions[-1] == direction:
+            return False
+        directions[-1] = direction
+        record["corrected"] = True
+        return True
+
+    def _write_json(self, record):
+        frame = DebugFrame("record", self.session_dir)
+        frame.text(
+            f"{record['name']}.json",
+            [json.dumps(record, indent=2, ensure_ascii=False)],
+        )
+        debug_sink.write(frame)
+
+
+# Shared by the capture sites of main.py
+recorder = SessionRecorder()
@@ -0,0 +1,148 @@
+"""
+Replay a recorded corpus through the OCR pipeline and report per-stage
+latency and field accuracy against the expected values of each record.
+
+    python -m OCR.replay recordings/20250101-120000 [more folders ...]
+
+Widget captures go through read_direction_arrows and
+read_hunt_from_screenshot (section cache disabled, so every read is a
+full OCR), player captures through process_coordinates_image. Records
+without expected values (failed reads that were not fixed by hand) only
+count for latency. See OCR/recorder.py for the corpus format.
+"""
+
+import os
+import sys
+import json
+
+import numpy as np
+from PIL import Image
+
+from OCR.debug_sink import debug_sink
+from OCR import screenshot
+from OCR.recorder import hunt_fields, coordinates_fields
+
+
+def load_corpus(directories):
+    """
+    Return the records of the given folders, with their image path, in order.
+    """
+    records = []
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                record = json.load(f)
+            record["image"] = os.path.join(directory, f"{record['name']}.png")
+            if os.path.exists(record["image"]):
+                records.append(record)
+    return records
+
+
+def replay_treasure(image, latencies):
+    """
+    Read a widget capture, adding the stage latencies. Returns the fields read.
+    """
+    directions, elapsed = screenshot.timed(
+        screenshot.read_direction_arrows, image, debug=False
+    )
+    latencies.setdefault("read_direction_arrows", []).append(elapsed)
+
+    data, elapsed = screenshot.timed(
+        screenshot.read_hunt_from_screenshot, image, use_cache=False
+    )
+    latencies.setdefault("read_hunt_from_screenshot", []).append(elapsed)
+    for stage, seconds in screenshot.last_timings.items():
+        if stage != "total":
+            latencies.setdefault(f"  {stage}", []).append(seconds)
+
+    fields = hunt_fields(json.loads(data))
+    if fields is not None and isinstance(directions, list):
+        # The standalone arrow reader is checked as well
+        fields["arrows"] = directions
+    return fields
+
+
+def replay_player(image, latencies):
+    """
+    Read a coordinates capture, adding its latency. Returns the fields read.
+    """
+    data, elapsed = screenshot.timed(screenshot.process_coordinates_image, image)
+    latencies.setdefault("process_coordinates_image", []).append(elapsed)
+    return coordinates_fields(data)
+
+
+def compare(expected, fields, accuracy):
+    """
+    Count the matching fields of one record into accuracy[field] = [ok, total].
+    """
+    if "directions" in expected:
+        expected = dict(expected, arrows=expected["directions"])
+    for name, value in expected.items():
+        counts = accuracy.setdefault(name, [0, 0])
+        counts[1] += 1
+        if fields is not None and fields.get(name) == value:
+            counts[0] += 1
+
+
+def replay(records):
+    """
+    Replay the records and return (latencies, accuracy, mismatches).
+    """
+    latencies, accuracy, mismatches = {}, {}, []
+    for record in records:
+        image = np.asarray(Image.open(record["image"]).convert("RGB"))
+        if record["kind"] == "treasure":
+            fields = replay_treasure(image, latencies)
+        else:
+            fields = replay_player(image, latencies)
+
+        expected = record.get("expected")
+        if expected:
+            compare(expected, fields, accuracy)
+            if fields is None or any(
+                fields.get(name) != value for name, value in expected.items()
+            ):
+                mismatches.append((record["image"], expected, fields))
+    return latencies, accuracy, mismatches
+
+
+def report(latencies, accuracy, mismatches):
+    """
+    Return the report lines: p50/p95 per stage, then accuracy per field.
+    """
+    lines = ["Latency (ms)               calls     p50     p95"]
+    for stage, values in latencies.items():
+        p50, p95 = np.percentile(np.array(values) * 1000, [50, 95])
+        lines.append(f"{stage:<26} {len(values):>5} {p50:>7.1f} {p95:>7.1f}")
+
+    lines += ["", "Accuracy                    ok/total"]
+    for name, (ok, total) in accuracy.items():
+        lines.append(f"{name:<26} {ok:>4}/{total:<4} {ok / total:>6.1%}")
+
+    if mismatches:
+        lines += ["", "Mismatches:"]
+        for path, expected, fields in mismatches:
+            differences = {
+                name: (value, fields.get(name) if fields else None)
+                for name, value in expected.items()
+                if fields is None or fields.get(name) != value
+            }
+            lines.append(f"{path}: {differences}")
+    return lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m OCR.replay <recording folder> [...]")
+        sys.exit(1)
+
+    # Replays measure the pipeline, not the debug writes
+    debug_sink.sample_rate = 0
+    # Nor learn glyph templates from the corpus
+    screenshot.glyph_reader.learning = False
+    records = load_corpus(sys.argv[1:])
+    print(f"Replaying {len(records)} captures...")
+    for line in report(*replay(records)):
+        print(line)
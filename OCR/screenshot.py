@@ -1,15 +1,32 @@
 import re
 import json
+import time
+import logging
+import threading
 import cv2
 import pytesseract
 import numpy as np
 import os
-import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
-from PIL import Image, ImageEnhance, ImageFilter, ImageDraw, ImageFont
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+from OCR.debug_sink import debug_sink
+from OCR.section_cache import SectionCache, fingerprint
+from OCR.glyph_reader import GlyphReader
+from OCR.arrow_classifier import ArrowBatch, create_classifier
+from OCR.engine import (
+    WIDGET_CONFIG,
+    WIDGET_BLOCK_CONFIG,
+    HINT_ROW_CONFIG,
+    PLAYER_REGION_CONFIG,
+    get_engine,
+    latency_report,
+)
 
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+log = logging.getLogger(__name__)
+
 # Regex to fix bracket misreads:
 fix_brackets_pattern = re.compile(r"(\[-?\d{1,2},-?\d{1,2})1")
 
@@ -21,6 +38,105 @@ unwanted_pattern = re.compile(
     r"(EN COURS|ENCOURS|ENCcouRs|EN \(COURS|VALIDER|™|VALIDÉ|[0-9]+)", re.IGNORECASE
 )
 coordinate_pattern = re.compile(r"(-?\d+)\s*,\s*(-?\d+)")
+depart_pattern = re.compile(r"Départ\s+(\[[^\]]+\])")
+numeric_prefix_pattern = re.compile(r"^\d+\s+")
+numbered_depart_pattern = re.compile(r"^\d+\s*Départ")
+parenthesis_pattern = re.compile(r"([^)]*\))")
+
+# Tokenizer of split_merged_lines: the line parts that break it, spaces,
+# and runs of text that cannot start one of them
+token_pattern = re.compile(
+    r"(?P<step>ÉTAPE\s*:\s*\d+/\d+)"
+    r"|(?P<coords>\[-?\d+,\s*-?\d+\])"
+    r"|(?P<encours>EN\s*COURS)"
+    r"|(?P<space>\s+)"
+    r"|(?P<text>[^\s\[\)ÉE]+)"
+    r"|(?P<char>.)",
+    re.IGNORECASE,
+)
+tries_tail_pattern = re.compile(
+    r"\s*(?:in\s+)?(?:\d+\s+)?essais?\s+restants?", re.IGNORECASE
+)
+trailing_number_pattern = re.compile(r"\d+$")
+upper_letter_pattern = re.compile(r"[A-ZÀ-Ú]", re.IGNORECASE)
+lower_letter_pattern = re.compile(r"[a-zà-ú]", re.IGNORECASE)
+single_char_pattern = re.compile(r"^[a-zà-ú0-9+]$", re.IGNORECASE)
+standalone_in_pattern = re.compile(r"(?:^|\s)in(?:\s|$)")
+artifact_chars_table = str.maketrans("", "", "€™Ÿÿ<>")
+hint_chars_table = str.maketrans("", "", '«»"`™=;&')
+
+# Hint words: whitelisted words never start a new hint, blacklisted words
+# are dropped when alone, and lines made of a single artifact are skipped
+HINT_WHITELIST = ("Ankama", "Dofus")
+HINT_BLACKLIST_ALONE = ("Q", "ff", "S", "'", "À", "?", "Dofus")
+HINT_DROPPED_WORDS = frozenset(
+    word
+    for word in HINT_BLACKLIST_ALONE
+    if not any(white_word in word for white_word in HINT_WHITELIST)
+)
+HINT_ARTIFACTS = frozenset("&9B?")
+
+# Widget sections, in the order their lines are given to parse_ocr_output
+OCR_SECTIONS = ("header", "zone", "hints", "footer")
+
+# Bounded pool running the four section OCRs and the arrow detection at once
+OCR_WORKERS = 5
+ocr_executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+
+# Concurrent tesseract processes should not each spawn one thread per core
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Pixels between an arrow and the text of its hint row
+HINT_ROW_GAP = 4
+
+# Timing breakdown (in seconds) of the last read_hunt_from_screenshot call
+last_timings = {}
+
+# Lines of the sections already OCR'd, by fingerprint
+section_cache = SectionCache()
+
+# Coordinates glyph templates, learned from the tesseract reads
+glyph_reader = GlyphReader()
+
+# Direction classifier of the hint arrows (ARROW_CLASSIFIER in .env)
+arrow_classifier = create_classifier()
+
+# Widget layouts by (width, height, hint count), see detect_layout
+layout_cache = {}
+# Rows above and below a separator that must be darker than it
+LAYOUT_CHECK_OFFSET = 3
+
+# Mean word confidence (0-100) under which a section is read again
+MIN_SECTION_CONFIDENCE = 60
+# Cached sections passed their checks when they were read
+CACHED_CONFIDENCE = 100.0
+
+# Coordinates preprocessing for tesseract: the former PIL pipeline (800 px
+# tall, Lanczos, sharpened, contrast stretched, threshold 160) until
+# python -m OCR.benchmark_position picks better settings on recorded crops.
+# None scales the crop to POSITION_HEIGHT, else by this factor
+POSITION_SCALE = None
+POSITION_HEIGHT = 800
+POSITION_INTERPOLATION = cv2.INTER_LANCZOS4
+POSITION_SHARPEN = True
+# Padding around the text, as a fraction of the upscaled height
+POSITION_PADDING = 0.15
+# None for the Otsu level of each crop, else a fixed threshold applied
+# after a contrast stretch of POSITION_CONTRAST
+POSITION_THRESHOLD = 160
+POSITION_CONTRAST = 2.0
+# PIL's ImageFilter.SHARPEN
+SHARPEN_KERNEL = (
+    np.array([[-2, -2, -2], [-2, 32, -2], [-2, -2, -2]], dtype=np.float32) / 16
+)
+
+# A tesseract read of the coordinates is learned by the glyph reader when it
+# is the expected position, or when a second read with the other threshold
+# mode of preprocess_image_pos agrees with it
+GLYPH_CHECK_THRESHOLD = 160 if POSITION_THRESHOLD is None else None
+
+# Output buffers of preprocess_image_pos, per thread and size
+position_buffers = threading.local()
 
 
 def sanitize_hint_text(text):
@@ -28,9 +144,7 @@ def sanitize_hint_text(text):
     Sanitize hint text by removing unwanted characters and normalizing whitespace.
     """
     # Remove specific special characters that shouldn't be in hints
-    chars_to_remove = '«»"`™=;&'
-    for char in chars_to_remove:
-        text = text.replace(char, "")
+    text = text.translate(hint_chars_table)
 
     # Replace multiple spaces with a single space
     text = " ".join(text.split())
@@ -41,58 +155,102 @@ def split_merged_lines(line):
     """
     Split a merged line into separate logical segments.
     Returns a list of lines.
+
+    The line is tokenized once, then broken in a single pass over the
+    tokens: after the ÉTAPE x/y, after coordinates or a closing parenthesis
+    followed by a word, and before and after EN COURS.
     """
     # First, clean up any special characters or OCR artifacts
-    line = re.sub(r"[€™Ÿÿ<>]", "", line)
-
-    # Split at any occurrence of "essais restants" with optional prefix
-    line = re.sub(
-        r"\s*(?:in\s+)?(?:\d+\s+)?essais?\s+restants?.*$",
-        "\n",
-        line,
-        flags=re.IGNORECASE,
-    )
+    line = line.translate(artifact_chars_table)
 
-    # Known breaking points that should be on separate lines
-    break_points = [
-        (r"(ÉTAPE\s*:\s*\d+/\d+)(.+)", r"\1\n\2"),  # Split after ÉTAPE section
-        (r"(\[-?\d+,\s*-?\d+\])\s*([A-ZÀ-Ú])", r"\1\n\2"),  # Split after coordinates
-        (r"(\))\s+([A-ZÀ-Ú])", r"\1\n\2"),  # Split after closing parenthesis
-        (r"([a-zà-ú])\s+(EN\s*COURS)", r"\1\n\2"),  # Split before EN COURS
-        (r"(EN\s*COURS)\s+([A-ZÀ-Ú])", r"\1\n\2"),  # Split after EN COURS
+    # Drop "essais restants" with optional prefix, and what follows
+    tail = tries_tail_pattern.search(line)
+    if tail:
+        line = line[: tail.start()]
+
+    tokens = [
+        (match.lastgroup, match.group()) for match in token_pattern.finditer(line)
     ]
+    # Token indexes a new line starts at
+    breaks = set()
+    step_found = False
+    # EN COURS tokens already used by the break before (after) an EN COURS,
+    # which cannot be used again by the same rule
+    taken_before = taken_after = -1
+
+    for i, (kind, text) in enumerate(tokens):
+        count = len(tokens)
+        if kind == "step" and not step_found:
+            step_found = True
+            if i == count - 1 and len(trailing_number_pattern.search(text).group()) > 1:
+                # Something must follow the step: the last digit of y is split
+                tokens.append(("text", text[-1]))
+                tokens[i] = (kind, text[:-1])
+                count += 1
+            if i < count - 1:
+                breaks.add(i + 1)
+            continue
 
-    result = line
-    for pattern, replacement in break_points:
-        result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
+        if kind == "coords":
+            j = i + 2 if i + 1 < count and tokens[i + 1][0] == "space" else i + 1
+            if j < count and upper_letter_pattern.match(tokens[j][1]):
+                breaks.add(j)
+            continue
 
-    # Split into lines and clean each line
+        # The other breaks replace the spaces between two tokens
+        if i + 2 >= count or kind == "space" or tokens[i + 1][0] != "space":
+            continue
+        next_kind, next_text = tokens[i + 2]
+        if text == ")" and upper_letter_pattern.match(next_text):
+            breaks.add(i + 2)
+        if (
+            kind == "encours"
+            and i != taken_after
+            and upper_letter_pattern.match(next_text)
+        ):
+            breaks.add(i + 2)
+            if next_kind == "encours":
+                taken_after = i + 2
+        if (
+            next_kind == "encours"
+            and i != taken_before
+            and lower_letter_pattern.match(text[-1])
+        ):
+            breaks.add(i + 2)
+            taken_before = i + 2
+
+    segments, start = [], 0
+    for i in sorted(breaks):
+        segments.append("".join(text for _, text in tokens[start:i]))
+        start = i
+    segments.append("".join(text for _, text in tokens[start:]))
+
+    # Clean each line
     lines = []
-    for line in result.split("\n"):
-        line = line.strip()
-        if line:
-            # Remove single characters that are likely OCR artifacts
-            if not re.match(r"^[a-zà-ú0-9+]$", line, re.IGNORECASE):
-                # Remove any standalone "in"
-                line = re.sub(r"(?:^|\s)in(?:\s|$)", " ", line).strip()
-                # Remove special characters from the beginning of the line
-                # line = re.sub(r'^[^a-zA-ZÀ-ÿ0-9\[\(\s]+', '', line).strip()
-                if line:  # Only append non-empty lines
-                    lines.append(line)
-
-    print(f"DEBUG - Split line '{line}' into: {lines}")
-
+    for segment in segments:
+        segment = segment.strip()
+        # Remove single characters that are likely OCR artifacts
+        if segment and not single_char_pattern.match(segment):
+            # Remove any standalone "in"
+            segment = standalone_in_pattern.sub(" ", segment).strip()
+            if segment:  # Only append non-empty lines
+                lines.append(segment)
     return lines
 
 
-def parse_ocr_output(lines):
-    """Extract Étape, Départ, Zone (the next line after Départ), Hints, and Remaining Tries."""
+def is_hint_split_word(word):
+    """
+    Whether a capitalized word starts a new hint (when it is not the first word).
+    """
+    return (
+        word[0].isupper()
+        and not any(white_word in word for white_word in HINT_WHITELIST)
+        and word not in HINT_BLACKLIST_ALONE
+    )
 
-    # Preprocess lines to handle merged content
-    processed_lines = []
-    for line in lines:
-        processed_lines.extend(split_merged_lines(line))
 
+def parse_ocr_output(lines):
+    """Extract Étape, Départ, Zone (the next line after Départ), Hints, and Remaining Tries."""
     data = {
         "start_pos_zone": None,
         "start_pos_x": None,
@@ -104,390 +262,651 @@ def parse_ocr_output(lines):
         "last_hint_pos_x": None,
         "last_hint_pos_y": None,
     }
+    hints = data["hints"]
+
+    # "other" until Départ, "zone" until the zone name is closed, then "hints"
+    # until the remaining tries
+    state = "other"
+    # Words of the hint being read, and how many of them were checked for
+    # the start of a new hint
+    hint_words = []
+    checked = 0
+
+    for merged_line in lines:
+        for line in split_merged_lines(merged_line):
+            match = depart_pattern.search(line)
+            if match:
+                line = f"Départ {match.group(1)}"
+
+            # 1) Étape
+            m_steps = steps_pattern.search(line)
+            if m_steps:
+                data["step"] = int(m_steps.group(1))
+                data["total_steps"] = int(m_steps.group(2))
+                continue
 
-    expect_startPosZone = False
-    collecting_hints = False
-    current_hint = None
+            # Remove any numeric prefix that might interfere with parsing
+            line = numeric_prefix_pattern.sub("", line, count=1)
 
-    for line in processed_lines:
-        line = line.strip()
-        if not line:
-            continue
+            # 2) Départ
+            if "Départ" in line:
+                line = numbered_depart_pattern.sub("Départ", line, count=1)
 
-        print(f"Processing line: {line}")
+            m_startPos = startPos_pattern.search(line)
+            if m_startPos:
+                coords = m_startPos.group(1).strip("[]")
+                try:
+                    x, y = map(int, coords.split(","))
+                    data["start_pos_x"] = x
+                    data["start_pos_y"] = y
+                except ValueError:
+                    data["start_pos_x"] = None
+                    data["start_pos_y"] = None
+                state = "zone"
+                continue
 
-        match = re.search(r"Départ\s+(\[[^\]]+\])", line)
-        if match:
-            line = f"Départ {match.group(1)}"
+            # 3) Text under Départ (startPosZone), up to the closing parenthesis
+            if state == "zone":
+                if data["start_pos_zone"] is None:
+                    data["start_pos_zone"] = ""
+                parenthesis_match = parenthesis_pattern.search(line)
+                if parenthesis_match:
+                    data["start_pos_zone"] += f" {parenthesis_match.group(1).strip()}"
+                    state = "hints"
+                else:
+                    data["start_pos_zone"] += f" {line.strip()}"
+                continue
 
-        # 1) Étape
-        m_steps = steps_pattern.search(line)
-        if m_steps:
-            data["step"] = int(m_steps.group(1))  # Extract x
-            data["total_steps"] = int(m_steps.group(2))  # Extract y
-            continue
+            # 4) Remaining Tries
+            m_tries = tries_pattern.search(line)
+            if m_tries:
+                data["remaining_tries"] = int(m_tries.group(1))
+                if hint_words:
+                    hints.append({"hintText": " ".join(hint_words)})
+                hint_words, checked = [], 0
+                state = "other"
+                continue
 
-        # Remove any numeric prefix that might interfere with parsing
-        line = re.sub(r"^\d+\s+", "", line)
+            # 5) Hints
+            if state != "hints":
+                continue
+            sanitized_line = unwanted_pattern.sub("", line).strip()
+            # Remove specific unwanted single characters
+            if not sanitized_line or sanitized_line in HINT_ARTIFACTS:
+                continue
 
-        # 2) Départ
-        if "Départ" in line:
-            # Remove leading digit before "Départ"
-            line = re.sub(r"^\d+\s*Départ", "Départ", line)
+            # Remove standalone blacklisted words, then split the line before
+            # each capitalized word
+            words = [
+                word
+                for word in sanitized_line.split()
+                if word not in HINT_DROPPED_WORDS
+            ]
+            segments, segment = [], []
+            for i, word in enumerate(words):
+                if i > 0 and word[0].isupper() and word not in HINT_WHITELIST:
+                    segments.append(segment)
+                    segment = [word]
+                else:
+                    segment.append(word)
+            if segment:
+                segments.append(segment)
+
+            for segment in segments:
+                segment = sanitize_hint_text(" ".join(segment)).split()
+                if not segment:
+                    continue
+                hint_words += segment
+                # Save the words before the first capitalized word (not the
+                # first one) as a hint, once per added segment
+                for i in range(max(checked, 1), len(hint_words)):
+                    if is_hint_split_word(hint_words[i]):
+                        hints.append({"hintText": " ".join(hint_words[:i])})
+                        hint_words = hint_words[i:]
+                        checked = 1
+                        break
+                else:
+                    checked = len(hint_words)
 
-        m_startPos = startPos_pattern.search(line)
-        if m_startPos:
-            coords = m_startPos.group(1).strip("[]")  # Remove square brackets
-            try:
-                x, y = map(int, coords.split(","))
-                data["start_pos_x"] = x
-                data["start_pos_y"] = y
-            except ValueError:
-                data["start_pos_x"] = None
-                data["start_pos_y"] = None
-            expect_startPosZone = True
-            continue
+    # Handle last hint if exists
+    if hint_words:
+        hints.append({"hintText": " ".join(hint_words)})
 
-        # 3) Text under Départ (startPosZone)
-        if expect_startPosZone:
-            if "start_pos_zone" not in data or data["start_pos_zone"] is None:
-                data["start_pos_zone"] = ""
-
-            # Only add text up to the closing parenthesis
-            parenthesis_match = re.search(r"([^)]*\))", line)
-            if parenthesis_match:
-                data["start_pos_zone"] += f" {parenthesis_match.group(1).strip()}"
-                expect_startPosZone = False
-                collecting_hints = True
-            else:
-                data["start_pos_zone"] += f" {line.strip()}"
-            continue
+    log.debug("Parsed %d lines, %d hints", len(lines), len(hints))
+    return data
 
-        # 4) Remaining Tries
-        m_tries = tries_pattern.search(line)
-        if m_tries:
-            data["remaining_tries"] = int(m_tries.group(1))
-            if current_hint:
-                sanitized_hint = sanitize_hint_text(current_hint)
-                if sanitized_hint:
-                    data["hints"].append({"hintText": sanitized_hint})
-                current_hint = None
-            collecting_hints = False
-            continue
 
-        # 5) Hints
-        if collecting_hints:
-            print(f"DEBUG: Processing potential hint line: {line}")
+def rgb_array(image):
+    """
+    Return an image as an RGB array, without copying arrays (frame views).
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image)
 
-            # Remove unwanted patterns but keep the rest
-            sanitized_line = unwanted_pattern.sub("", line).strip()
 
-            print(f"DEBUG: Sanitized line: {sanitized_line}")
+def timed(function, *args, **kwargs):
+    """
+    Call a function and return (result, elapsed seconds).
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
 
-            # Remove specific unwanted single characters
-            if re.match(r"^[&9B?]$", sanitized_line):
-                print(f"DEBUG: Skipping single character line: {sanitized_line}")
-                continue
 
-            if sanitized_line:
-                whitelist = ["Ankama", "Dofus"]  # Dofus is whitelisted
-                blacklist = []
-                blacklist_alone = [
-                    "Q",
-                    "ff",
-                    "S",
-                    "'",
-                    "À",
-                    "?",
-                    "Dofus",
-                ]
-
-                # First remove standalone blacklisted words from the line, but protect whitelisted words
-                cleaned_line = sanitized_line
-                words = cleaned_line.split()
-                cleaned_words = [
-                    word
-                    for word in words
-                    if not (
-                        word in blacklist_alone
-                        and not any(white_word in word for white_word in whitelist)
-                    )
-                ]
-                cleaned_line = " ".join(cleaned_words)
-
-                # Then remove blacklisted words from the line, except whitelisted ones
-                for word in blacklist:
-                    if not any(white_word in word for white_word in whitelist):
-                        cleaned_line = cleaned_line.replace(word, "")
-
-                # Split line based on capitalized words
-                def is_split_word(word, index):
-                    return (
-                        index > 0
-                        and word[0].isupper()  # Capitalized word
-                        and word not in whitelist  # Not whitelisted
-                    )
+def ocr_section_lines(image, section_name, config=WIDGET_CONFIG):
+    """
+    OCR one widget section and group the recognized words into lines.
 
-                words = cleaned_line.split()
-                segments = []
-                segment = []
-
-                for i, word in enumerate(words):
-                    if is_split_word(word, i):
-                        segments.append(" ".join(segment))
-                        segment = [word]  # Start new segment
-                    else:
-                        segment.append(word)
-                # Add the last segment
-                if segment:
-                    segments.append(" ".join(segment))
-
-                sanitized_segments = [
-                    sanitize_hint_text(segment) for segment in segments
-                ]
-                for segment in sanitized_segments:
-                    # Sanitize the segment
-                    cleaned_line = sanitize_hint_text(segment)
-                    print(f"DEBUG: Cleaned segment: {cleaned_line}")
-
-                    # If we have a cleaned line, always try to append it first
-                    if cleaned_line:
-                        if current_hint:
-                            current_hint += f" {cleaned_line}"
-                            print(f"DEBUG: Appending to current hint: {current_hint}")
-                        else:
-                            current_hint = cleaned_line
-                            print(f"DEBUG: Started first hint: {current_hint}")
-
-                        # Now check for splits after appending
-                        words = current_hint.split()
-                        split_points = []
-                        for i, word in enumerate(words):
-                            if (
-                                i > 0
-                                and word[0].isupper()
-                                and not any(
-                                    white_word in word for white_word in whitelist
-                                )
-                                and word not in blacklist_alone
-                            ):
-                                # Found a split point, save current hint and start new one
-                                first_part = " ".join(words[:i])
-                                second_part = " ".join(words[i:])
-
-                                # Save the first part
-                                sanitized_hint = sanitize_hint_text(first_part)
-                                if sanitized_hint:
-                                    data["hints"].append({"hintText": sanitized_hint})
-                                print(f"DEBUG: Saved split hint: {sanitized_hint}")
-
-                                # Start new hint with remaining part
-                                current_hint = second_part
-                                print(
-                                    f"DEBUG: Started new hint from split: {current_hint}"
-                                )
-                                break  # Exit after first split
+    Returns:
+        tuple: (lines, mean confidence of the words, 0 when none)
+    """
+    ocr_data = get_engine(config).image_to_data(image)
 
-    # Handle last hint if exists
-    if current_hint:
-        sanitized_hint = sanitize_hint_text(current_hint)
-        if sanitized_hint:
-            data["hints"].append({"hintText": sanitized_hint})
+    current_line = []
+    current_line_num = -1
+    lines = []
+    confidences = []
+    debug = log.isEnabledFor(logging.DEBUG)
+
+    for i in range(len(ocr_data["text"])):
+        if int(ocr_data["conf"][i]) > 0:  # Filter out low confidence results
+            text = ocr_data["text"][i].strip()
+            line_num = ocr_data["line_num"][i]
+            conf = ocr_data["conf"][i]
+
+            if debug:
+                log.debug(
+                    "%s OCR block: text=%r, confidence=%s, line=%s",
+                    section_name,
+                    text,
+                    conf,
+                    line_num,
+                )
 
-        print(f"DEBUG: Saved final hint: {sanitized_hint}")
+            if text:  # Only process non-empty text
+                confidences.append(float(conf))
+                if line_num != current_line_num:
+                    if current_line:
+                        lines.append(" ".join(current_line))
+                    current_line = [text]
+                    current_line_num = line_num
+                else:
+                    current_line.append(text)
 
-    return data
+    # Add the last line if it exists
+    if current_line:
+        lines.append(" ".join(current_line))
+
+    log.debug("Extracted %s lines: %s", section_name, lines)
+    return lines, (sum(confidences) / len(confidences) if confidences else 0.0)
 
 
-def read_hunt_from_screenshot(screenshot, retries=3):
+def fingerprint_sections(sections):
     """
-    Process a screenshot to extract hunt information including player direction.
+    Fingerprint each widget section.
+    """
+    return {name: fingerprint(image) for name, image in sections.items()}
 
-    Args:
-        screenshot: PIL Image object containing the hunt screenshot
-        retries (int): Number of retry attempts if processing fails
 
-    Returns:
-        str: JSON string containing parsed hunt data or error message
+def format_timings(timings):
     """
-    for attempt in range(retries):
-        try:
-            # Preprocess and get four separate images
-            header_img, zone_img, hint_img, footer_img = preprocess_image(screenshot)
+    Return the timing breakdown of a widget read as one line.
+    """
+    stages = ", ".join(
+        f"{name}={seconds * 1000:.0f}ms"
+        for name, seconds in timings.items()
+        if name != "total"
+    )
+    return f"total={timings['total'] * 1000:.0f}ms ({stages})"
 
-            directions = read_direction_arrows(screenshot)
 
-            # Configure pytesseract
-            custom_config = r"--oem 1 --psm 3 -l fra"  # French language
+def run_ocr_jobs(jobs, parallel=True):
+    """
+    OCR {name: (image, config)} jobs, on the OCR pool if `parallel` is set.
 
-            # Process header section
-            header_data = pytesseract.image_to_data(
-                header_img, config=custom_config, output_type=pytesseract.Output.DICT
+    Returns:
+        dict: {name: (lines, seconds, confidence)}
+    """
+    if parallel:
+        futures = {
+            name: ocr_executor.submit(
+                timed,
+                ocr_section_lines,
+                image,
+                name.replace("_", " ").capitalize(),
+                config,
             )
-
-            # Process zone section
-            zone_data = pytesseract.image_to_data(
-                zone_img, config=custom_config, output_type=pytesseract.Output.DICT
+            for name, (image, config) in jobs.items()
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    else:
+        results = {
+            name: timed(
+                ocr_section_lines, image, name.replace("_", " ").capitalize(), config
             )
+            for name, (image, config) in jobs.items()
+        }
+    return {
+        name: (lines, seconds, confidence)
+        for name, ((lines, confidence), seconds) in results.items()
+    }
 
-            # Process hints section
-            hints_data = pytesseract.image_to_data(
-                hint_img, config=custom_config, output_type=pytesseract.Output.DICT
-            )
 
-            # Process footer section
-            footer_data = pytesseract.image_to_data(
-                footer_img, config=custom_config, output_type=pytesseract.Output.DICT
-            )
+def warm_up():
+    """
+    Create the OCR engines, the OCR pool threads and the arrow classifier,
+    and import the layout detection ahead of the first read.
 
-            # Debug - print all recognized text blocks for each section
-            sections = {
-                "Header": header_data,
-                "Zone": zone_data,
-                "Hints": hints_data,
-                "Footer": footer_data,
-            }
+    Returns:
+        list: Names of the engines created
+    """
+    from scipy.signal import find_peaks  # noqa: F401 (imported by detect_layout)
 
-            lines_by_section = {}
-            for section_name, ocr_data in sections.items():
-                current_line = []
-                current_line_num = -1
-                lines = []
-
-                print(f"\nDebug - {section_name} section OCR blocks:")
-                for i in range(len(ocr_data["text"])):
-                    if (
-                        int(ocr_data["conf"][i]) > 0
-                    ):  # Filter out low confidence results
-                        text = ocr_data["text"][i].strip()
-                        line_num = ocr_data["line_num"][i]
-                        conf = ocr_data["conf"][i]
-
-                        print(
-                            f"Debug - OCR block: text='{text}', confidence={conf}, line={line_num}"
-                        )
-
-                        if text:  # Only process non-empty text
-                            if line_num != current_line_num:
-                                if current_line:
-                                    lines.append(" ".join(current_line))
-                                current_line = [text]
-                                current_line_num = line_num
-                            else:
-                                current_line.append(text)
-
-                # Add the last line if it exists
-                if current_line:
-                    lines.append(" ".join(current_line))
-
-                lines_by_section[section_name.lower()] = lines
-                print(f"Debug - Extracted {section_name} lines: {lines}")
-
-            # Combine all lines in the correct order
-            all_lines = (
-                lines_by_section["header"]
-                + lines_by_section["zone"]
-                + lines_by_section["hints"]
-                + lines_by_section["footer"]
-            )
+    engines = [
+        get_engine(config)
+        for config in (WIDGET_CONFIG, HINT_ROW_CONFIG, PLAYER_REGION_CONFIG)
+    ]
+    arrow_classifier.warm_up()
+    for future in [ocr_executor.submit(time.sleep, 0) for _ in range(OCR_WORKERS)]:
+        future.result()
+    return [engine.name for engine in engines]
 
-            # Parse combined OCR output
-            hunt_data = parse_ocr_output(all_lines)
 
-            # Debug logging for direction assignment
-            print(f"Debug - hunt_data has hints?: {'hints' in hunt_data}")
-            print(f"Debug - hints not empty?: {bool(hunt_data.get('hints'))}")
-            print(f"Debug - directions type: {type(directions)}")
-            print(f"Debug - directions content: {directions}")
+def upscaled(image, scale=2):
+    """
+    Retry variant: the section enlarged, for small or thin glyphs.
+    """
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
 
-            # Parse directions if it's a string
-            if isinstance(directions, str):
-                try:
-                    directions = json.loads(directions)
-                    print(f"Debug - parsed directions: {directions}")
-                except json.JSONDecodeError as e:
-                    print(f"Debug - failed to parse directions: {e}")
 
-            # Add directions to hints in order
+def thresholded(image):
+    """
+    Retry variant: the enlarged section binarized (Otsu), dark text on white.
+    """
+    gray = cv2.cvtColor(upscaled(image), cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if np.count_nonzero(binary) < binary.size // 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+# Preprocessing tried in turn on the sections failing their checks, as
+# (name, transform, config or None for the section's usual config)
+RETRY_VARIANTS = (
+    ("upscale", upscaled, None),
+    ("threshold", thresholded, None),
+    ("block", thresholded, WIDGET_BLOCK_CONFIG),
+)
+
+
+def parse_sections(section_results, row_hints=None):
+    """
+    Parse the lines of the sections in order. In row mode, `row_hints`
+    (stored hints and the last row) replace the hints section.
+    """
+    if row_hints is None:
+        return parse_ocr_output(
+            [line for name in OCR_SECTIONS for line in section_results[name][0]]
+        )
+    hunt_data = parse_ocr_output(
+        [
+            line
+            for name in ("header", "zone", "footer")
+            for line in section_results[name][0]
+        ]
+    )
+    hunt_data["hints"] = [{"hintText": text} for text in row_hints]
+    return hunt_data
+
+
+def failed_sections(hunt_data, section_results, hint_check=None):
+    """
+    Return the sections to read again: the ones with a low confidence, and
+    the ones whose fields did not parse (ÉTAPE x/y, Départ [x,y], a last
+    hint matching no clue).
+    """
+    failed = {
+        name
+        for name, (_, _, confidence) in section_results.items()
+        if name in OCR_SECTIONS and confidence < MIN_SECTION_CONFIDENCE
+    }
+    if hunt_data["step"] is None:
+        failed.add("header")
+    if hunt_data["start_pos_x"] is None or hunt_data["start_pos_zone"] is None:
+        failed.add("zone")
+    hints = hunt_data["hints"]
+    if not hints or (hint_check is not None and not hint_check(hints[-1]["hintText"])):
+        failed.add("hints")
+    # In row mode the hints section was not read
+    return failed & set(section_results)
+
+
+def hint_row_boxes(detections, width, height, right_margin_percent=0.38):
+    """
+    Split the hint list into one box per arrow, as (left, top, right, bottom).
+
+    Rows are centered on their arrow and as tall as the arrow spacing. The
+    box starts right of the arrow and stops before the EN COURS badge.
+    """
+    centers = [y + h / 2 for _, _, y, _, h, _ in detections]
+    if len(centers) > 1:
+        pitch = float(np.median(np.diff(centers)))
+    else:
+        pitch = 2.0 * detections[0][4]
+    right = int(width * (1 - right_margin_percent))
+
+    boxes = []
+    for (_, x, _, w, _, _), center in zip(detections, centers):
+        top = max(int(center - pitch / 2), 0)
+        bottom = min(int(center + pitch / 2), height)
+        boxes.append((x + w + HINT_ROW_GAP, top, right, bottom))
+    return boxes
+
+
+def carried_hint_texts(progression, row_count):
+    """
+    Return the stored hint texts reused for every row but the last one, or
+    None when the stored progression does not cover them.
+    """
+    if row_count == 1:
+        return []
+    if not progression:
+        return None
+    texts = [hint.get("hintText") for hint in progression.get("hints") or []]
+    texts = texts[: row_count - 1]
+    if len(texts) < row_count - 1 or not all(texts):
+        return None
+    return texts
+
+
+def same_step(hunt_data, progression):
+    """
+    Whether parsed hunt data and a stored progression are the same hunt step.
+    """
+    return bool(progression) and all(
+        hunt_data.get(key) is not None and hunt_data.get(key) == progression.get(key)
+        for key in ("step", "start_pos_x", "start_pos_y")
+    )
+
+
+def clean_hint_row(text):
+    """
+    Clean the text OCR'd from a single hint row.
+    """
+    text = unwanted_pattern.sub("", text)
+    # Leftovers of the arrow glyph
+    text = re.sub(r"^[^\w]+", "", text)
+    return sanitize_hint_text(text)
+
+
+def read_hunt_from_screenshot(
+    screenshot,
+    retries=len(RETRY_VARIANTS),
+    parallel=True,
+    use_cache=True,
+    progression=None,
+    hint_check=None,
+):
+    """
+    Process a screenshot to extract hunt information including player direction.
+
+    Each section keeps its lines and OCR confidence. Only the sections with a
+    low confidence or whose fields did not parse are read again, with the
+    next preprocessing variant of RETRY_VARIANTS, so a good read never pays
+    for retries.
+
+    Args:
+        screenshot: RGB array (frame source view) or PIL Image of the widget
+        retries (int): Maximum number of variants tried for the failed sections
+        parallel (bool): Run the section OCRs concurrently
+        use_cache (bool): Reuse the lines of sections identical to a previous read
+        progression (dict): Last stored progression. Its hints are reused
+            for the rows already on screen, and only the last row is OCR'd.
+        hint_check (callable): Whether the text of the last hint matches a
+            known clue; the hints are read again when it does not
+
+    Returns:
+        str: JSON string containing parsed hunt data or error message
+    """
+    screenshot = rgb_array(screenshot)
+    try:
+        start = time.perf_counter()
+        timings = {}
+
+        # Arrows first: their positions split the hint list into rows, and
+        # their count selects the cached widget layout
+        hint_count = None
+        try:
+            detections, timings["arrows"] = timed(detect_arrows, screenshot)
+            directions = [direction for direction, *_ in detections]
+            confidences = [detection[5] for detection in detections]
+            hint_count = len(detections)
+            log.debug("Final arrows: %s", directions)
+        except Exception as e:
+            log.warning("Arrow detection failed: %s", e)
+            detections, confidences = [], []
+            directions = json.dumps({"error": f"Arrow detection failed: {str(e)}"})
+
+        # Preprocess and get four separate images
+        section_images, timings["preprocess"] = timed(
+            preprocess_image, screenshot, hint_count=hint_count
+        )
+        sections = dict(zip(OCR_SECTIONS, section_images))
+
+        # Only the last row is new when the stored hints cover the others
+        carried = None
+        if detections:
+            carried = carried_hint_texts(progression, len(detections))
+        wanted = [
+            name
+            for name in OCR_SECTIONS
+            if not (carried is not None and name == "hints")
+        ]
+
+        # Unchanged sections are taken from the cache instead of the OCR
+        section_results = {}
+        if use_cache:
+            fingerprints, timings["fingerprint"] = timed(fingerprint_sections, sections)
+            section_cache.set_header(fingerprints["header"])
+            for name in wanted:
+                lines = section_cache.get(name, fingerprints[name])
+                if lines is not None:
+                    section_results[name] = (lines, 0.0, CACHED_CONFIDENCE)
+        reused = len(section_results)
+
+        jobs = {
+            name: (sections[name], WIDGET_CONFIG)
+            for name in wanted
+            if name not in section_results
+        }
+        if carried is not None:
+            height, width = screenshot.shape[:2]
+            left, top, right, bottom = hint_row_boxes(detections, width, height)[-1]
+            jobs["hint_row"] = (screenshot[top:bottom, left:right], HINT_ROW_CONFIG)
+        section_results.update(run_ocr_jobs(jobs, parallel))
+        ocr_read = set(jobs) & set(OCR_SECTIONS)
+
+        row_hints = None
+        if carried is not None:
+            row_lines, timings["ocr_hint_row"], _ = section_results.pop("hint_row")
+            new_hint = clean_hint_row(" ".join(row_lines))
+            hunt_data, timings["parse"] = timed(
+                parse_sections, section_results, carried + [new_hint]
+            )
             if (
-                "hints" in hunt_data
-                and hunt_data["hints"]
-                and isinstance(directions, list)
+                new_hint
+                and (hint_check is None or hint_check(new_hint))
+                and (not carried or same_step(hunt_data, progression))
             ):
-                print(f"Debug - Number of hints: {len(hunt_data['hints'])}")
-                print(f"Debug - Number of directions: {len(directions)}")
-
-                for idx, hint in enumerate(hunt_data["hints"]):
-                    print(f"Debug - Processing hint {idx}")
-                    if idx < len(directions):
-                        hint["hintDirection"] = directions[idx]
-                        print(
-                            f"Debug - Assigned direction {directions[idx]} to hint {idx}"
-                        )
-                    else:
-                        print(f"Debug - No direction available for hint {idx}")
-
-            # Log the last hint
-            if "hints" in hunt_data and hunt_data["hints"]:
-                print(
-                    f"Last hint: {json.dumps(hunt_data['hints'][-1], indent=2, ensure_ascii=False)}"
+                row_hints = carried + [new_hint]
+                log.debug(
+                    "Reused %d stored hints, read last row: %s", len(carried), new_hint
                 )
+            else:
+                log.info("Stored hints do not match, reading the whole list")
+
+        if row_hints is None:
+            if "hints" not in section_results:
+                lines = (
+                    section_cache.get("hints", fingerprints["hints"])
+                    if use_cache
+                    else None
+                )
+                if lines is not None:
+                    section_results["hints"] = (lines, 0.0, CACHED_CONFIDENCE)
+                    reused += 1
+                else:
+                    section_results.update(
+                        run_ocr_jobs({"hints": (sections["hints"], WIDGET_CONFIG)})
+                    )
+                    ocr_read.add("hints")
 
-            return json.dumps(hunt_data, indent=2, ensure_ascii=False)
+            # Parse combined OCR output
+            hunt_data, timings["parse"] = timed(parse_sections, section_results)
+
+        # Read the failed sections again with escalating variants, keeping
+        # the sections that already passed
+        failed = failed_sections(hunt_data, section_results, hint_check)
+        for variant, transform, config in RETRY_VARIANTS[:retries]:
+            if not failed:
+                break
+            log.info("Reading %s again (%s)", failed, variant)
+            retried = run_ocr_jobs(
+                {
+                    name: (transform(sections[name]), config or WIDGET_CONFIG)
+                    for name in failed
+                },
+                parallel,
+            )
+            still_failed = failed_sections(
+                parse_sections(dict(section_results, **retried), row_hints),
+                dict(section_results, **retried),
+                hint_check,
+            )
+            for name, result in retried.items():
+                timings[f"retry_{name}"] = timings.get(f"retry_{name}", 0) + result[1]
+                # A read that passes wins, otherwise the most confident one
+                if name not in still_failed or result[2] > section_results[name][2]:
+                    section_results[name] = result
+            hunt_data, timings["parse"] = timed(
+                parse_sections, section_results, row_hints
+            )
+            failed = failed_sections(hunt_data, section_results, hint_check)
+        if failed:
+            log.warning("Sections still failing: %s", failed)
 
-        except Exception as e:
-            if attempt < retries - 1:
-                print(f"Attempt {attempt + 1} failed with error: {e}")
-                print("Retrying...")
-                continue
+        for name in OCR_SECTIONS:
+            if name in section_results:
+                timings[f"ocr_{name}"] = section_results[name][1]
 
-            error_response = {
-                "error": "Failed to process screenshot",
-                "details": str(e),
-            }
-            return json.dumps(error_response, ensure_ascii=False)
+        # Parse directions if it's a string
+        if isinstance(directions, str):
+            try:
+                directions = json.loads(directions)
+            except json.JSONDecodeError as e:
+                log.warning("Failed to parse directions: %s", e)
+
+        # Add directions to hints in order
+        if "hints" in hunt_data and hunt_data["hints"] and isinstance(directions, list):
+            for hint, direction, confidence in zip(
+                hunt_data["hints"], directions, confidences
+            ):
+                hint["hintDirection"] = direction
+                hint["hintDirectionConfidence"] = round(confidence, 3)
+            log.debug(
+                "Assigned %d directions to %d hints",
+                len(directions),
+                len(hunt_data["hints"]),
+            )
+
+        # Log the last hint
+        if "hints" in hunt_data and hunt_data["hints"]:
+            log.debug("Last hint: %s", hunt_data["hints"][-1])
+
+        if use_cache:
+            # Only the sections that passed their checks are reused
+            for name in ocr_read - failed:
+                section_cache.put(name, fingerprints[name], section_results[name][0])
+            log.debug(
+                "OCR cache: %d/%d sections reused, hit rate %.0f%% (%d/%d)",
+                reused,
+                reused + len(ocr_read),
+                section_cache.hit_rate() * 100,
+                section_cache.hits,
+                section_cache.hits + section_cache.misses,
+            )
+
+        timings["total"] = time.perf_counter() - start
+        last_timings.clear()
+        last_timings.update(timings)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Timing - %s", format_timings(timings))
+
+        return json.dumps(hunt_data, indent=2, ensure_ascii=False)
+
+    except Exception as e:
+        debug_sink.dump_failure(f"read_hunt_from_screenshot: {e}")
+        error_response = {
+            "error": "Failed to process screenshot",
+            "details": str(e),
+        }
+        return json.dumps(error_response, ensure_ascii=False)
 
 
 # Player Coordinates
 ###############################################
 
 
-def preprocess_image(
-    image: Image.Image,
-    debug: bool = True,
-    left_margin_percent: float = 0.025,
-    right_margin_percent: float = 0.38,
-    crop_width_percent: float = 0.1,
-) -> tuple[Image.Image, Image.Image, Image.Image]:
+def plot_intensity_analysis(path, row_means_smooth, peaks, valid_peaks):
     """
-    Split the game image into three parts: header (ETAPE), hints section, and footer (essais).
-    Also crops the left side of the hints section.
+    Plot the row intensity profile used to split the widget (debug only).
+    """
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(15, 10))
+    top = figure.add_subplot(211)
+    top.plot(row_means_smooth, label="Smoothed Intensity")
+    top.axhline(y=40, color="r", linestyle="--", label="Min Height (40)")
+    top.axhline(y=50, color="g", linestyle="--", label="Max Height (50)")
+    top.plot(peaks, row_means_smooth[peaks], "rx", label="All Peaks")
+    top.plot(
+        valid_peaks, row_means_smooth[valid_peaks], "go", label="Line Peaks (40-50)"
+    )
+    top.set_title("Row-wise Mean Intensity")
+    top.legend()
 
-    Args:
-        image: Input PIL Image
-        debug: Whether to save debug images
-        left_margin_percent: Percentage of image width to remove from left for hints
-        crop_width_percent: Additional percentage of width to remove from left for hints
+    bottom = figure.add_subplot(212)
+    bottom.plot(np.gradient(row_means_smooth), label="Gradient")
+    bottom.set_title("Intensity Gradient")
+    bottom.legend()
+    figure.savefig(path)
 
-    Returns:
-        Tuple of (header_image, hints_image, footer_image)
+
+def render_detected_splits(img_array, valid_peaks):
     """
-    if debug:
-        debug_dir = "debug_ocr"
-        os.makedirs(debug_dir, exist_ok=True)
-        image.save(os.path.join(debug_dir, "1_original.png"))
+    Draw the detected separator lines on the widget (debug only).
+    """
+    debug_img = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+    for y in valid_peaks:
+        cv2.line(debug_img, (0, int(y)), (debug_img.shape[1], int(y)), (0, 255, 0), 2)
+    return debug_img
 
-    # Ensure we have the correct image format and convert to array
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-    img_array = np.array(image)
-    height, width = img_array.shape[:2]
 
-    # Convert to grayscale without using cv2.cvtColor
-    gray = np.array(image.convert("L"))
+def detect_layout(gray):
+    """
+    Find the separator rows of the widget and the section splits.
 
-    if debug:
-        Image.fromarray(gray).save(os.path.join(debug_dir, "2a_grayscale.png"))
+    Returns:
+        dict: valid_peaks (separator rows), header_split, zone_split and
+        footer_split (before padding), plus the intensity profile and all
+        peaks for the debug plot
+    """
+    from scipy.signal import find_peaks
+
+    height = gray.shape[0]
 
     # Calculate row-wise mean intensity
     row_means = np.mean(gray, axis=1)
@@ -510,45 +929,13 @@ def preprocess_image(
     peak_heights = row_means_smooth[peaks]
     valid_peaks = peaks[np.where((peak_heights >= 40) & (peak_heights <= 50))[0]]
 
-    if debug:
-        plt.figure(figsize=(15, 10))
-        plt.subplot(211)
-        plt.plot(row_means_smooth, label="Smoothed Intensity")
-        plt.axhline(y=40, color="r", linestyle="--", label="Min Height (40)")
-        plt.axhline(y=50, color="g", linestyle="--", label="Max Height (50)")
-        plt.plot(peaks, row_means_smooth[peaks], "rx", label="All Peaks")
-        plt.plot(
-            valid_peaks, row_means_smooth[valid_peaks], "go", label="Line Peaks (40-50)"
-        )
-        plt.title("Row-wise Mean Intensity")
-        plt.legend()
-
-        # Create a copy for visualization
-        debug_img = img_array.copy()
-        for y in valid_peaks:
-            cv2.line(debug_img, (0, y), (width, y), (0, 255, 0), 2)
-        Image.fromarray(debug_img).save(
-            os.path.join(debug_dir, "2b_detected_splits.png")
-        )
-
-        plt.subplot(212)
-        plt.plot(np.gradient(row_means_smooth), label="Gradient")
-        plt.title("Intensity Gradient")
-        plt.legend()
-        plt.savefig(os.path.join(debug_dir, "2c_intensity_analysis.png"))
-        plt.close()
-
     if len(valid_peaks) < 2:
         raise ValueError(
             f"Could not detect enough horizontal lines (found {len(valid_peaks)})"
         )
 
     # Sort peaks by position
-    valid_peaks = sorted(valid_peaks)
-
-    # Get the splits
-    header_split = valid_peaks[1]
-    zone_split = valid_peaks[2]
+    valid_peaks = sorted(int(peak) for peak in valid_peaks)
 
     # For footer, look for the last significant intensity change
     lower_third_start = height * 2 // 3
@@ -559,54 +946,152 @@ def preprocess_image(
     ]
 
     if len(significant_changes) > 0:
-        footer_split = lower_third_start + significant_changes[0]
+        footer_split = lower_third_start + int(significant_changes[0])
     else:
         footer_split = valid_peaks[-1]
 
+    return {
+        "valid_peaks": valid_peaks,
+        "header_split": valid_peaks[1],
+        "zone_split": valid_peaks[2],
+        "footer_split": footer_split,
+        "row_means_smooth": row_means_smooth,
+        "peaks": peaks,
+    }
+
+
+def layout_matches(gray, layout):
+    """
+    Check a cached layout by sampling its separator rows: each must still
+    be in the 40-50 intensity band and brighter than the rows around it.
+    """
+    height = gray.shape[0]
+
+    def smoothed_mean(row):
+        return gray[max(row - 1, 0) : min(row + 2, height)].mean()
+
+    for row in layout["valid_peaks"]:
+        value = smoothed_mean(row)
+        if not 40 <= value <= 50:
+            return False
+        for neighbor in (row - LAYOUT_CHECK_OFFSET, row + LAYOUT_CHECK_OFFSET):
+            if 0 <= neighbor < height and smoothed_mean(neighbor) >= value:
+                return False
+    return True
+
+
+def preprocess_image(
+    image,
+    debug: bool = True,
+    hint_count: int = None,
+    left_margin_percent: float = 0.025,
+    right_margin_percent: float = 0.38,
+    crop_width_percent: float = 0.1,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split the game image into three parts: header (ETAPE), hints section, and footer (essais).
+    Also crops the left side of the hints section.
+
+    Args:
+        image: Input RGB array or PIL Image
+        debug: Whether to capture debug images (written by the debug sink)
+        hint_count: Number of hint arrows, to reuse the cached layout
+        left_margin_percent: Percentage of image width to remove from left for hints
+        crop_width_percent: Additional percentage of width to remove from left for hints
+
+    Returns:
+        Tuple of (header, zone, hints, footer) views of the RGB array
+    """
+    if debug:
+        frame = debug_sink.frame("widget", "debug_ocr")
+        frame.image("1_original.png", image)
+
+    img_array = rgb_array(image)
+    height, width = img_array.shape[:2]
+
+    # Same weights as PIL's "L" conversion
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+
+    if debug:
+        frame.image("2a_grayscale.png", gray)
+
+    # The separators only move when the hint count changes, so a cached
+    # layout is reused as long as its separator rows still look the same
+    key = (width, height, hint_count)
+    layout = layout_cache.get(key) if hint_count is not None else None
+    if layout is not None and not layout_matches(gray, layout):
+        log.info("Widget layout changed, detecting separators again")
+        layout = None
+    if layout is None:
+        detection = detect_layout(gray)
+        layout = {
+            name: detection[name]
+            for name in ("valid_peaks", "header_split", "zone_split", "footer_split")
+        }
+        if hint_count is not None:
+            layout_cache[key] = layout
+        peaks = detection["peaks"]
+        if debug:
+            frame.plot(
+                "2c_intensity_analysis.png",
+                plot_intensity_analysis,
+                detection["row_means_smooth"],
+                peaks,
+                np.array(layout["valid_peaks"]),
+            )
+    else:
+        peaks = layout["valid_peaks"]
+
+    valid_peaks = layout["valid_peaks"]
+    if debug:
+        frame.render(
+            "2b_detected_splits.png", render_detected_splits, img_array, valid_peaks
+        )
+
+    header_split = layout["header_split"]
+    zone_split = layout["zone_split"]
+    footer_split = layout["footer_split"]
+
     # Add minimal padding
     padding = 10
     header_split += padding
     zone_split += padding
     footer_split += padding
 
-    # Create the section
-    header_img = Image.fromarray(img_array[:header_split])
-    zone_img = Image.fromarray(img_array[header_split:zone_split])
-    hints_img = Image.fromarray(img_array[zone_split:footer_split])
-    footer_img = Image.fromarray(img_array[footer_split:])
+    # Sections are views of the capture, not copies
+    header_img = img_array[:header_split]
+    zone_img = img_array[header_split:zone_split]
+    hints_img = img_array[zone_split:footer_split]
+    footer_img = img_array[footer_split:]
 
     if debug:
-        header_img.save(os.path.join(debug_dir, "3_header.png"))
-        zone_img.save(os.path.join(debug_dir, "4_zone.png"))
-        hints_img.save(os.path.join(debug_dir, "5_hints.png"))
-        footer_img.save(os.path.join(debug_dir, "6_footer.png"))
+        frame.image("3_header.png", header_img)
+        frame.image("4_zone.png", zone_img)
+        frame.image("5_hints.png", hints_img)
+        frame.image("6_footer.png", footer_img)
 
     # Crop the left and right side of the hints section
-    hints_array = np.array(hints_img)
-    hints_width = hints_array.shape[1]
-    left_margin = int(hints_width * left_margin_percent)
-    right_end = int(hints_width * (1 - right_margin_percent))
-    crop_width = int(hints_width * crop_width_percent)
-    hints_array = hints_array[:, (left_margin + crop_width) : right_end]
-
-    # Convert back to PIL Image ensuring proper format
-    if len(hints_array.shape) == 3:
-        hints_img = Image.fromarray(hints_array, "RGB")
-    else:
-        hints_img = Image.fromarray(hints_array, "L")
+    left_margin = int(width * left_margin_percent)
+    right_end = int(width * (1 - right_margin_percent))
+    crop_width = int(width * crop_width_percent)
+    hints_img = hints_img[:, (left_margin + crop_width) : right_end]
 
     if debug:
-        hints_img.save(os.path.join(debug_dir, "4_hints_cropped.png"))
-
-        with open(os.path.join(debug_dir, "debug_info.txt"), "w") as f:
-            f.write(f"Original image size: {width}x{height}\n")
-            f.write(f"Header split at y={header_split}\n")
-            f.write(f"Zone split at y={zone_split}\n")
-            f.write(f"Footer split at y={footer_split}\n")
-            f.write(f"Number of total peaks: {len(peaks)}\n")
-            f.write(f"Number of valid peaks (40-50): {len(valid_peaks)}\n")
-            f.write(f"Left margin cropped: {left_margin + crop_width} pixels\n")
-            f.write(f"Right end: {right_end} pixels\n")
+        frame.image("4_hints_cropped.png", hints_img)
+        frame.text(
+            "debug_info.txt",
+            [
+                f"Original image size: {width}x{height}",
+                f"Header split at y={header_split}",
+                f"Zone split at y={zone_split}",
+                f"Footer split at y={footer_split}",
+                f"Number of total peaks: {len(peaks)}",
+                f"Number of valid peaks (40-50): {len(valid_peaks)}",
+                f"Left margin cropped: {left_margin + crop_width} pixels",
+                f"Right end: {right_end} pixels",
+            ],
+        )
+        debug_sink.submit(frame)
 
     return (
         header_img,
@@ -616,115 +1101,183 @@ def preprocess_image(
     )
 
 
-def preprocess_image_pos(image, debug: bool = True):
+@lru_cache(maxsize=256)
+def position_lut(mean, threshold, contrast=POSITION_CONTRAST):
     """
-    Preprocess image for position OCR with debug output for each step.
+    Lookup table doing the inversion, the contrast stretch around `mean`
+    (like ImageEnhance.Contrast) and the threshold of the coordinates in one pass.
     """
-    if debug:
-        debug_dir = "debug_ocr_pos"
-        os.makedirs(debug_dir, exist_ok=True)
-        image.save(os.path.join(debug_dir, "1_original.png"))
+    inverted = 255 - np.arange(256, dtype=np.float32)
+    stretched = mean + contrast * (inverted - mean)
+    return np.where(stretched < threshold, 0, 255).astype(np.uint8)
 
-    # Convert to RGB if needed
-    if image.mode != "RGB":
-        image = image.convert("RGB")
-        if debug:
-            image.save(os.path.join(debug_dir, "2_rgb.png"))
-            with open(os.path.join(debug_dir, "debug_info.txt"), "w") as f:
-                f.write(f"Original mode: {image.mode}\n")
-                f.write(f"Original size: {image.size}\n")
 
-    # Resize for better OCR
-    target_height = 800  # Reduced from 1400
-    aspect_ratio = image.width / image.height
-    target_width = int(target_height * aspect_ratio)
-    image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+@lru_cache(maxsize=256)
+def otsu_lut(level):
+    """
+    Lookup table turning the text, brighter than `level`, black on white.
+    """
+    return np.where(np.arange(256) > level, 0, 255).astype(np.uint8)
 
-    if debug:
-        image.save(os.path.join(debug_dir, "3_resized.png"))
-        with open(os.path.join(debug_dir, "debug_info.txt"), "a") as f:
-            f.write(f"\nAfter resize:\n")
-            f.write(f"Target height: {target_height}\n")
-            f.write(f"Aspect ratio: {aspect_ratio:.3f}\n")
-            f.write(f"New size: {image.size}\n")
-
-    # Convert to grayscale
-    image = image.convert("L")
-    if debug:
-        image.save(os.path.join(debug_dir, "4_grayscale.png"))
 
-    # Invert image (for white text on black background)
-    image = Image.eval(image, lambda x: 255 - x)
-    if debug:
-        image.save(os.path.join(debug_dir, "5_inverted.png"))
+def position_buffer(name, shape, fill=None):
+    """
+    Return this thread's reusable buffer `name` of the given shape.
+    """
+    buffer = getattr(position_buffers, name, None)
+    if buffer is None or buffer.shape != shape:
+        buffer = np.empty(shape, dtype=np.uint8)
+        if fill is not None:
+            buffer.fill(fill)
+        setattr(position_buffers, name, buffer)
+    return buffer
 
-    # Add padding
-    padding = int(target_height * 0.15)
-    new_size = (target_width + 2 * padding, target_height + 2 * padding)
-    padded_image = Image.new("L", new_size, 255)
-    padded_image.paste(image, (padding, padding))
-    image = padded_image
 
-    if debug:
-        image.save(os.path.join(debug_dir, "6_padded.png"))
-        with open(os.path.join(debug_dir, "debug_info.txt"), "a") as f:
-            f.write(f"\nPadding:\n")
-            f.write(f"Padding size: {padding} pixels\n")
-            f.write(f"Padded size: {new_size}\n")
-
-    # Enhance contrast and sharpen
-    enhancer = ImageEnhance.Contrast(image)
-    image = enhancer.enhance(2.0)
-    if debug:
-        image.save(os.path.join(debug_dir, "7_contrast.png"))
+def preprocess_image_pos(
+    image,
+    debug: bool = True,
+    scale=POSITION_SCALE,
+    interpolation=POSITION_INTERPOLATION,
+    sharpen=POSITION_SHARPEN,
+    threshold=POSITION_THRESHOLD,
+):
+    """
+    Preprocess the coordinates crop for tesseract: grayscale, upscale (to
+    POSITION_HEIGHT when `scale` is None), sharpen, then invert, stretch and
+    threshold with a lookup table, on a white padding. With `threshold`
+    None, the Otsu level of the crop is used instead of the contrast stretch
+    and fixed threshold.
 
-    image = image.filter(ImageFilter.SHARPEN)
+    Returns:
+        np.ndarray: Binary image, a buffer reused by the next call of the thread
+    """
+    pixels = rgb_array(image)
     if debug:
-        image.save(os.path.join(debug_dir, "8_sharpened.png"))
+        frame = debug_sink.frame("position", "debug_ocr_pos")
+        frame.image("1_original.png", pixels)
+
+    gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    height, width = gray.shape
+    if scale is None:
+        target_height = POSITION_HEIGHT
+        target_width = int(target_height * width / height)
+    else:
+        target_height, target_width = round(height * scale), round(width * scale)
+    padding = int(target_height * POSITION_PADDING)
+    padded_shape = (target_height + 2 * padding, target_width + 2 * padding)
+
+    # The padding stays white, only the text area is written
+    padded = position_buffer("padded", padded_shape, fill=255)
+    text_area = padded[
+        padding : padding + target_height, padding : padding + target_width
+    ]
+    scaled = position_buffer("scaled", (target_height, target_width))
+    cv2.resize(
+        gray, (target_width, target_height), dst=scaled, interpolation=interpolation
+    )
+    if sharpen:
+        cv2.filter2D(scaled, -1, SHARPEN_KERNEL, dst=scaled)
 
-    # Threshold
-    image = image.point(lambda x: 0 if x < 160 else 255)
-    if debug:
-        image.save(os.path.join(debug_dir, "9_threshold.png"))
-        with open(os.path.join(debug_dir, "debug_info.txt"), "a") as f:
-            f.write(f"\nThreshold:\n")
-            f.write(f"Threshold value: 160\n")
+    if threshold is None:
+        level, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        lut = otsu_lut(int(level))
+        info = f"Otsu level: {level:.0f}"
+    else:
+        # Contrast is stretched around the mean of the inverted, padded image
+        text_pixels = target_height * target_width
+        inverted_sum = (255 - gray.mean()) * text_pixels
+        mean = int(
+            (inverted_sum + 255 * (padded.size - text_pixels)) / padded.size + 0.5
+        )
+        lut = position_lut(mean, threshold=threshold)
+        info = f"Contrast mean: {mean}, threshold: {threshold}"
+    cv2.LUT(scaled, lut, dst=text_area)
 
-    # Convert back to RGB
-    final_image = image.convert("RGB")
     if debug:
-        final_image.save(os.path.join(debug_dir, "10_final.png"))
-        with open(os.path.join(debug_dir, "debug_info.txt"), "a") as f:
-            f.write(f"\nFinal:\n")
-            f.write(f"Final size: {final_image.size}\n")
-            f.write(f"Final mode: {final_image.mode}\n")
+        frame.image("2_scaled.png", scaled)
+        frame.image("3_final.png", padded)
+        frame.text(
+            "debug_info.txt",
+            [
+                f"Original size: {width}x{height}",
+                f"Scaled size: {target_width}x{target_height}",
+                f"Padded size: {padded_shape[1]}x{padded_shape[0]}",
+                info,
+            ],
+        )
+        debug_sink.submit(frame)
+
+    return padded
+
+
+def read_coordinates_text(screenshot, **preprocessing):
+    """
+    Read the coordinates of a crop with tesseract.
+
+    Returns:
+        list: [{"x": x, "y": y}, ...] in reading order
+    """
+    preprocessed = preprocess_image_pos(screenshot, **preprocessing)
+    engine = get_engine(PLAYER_REGION_CONFIG)
+    text = engine.image_to_string(preprocessed).strip()
+    log.debug("Coordinates OCR: %r", text)
+    coordinates = []
+    for match in re.finditer(r"(-?\d+)\s*,\s*(-?\d+)", text):
+        x, y = match.groups()
+        try:
+            coordinates.append({"x": int(x), "y": int(y)})
+        except ValueError:
+            continue
+    return coordinates
 
-    return final_image
 
+def process_coordinates_image(screenshot, expected=None):
+    """Extract coordinates from screenshot using OCR
 
-def process_coordinates_image(screenshot):
-    """Extract coordinates from screenshot using OCR"""
+    Args:
+        expected: (x, y) the player should be at (a travel target), which
+            confirms a tesseract read for the glyph reader to learn
+    """
     try:
-        # Process image
-        img = Image.fromarray(screenshot)
-        preprocessed_img = preprocess_image_pos(img)
-
-        # Extract text with OCR
-        config = r"--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789,-"
-        text = pytesseract.image_to_string(preprocessed_img, config=config).strip()
-        print(text)
-        # Extract coordinates
-        coordinates = []
-        for match in re.finditer(r"(-?\d+)\s*,\s*(-?\d+)", text):
-            x, y = match.groups()
-            try:
-                coordinates.append({"x": int(x), "y": int(y)})
-            except ValueError:
-                continue
+        # Glyph templates first, tesseract only when a glyph is not trusted
+        start = time.perf_counter()
+        position, confidences = glyph_reader.read_coordinates(screenshot)
+        elapsed = (time.perf_counter() - start) * 1000
+        if position is not None:
+            log.debug(
+                "Glyph read %s in %.2f ms, confidences %s",
+                position,
+                elapsed,
+                confidences,
+            )
+            return {
+                "success": True,
+                "coordinates": [{"x": position[0], "y": position[1]}],
+                "confidences": confidences,
+            }
+        log.info("Glyph read not trusted (%s), using tesseract", confidences)
+
+        coordinates = read_coordinates_text(screenshot)
+
+        # Teach the glyph reader the characters tesseract just read, once
+        # the read is confirmed
+        if coordinates and glyph_reader.learning:
+            first = (coordinates[0]["x"], coordinates[0]["y"])
+            confirmed = expected is not None and first == tuple(expected)
+            if not confirmed:
+                check = read_coordinates_text(
+                    screenshot, debug=False, threshold=GLYPH_CHECK_THRESHOLD
+                )
+                confirmed = bool(check) and (check[0]["x"], check[0]["y"]) == first
+            if confirmed:
+                glyph_reader.learn(screenshot, f"{first[0]},{first[1]}")
+            else:
+                log.info("Coordinates read %s not confirmed, not learned", first)
 
         return {"success": bool(coordinates), "coordinates": coordinates}
 
     except Exception as e:
+        debug_sink.dump_failure(f"process_coordinates_image: {e}")
         return {"success": False, "error": str(e), "coordinates": []}
 
 
@@ -737,57 +1290,6 @@ def process_coordinates_image(screenshot):
 ###########################################################
 
 
-def determine_orientation(template):
-    h, w = template.shape
-    aspect_ratio = w / h
-
-    # Use aspect ratio to determine orientation
-    if aspect_ratio > 1:  # Wider than tall
-        return "horizontal"
-    else:  # Taller than wide
-        return "vertical"
-
-
-def calculate_perpendicular_masses(template, orientation):
-    h, w = template.shape
-
-    if orientation == "horizontal":
-        left_mass = np.sum(template[:, : w // 2])
-        right_mass = np.sum(template[:, w // 2 :])
-        return left_mass, right_mass
-    else:  # Vertical
-        top_mass = np.sum(template[: h // 2, :])
-        bottom_mass = np.sum(template[h // 2 :, :])
-        return top_mass, bottom_mass
-
-
-def determine_arrow_direction_weight(template):
-    # Step 1: Determine orientation (horizontal or vertical)
-    orientation = determine_orientation(template)
-
-    # Step 2: Calculate perpendicular masses
-    if orientation == "horizontal":
-        left_mass, right_mass = calculate_perpendicular_masses(template, orientation)
-        if left_mass > right_mass:
-            return 4
-        else:
-            return 0
-    else:  # Vertical
-        top_mass, bottom_mass = calculate_perpendicular_masses(template, orientation)
-        if top_mass > bottom_mass:
-            return 6
-        else:
-            return 2
-
-
-def determine_arrow_direction_combined(template):
-    # Use weight-based determination
-    weight_direction = determine_arrow_direction_weight(template)
-
-    # Optionally, combine with other methods for robustness (like diagonal or scoring methods)
-    return weight_direction
-
-
 def extract_arrow_templates(binary_image):
     contours, _ = cv2.findContours(
         binary_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
@@ -803,7 +1305,10 @@ def extract_arrow_templates(binary_image):
     return sorted(templates, key=lambda x: x[2])  # Sort by y-coordinate
 
 
-def save_debug_image(template, direction, i):
+def render_template_debug(template, direction):
+    """
+    Draw an arrow template scaled up with its cut line and direction.
+    """
     h, w = template.shape
     scale = 3  # Scale factor for resizing debug image
 
@@ -841,61 +1346,125 @@ def save_debug_image(template, direction, i):
         (0, 0, 255),
         2,
     )
-    cv2.imwrite(f"debug_template_{i}.png", debug_image)
+    return debug_image
 
 
-def read_direction_arrows(pil_image):
-    try:
-        input_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+def render_arrows_debug(input_image, detections):
+    """
+    Draw the detected arrows and their direction on the widget.
+    """
+    debug_img = input_image.copy()
+    for direction, x, y, w, h, _ in detections:
+        cv2.rectangle(debug_img, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.putText(
+            debug_img,
+            f"{direction}",
+            (x, y - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            (255, 0, 0),
+            1,
+        )
+    return debug_img
 
-        # Ensure the input image is not empty
-        if input_image is None or input_image.size == 0:
-            raise ValueError("Invalid input: 'image' is empty or corrupted.")
 
-        # Convert to grayscale and binarize
-        gray = cv2.cvtColor(input_image, cv2.COLOR_BGR2GRAY)
-        _, binary = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY)
+def detect_arrows(pil_image, debug: bool = True):
+    """
+    Find the hint arrows of the widget (RGB array or PIL Image) and their
+    direction.
 
-        # Define search region
-        left_margin = int(input_image.shape[1] * 0.03)
-        search_width = int(input_image.shape[1] * 0.1)
-        search_region = binary[:, left_margin : left_margin + search_width]
+    Returns:
+        list: (direction, x, y, w, h, confidence) per arrow, top to bottom,
+        in widget pixels
+    """
+    input_image = rgb_array(pil_image)
+
+    # Ensure the input image is not empty
+    if input_image is None or input_image.size == 0:
+        raise ValueError("Invalid input: 'image' is empty or corrupted.")
+
+    # Convert to grayscale and binarize
+    gray = cv2.cvtColor(input_image, cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY)
+
+    # Define search region
+    left_margin = int(input_image.shape[1] * 0.03)
+    search_width = int(input_image.shape[1] * 0.1)
+    search_region = binary[:, left_margin : left_margin + search_width]
+
+    # Extract templates
+    templates = extract_arrow_templates(search_region)
+
+    # All the arrows of the frame are classified at once
+    batch = ArrowBatch(
+        [template for template, *_ in templates],
+        [
+            input_image[y : y + h, left_margin + x : left_margin + x + w]
+            for _, x, y, w, h in templates
+        ],
+    )
+    predictions = arrow_classifier.classify(batch)
 
-        # Extract templates
-        templates = extract_arrow_templates(search_region)
+    detections = []
+    if debug:
+        frame = debug_sink.frame("arrows")
 
-        arrows = []
-        debug_img = input_image.copy()
+    for i, ((template, x, y, w, h), (direction, confidence)) in enumerate(
+        zip(templates, predictions)
+    ):
+        detections.append((direction, left_margin + x, y, w, h, confidence))
 
-        for i, (template, x, y, w, h) in enumerate(templates):
-            print(f"\nAnalyzing template {i}:")
+        # Individual debug image with cut line
+        if debug:
+            frame.render(
+                f"debug_template_{i}.png",
+                render_template_debug,
+                template,
+                direction,
+            )
 
-            direction = determine_arrow_direction_combined(template)
-            arrows.append(direction)
+    # Debug image with all detected arrows
+    if debug:
+        frame.render(
+            "debug_arrows.png",
+            render_arrows_debug,
+            cv2.cvtColor(input_image, cv2.COLOR_RGB2BGR),
+            detections,
+        )
+        debug_sink.submit(frame)
 
-            # Save individual debug image with cut line
-            save_debug_image(template, direction, i)
+    return detections
 
-            actual_x = left_margin + x
-            cv2.rectangle(
-                debug_img, (actual_x, y), (actual_x + w, y + h), (0, 255, 0), 2
-            )
-            cv2.putText(
-                debug_img,
-                f"{direction}",
-                (actual_x, y - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.5,
-                (255, 0, 0),
-                1,
-            )
 
-        # Save the debug image with all detected arrows
-        cv2.imwrite("debug_arrows.png", debug_img)
-        print(f"\nFinal arrows: {arrows}")
+def read_direction_arrows(pil_image, debug: bool = True):
+    try:
+        arrows = [direction for direction, *_ in detect_arrows(pil_image, debug)]
+        log.debug("Final arrows: %s", arrows)
 
         return arrows
 
     except Exception as e:
-        print(f"Error: {str(e)}")
+        log.warning("Arrow detection failed: %s", e)
         return json.dumps({"error": f"Arrow detection failed: {str(e)}"})
+
+
+if __name__ == "__main__":
+    import sys
+    from log_config import configure_logging
+
+    configure_logging()
+    # Compare sequential and parallel reads of a saved widget capture
+    path = (
+        sys.argv[1]
+        if len(sys.argv) > 1
+        else os.path.join("debug_ocr", "1_original.png")
+    )
+    capture = Image.open(path).convert("RGB")
+    for parallel in (False, True):
+        read_hunt_from_screenshot(capture, parallel=parallel, use_cache=False)
+        print(
+            f"{'Parallel' if parallel else 'Sequential'} read:"
+            f" {format_timings(last_timings)}"
+        )
+    for line in latency_report():
+        print(line)
@@ -0,0 +1,107 @@
+"""
+Cache of OCR'd widget sections, keyed by a perceptual fingerprint.
+
+Clicking "Next Hint" again after a failure captures the same widget, so
+each section (header, zone, hints, footer) is fingerprinted and its lines
+are reused while the capture looks the same. The fingerprint is the
+grayscale section averaged over 4x4 pixel blocks: two captures match when
+no block differs by more than FINGERPRINT_TOLERANCE, which ignores capture
+noise but still sees a changed digit. Sections read within one step (hints,
+footer) depend on the ÉTAPE header and are dropped when it changes.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+BLOCK_SIZE = 4
+FINGERPRINT_TOLERANCE = 12
+# Fingerprints kept per section
+CACHE_SIZE = 16
+# Sections invalidated when the header (current step) changes
+HEADER_DEPENDENTS = ("hints", "footer")
+
+
+def fingerprint(image):
+    """
+    Return the block-mean thumbnail of a section capture.
+    """
+    pixels = np.asarray(image)
+    if pixels.ndim == 3:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    height, width = pixels.shape
+    return cv2.resize(
+        pixels,
+        (max(width // BLOCK_SIZE, 1), max(height // BLOCK_SIZE, 1)),
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def same_fingerprint(a, b, tolerance=FINGERPRINT_TOLERANCE):
+    """
+    Whether two fingerprints come from the same-looking capture.
+    """
+    if a is None or b is None or a.shape != b.shape:
+        return False
+    return int(cv2.absdiff(a, b).max()) <= tolerance
+
+
+class SectionCache:
+    """
+    Recognized lines per section and fingerprint, with hit statistics.
+    """
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = {}
+        self.header = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def set_header(self, header_fingerprint):
+        """
+        Record the current header, dropping the sections depending on it
+        when it changed.
+        """
+        with self._lock:
+            if self.header is not None and not same_fingerprint(
+                header_fingerprint, self.header
+            ):
+                for section in HEADER_DEPENDENTS:
+                    self.entries.pop(section, None)
+            self.header = header_fingerprint
+
+    def get(self, section, section_fingerprint):
+        """
+        Return the lines cached for a matching capture, or None.
+        """
+        with self._lock:
+            entries = self.entries.get(section, [])
+            for i, (cached_fingerprint, lines) in enumerate(entries):
+                if same_fingerprint(section_fingerprint, cached_fingerprint):
+                    # Most recently used first
+                    entries.insert(0, entries.pop(i))
+                    self.hits += 1
+                    return list(lines)
+            self.misses += 1
+            return None
+
+    def put(self, section, section_fingerprint, lines):
+        # An empty read is more likely a glitch than an empty section
+        if not lines:
+            return
+        with self._lock:
+            entries = self.entries.setdefault(section, [])
+            entries.insert(0, (section_fingerprint, list(lines)))
+            del entries[self.size :]
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.header = None
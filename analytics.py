@@ -0,0 +1,262 @@
+"""
+Hunt analytics per start zone, from the journal of progression.db.
+
+The aggregates are kept up to date as the journal grows: each event written
+by ProgressionStore updates the row of its zone (and of its clue) in the
+same transaction, so the reports only read one row per zone or clue,
+however many hunts were played:
+
+    zone_stats  per start_pos_zone: hunts started and finished, time of the
+                finished hunts, steps and their time, hints read, OCR
+                retries, hint-match failures and forced directions
+    clue_stats  per clue (normalized hint text): hint-match failures and
+                forced directions
+
+    python analytics.py zones [count]   slowest zones (time per step) first
+    python analytics.py clues [count]   most misread clues first
+    python analytics.py rebuild         recompute the aggregates from the journal
+"""
+
+import sys
+import json
+import time
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS zone_stats (
+    zone TEXT PRIMARY KEY,
+    hunts INTEGER NOT NULL DEFAULT 0,
+    finished INTEGER NOT NULL DEFAULT 0,
+    hunt_seconds REAL NOT NULL DEFAULT 0,
+    steps INTEGER NOT NULL DEFAULT 0,
+    step_seconds REAL NOT NULL DEFAULT 0,
+    hints INTEGER NOT NULL DEFAULT 0,
+    ocr_retries INTEGER NOT NULL DEFAULT 0,
+    match_failures INTEGER NOT NULL DEFAULT 0,
+    forced_directions INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS clue_stats (
+    clue TEXT PRIMARY KEY,
+    match_failures INTEGER NOT NULL DEFAULT 0,
+    forced_directions INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# zone_stats and clue_stats counter of each journal event kind
+ZONE_COUNTERS = {
+    "hint": "hints",
+    "ocr_retry": "ocr_retries",
+    "match_failure": "match_failures",
+    "forced": "forced_directions",
+}
+CLUE_COUNTERS = {
+    "match_failure": "match_failures",
+    "forced": "forced_directions",
+}
+# Zone of the events journaled outside of a hunt
+NO_ZONE = ""
+
+ZONE_COLUMNS = (
+    "zone",
+    "hunts",
+    "finished",
+    "s/step",
+    "hunts/h",
+    "OCR retries",
+    "match failures",
+    "forced",
+)
+ZONE_REPORT = """
+SELECT zone, hunts, finished,
+    step_seconds / steps,
+    finished * 3600.0 / NULLIF(hunt_seconds, 0),
+    ocr_retries, match_failures, forced_directions
+FROM zone_stats
+"""
+CLUE_COLUMNS = ("clue", "match failures", "forced")
+
+
+def add(conn, table, key_column, key, **increments):
+    """
+    Add the increments to the counters of a row, created if needed.
+    """
+    columns = ", ".join(increments)
+    conn.execute(
+        f"""
+        INSERT INTO {table} ({key_column}, {columns})
+        VALUES (?, {", ".join("?" * len(increments))})
+        ON CONFLICT ({key_column}) DO UPDATE SET
+            {", ".join(f"{column} = {column} + excluded.{column}" for column in increments)}
+        """,
+        (key, *increments.values()),
+    )
+
+
+def account(conn, zone, kind, data, timestamp, step_times):
+    """
+    Add an event to the aggregates.
+
+    Args:
+        step_times: (first, last) timestamps of the step events of the hunt
+            before this one, or None
+    """
+    if kind == "step":
+        if step_times is None:
+            add(conn, "zone_stats", "zone", zone, hunts=1)
+        else:
+            add(
+                conn,
+                "zone_stats",
+                "zone",
+                zone,
+                steps=1,
+                step_seconds=timestamp - step_times[1],
+            )
+    elif kind == "end":
+        if step_times is not None and data.get("status") == "finished":
+            first, last = step_times
+            add(
+                conn,
+                "zone_stats",
+                "zone",
+                zone,
+                finished=1,
+                hunt_seconds=timestamp - first,
+                steps=1,
+                step_seconds=timestamp - last,
+            )
+    elif kind in ZONE_COUNTERS:
+        add(conn, "zone_stats", "zone", zone, **{ZONE_COUNTERS[kind]: 1})
+        if kind in CLUE_COUNTERS and data.get("clue"):
+            add(conn, "clue_stats", "clue", data["clue"], **{CLUE_COUNTERS[kind]: 1})
+
+
+def hunt_zone(conn, hunt_id):
+    row = conn.execute(
+        "SELECT start_pos_zone FROM hunt WHERE id = ?", (hunt_id,)
+    ).fetchone()
+    return (row[0] or NO_ZONE).strip() if row else NO_ZONE
+
+
+def update(conn, hunt_id, kind, data, timestamp):
+    """
+    Add an event to the aggregates, before it is inserted in the journal.
+    """
+    step_times = None
+    if kind in ("step", "end") and hunt_id is not None:
+        first, last = conn.execute(
+            """
+            SELECT MIN(timestamp), MAX(timestamp) FROM event
+            WHERE hunt_id = ? AND kind = 'step'
+            """,
+            (hunt_id,),
+        ).fetchone()
+        if first is not None:
+            step_times = (first, last)
+    account(conn, hunt_zone(conn, hunt_id), kind, data, timestamp, step_times)
+
+
+def rebuild(conn):
+    """
+    Recompute the aggregates from the whole journal.
+    """
+    conn.execute("DELETE FROM zone_stats")
+    conn.execute("DELETE FROM clue_stats")
+    zones = {
+        hunt_id: (zone or NO_ZONE).strip()
+        for hunt_id, zone in conn.execute("SELECT id, start_pos_zone FROM hunt")
+    }
+    step_times = {}
+    events = conn.execute(
+        "SELECT hunt_id, kind, data, timestamp FROM event ORDER BY id"
+    ).fetchall()
+    for hunt_id, kind, data, timestamp in events:
+        times = step_times.get(hunt_id)
+        account(
+            conn, zones.get(hunt_id, NO_ZONE), kind, json.loads(data), timestamp, times
+        )
+        if kind == "step" and hunt_id is not None:
+            step_times[hunt_id] = (times[0] if times else timestamp, timestamp)
+    return len(events)
+
+
+def slowest_zones(conn, limit=10):
+    """
+    Return the ZONE_COLUMNS rows of the zones with the longest steps.
+    """
+    return conn.execute(
+        f"{ZONE_REPORT} WHERE steps > 0 ORDER BY step_seconds / steps DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+
+
+def most_misread_clues(conn, limit=10):
+    """
+    Return the CLUE_COLUMNS rows of the clues that most often failed to
+    match or had their direction forced.
+    """
+    return conn.execute(
+        """
+        SELECT clue, match_failures, forced_directions FROM clue_stats
+        ORDER BY match_failures + forced_directions DESC, clue
+        LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def format_table(columns, rows):
+    """
+    Return the lines of a text table, numbers rounded to one decimal.
+    """
+    cells = [columns] + [
+        [
+            (
+                "-"
+                if value is None
+                else f"{value:.1f}" if isinstance(value, float) else str(value)
+            )
+            for value in row
+        ]
+        for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    return [
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in cells
+    ]
+
+
+if __name__ == "__main__":
+    from progression import PROGRESSION_DB
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "zones"
+    if command == "rebuild":
+        from progression import ProgressionStore
+
+        store = ProgressionStore()
+        print(f"{store.rebuild_analytics().result()} journal events")
+        store.close()
+        sys.exit(0)
+
+    reports = {
+        "zones": (ZONE_COLUMNS, slowest_zones),
+        "clues": (CLUE_COLUMNS, most_misread_clues),
+    }
+    if command not in reports:
+        print("Usage: python analytics.py [zones|clues|rebuild] [count]")
+        sys.exit(1)
+    columns, report = reports[command]
+    conn = sqlite3.connect(
+        f"{Path(PROGRESSION_DB).absolute().as_uri()}?mode=ro", uri=True
+    )
+    start = time.perf_counter()
+    rows = report(conn, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
+    elapsed = time.perf_counter() - start
+    print("\n".join(format_table(columns, rows)))
+    print(f"({elapsed * 1000:.1f} ms)")
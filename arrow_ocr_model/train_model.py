@@ -12,6 +12,10 @@ EPOCHS = 30
 TRAIN_DIR = "data/train"
 TEST_DIR = "data/test"
 
+# Class folders, in the output order of the model (OCR/arrow_classifier.py
+# CNN_DIRECTIONS): the alphabetical order flow_from_directory uses by default
+CLASSES = ["East", "North", "South", "West"]
+
 # Data Generators
 datagen = ImageDataGenerator(rescale=1.0 / 255.0, validation_split=0.2)
 
@@ -20,6 +24,7 @@ train_data = datagen.flow_from_directory(
     target_size=IMG_SIZE,
     batch_size=BATCH_SIZE,
     class_mode="categorical",
+    classes=CLASSES,
     subset="training",
 )
 
@@ -28,6 +33,7 @@ val_data = datagen.flow_from_directory(
     target_size=IMG_SIZE,
     batch_size=BATCH_SIZE,
     class_mode="categorical",
+    classes=CLASSES,
     subset="validation",
 )
 
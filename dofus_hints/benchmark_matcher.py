@@ -0,0 +1,123 @@
+"""
+Benchmark HintMatcher against the former per-option compare_hint_texts loop.
+
+Hints are read with tesseract from the hints crop saved in debug_ocr/, and
+each one is also tested with a merged and a split word to mimic common OCR
+mistakes. Extra hint texts can be given on the command line:
+
+    python -m dofus_hints.benchmark_matcher "Champignon rayé" "Dolmen"
+"""
+
+import os
+import sys
+import time
+
+from dofus_hints.clue_db import load_clue_db
+from dofus_hints.matcher import (
+    MATCH_THRESHOLD,
+    HintMatcher,
+    compare_hint_texts,
+    normalize_hint_text,
+    word_ratio,
+)
+
+DEBUG_HINTS_IMAGE = os.path.join("debug_ocr", "4_hints_cropped.png")
+REPEAT = 20
+
+
+def read_debug_hints(path=DEBUG_HINTS_IMAGE):
+    """
+    OCR the saved hints crop, one hint per line.
+    """
+    from PIL import Image
+    from OCR.engine import WIDGET_CONFIG, get_engine
+    from OCR.screenshot import sanitize_hint_text
+
+    text = get_engine(WIDGET_CONFIG).image_to_string(Image.open(path))
+    return [sanitize_hint_text(line) for line in text.splitlines() if line.strip()]
+
+
+def ocr_variants(hint):
+    """
+    Return the hint plus a merged and a split version of it.
+    """
+    words = hint.split()
+    variants = [hint]
+    if len(words) > 1:
+        variants.append(" ".join([words[0] + words[1]] + words[2:]))
+    longest = max(words, key=len)
+    if len(longest) > 3:
+        middle = len(longest) // 2
+        variants.append(
+            hint.replace(longest, f"{longest[:middle]} {longest[middle:]}", 1)
+        )
+    return variants
+
+
+def legacy_match(hint_text, hint_names):
+    """
+    The former loop: first option scoring >= MATCH_THRESHOLD, in option order.
+    """
+    normalized = normalize_hint_text(hint_text)
+    for clue_id, name in sorted(hint_names.items()):
+        if clue_id == 0:
+            continue
+        score = compare_hint_texts(normalized, normalize_hint_text(name))
+        if score >= MATCH_THRESHOLD:
+            return clue_id, score
+    return None, 0
+
+
+def timed(function, *args):
+    """
+    Return (result, mean microseconds) over REPEAT cold-cache runs.
+    """
+    total = 0
+    for _ in range(REPEAT):
+        word_ratio.cache_clear()
+        start = time.perf_counter()
+        result = function(*args)
+        total += time.perf_counter() - start
+    return result, total / REPEAT * 1e6
+
+
+def main():
+    db = load_clue_db()
+    start = time.perf_counter()
+    matcher = HintMatcher(db.hint_names)
+    print(f"Matcher built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    hints = sys.argv[1:]
+    try:
+        hints += read_debug_hints()
+    except Exception as e:
+        print(f"Could not OCR {DEBUG_HINTS_IMAGE}: {e}")
+    if not hints:
+        print("No hint to benchmark.")
+        return
+
+    legacy_total = matcher_total = 0
+    rows = 0
+    for hint in hints:
+        for text in ocr_variants(hint):
+            (legacy_id, legacy_score), legacy_us = timed(
+                legacy_match, text, db.hint_names
+            )
+            (clue_id, score), matcher_us = timed(matcher.best_match, text)
+            legacy_total += legacy_us
+            matcher_total += matcher_us
+            rows += 1
+
+            legacy_name = db.hint_names.get(legacy_id, "-")
+            matcher_name = db.hint_names.get(clue_id, "-")
+            print(
+                f"{text!r:32} legacy: {legacy_name} ({legacy_score}) {legacy_us:8.0f} us"
+                f" | matcher: {matcher_name} ({score}) {matcher_us:6.0f} us"
+            )
+
+    print(f"\nMean legacy loop: {legacy_total / rows:.0f} us per hint")
+    print(f"Mean matcher:     {matcher_total / rows:.0f} us per hint")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Compiled, memory-mappable version of the clue data stored in chasse.js.
+
+chasse.js is parsed once and written to a compact binary file:
+
+    header      magic, SHA-256 of chasse.js, map count, bitset words, name count
+    coordinates int16[map_count, 2]
+    clues       uint64[map_count, words] bitset of clue ids per map
+    name index  (uint16 clue id, uint16 length, uint32 offset) per name
+    names       UTF-8 blob
+
+The file is rebuilt automatically whenever the SHA of chasse.js changes.
+"""
+
+import os
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import numpy as np
+
+from dofus_hints.solver import CHASSE_JS, load_chasse_js
+
+log = logging.getLogger(__name__)
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chasse.bin")
+
+MAGIC = b"DHCLUES1"
+HEADER = struct.Struct("<8s32sIII")
+NAME_ENTRY = struct.Struct("<HHI")
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def _align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+
+def build_clue_db(js_path=CHASSE_JS, db_path=DB_PATH):
+    """
+    Compile chasse.js into the binary clue database.
+
+    Returns:
+        str: Path of the written database
+    """
+    sha = file_sha256(js_path)
+    clue_maps, hint_names = load_chasse_js(js_path)
+
+    max_clue_id = max(max(hint_names), max(max(c) for c in clue_maps.values()))
+    words = max_clue_id // 64 + 1
+
+    positions = sorted(clue_maps)
+    coordinates = np.array(positions, dtype=np.int16).reshape(-1, 2)
+    bitsets = np.zeros((len(positions), words), dtype=np.uint64)
+    for row, position in enumerate(positions):
+        for clue_id in clue_maps[position]:
+            bitsets[row, clue_id // 64] |= np.uint64(1 << (clue_id % 64))
+
+    name_index = bytearray()
+    name_blob = bytearray()
+    for clue_id, name in sorted(hint_names.items()):
+        encoded = name.encode("utf-8")
+        name_index += NAME_ENTRY.pack(clue_id, len(encoded), len(name_blob))
+        name_blob += encoded
+
+    header = HEADER.pack(MAGIC, sha, len(positions), words, len(hint_names))
+    coordinates_bytes = coordinates.tobytes()
+    padding = _align(len(header) + len(coordinates_bytes)) - (
+        len(header) + len(coordinates_bytes)
+    )
+
+    # Write to a temporary file first so a crash never leaves a truncated db
+    tmp_path = f"{db_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(coordinates_bytes)
+        f.write(b"\0" * padding)
+        f.write(bitsets.tobytes())
+        f.write(name_index)
+        f.write(name_blob)
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+class ClueDatabase:
+    """
+    Read-only view over a compiled clue database.
+
+    Behaves like the {(x, y): clue_ids} mapping expected by ClueSolver.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.sha, map_count, words, name_count = HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"Invalid clue database: {path}")
+
+        offset = HEADER.size
+        self.coordinates = np.frombuffer(
+            self._mmap, dtype=np.int16, count=map_count * 2, offset=offset
+        ).reshape(map_count, 2)
+        offset = _align(offset + self.coordinates.nbytes)
+        self.bitsets = np.frombuffer(
+            self._mmap, dtype=np.uint64, count=map_count * words, offset=offset
+        ).reshape(map_count, words)
+        offset += self.bitsets.nbytes
+
+        names_offset = offset + name_count * NAME_ENTRY.size
+        self.hint_names = {}
+        for clue_id, length, start in NAME_ENTRY.iter_unpack(
+            self._mmap[offset:names_offset]
+        ):
+            start += names_offset
+            self.hint_names[clue_id] = self._mmap[start : start + length].decode(
+                "utf-8"
+            )
+
+        self.rows = {
+            position: row
+            for row, position in enumerate(map(tuple, self.coordinates.tolist()))
+        }
+        self._clue_sets = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, position):
+        return position in self.rows
+
+    def get(self, position, default=None):
+        """
+        Return the clue ids found on a map, decoded from its bitset.
+        """
+        row = self.rows.get(position)
+        if row is None:
+            return default
+
+        clues = self._clue_sets.get(row)
+        if clues is None:
+            bits = int.from_bytes(self.bitsets[row].tobytes(), "little")
+            clues = frozenset(i for i in range(bits.bit_length()) if bits >> i & 1)
+            self._clue_sets[row] = clues
+        return clues
+
+    def close(self):
+        # Drop the numpy views first, mmap refuses to close while exported
+        self.coordinates = None
+        self.bitsets = None
+        self._mmap.close()
+
+
+def load_clue_db(js_path=CHASSE_JS, db_path=DB_PATH):
+    """
+    Open the compiled clue database, rebuilding it if chasse.js changed.
+    """
+    sha = file_sha256(js_path)
+    if os.path.exists(db_path):
+        try:
+            db = ClueDatabase(db_path)
+            if db.sha == sha:
+                return db
+            db.close()
+            log.info("chasse.js changed, rebuilding clue database...")
+        except (ValueError, struct.error) as e:
+            log.warning("Invalid clue database, rebuilding: %s", e)
+
+    build_clue_db(js_path, db_path)
+    return ClueDatabase(db_path)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    build_clue_db()
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    db = load_clue_db()
+    load_time = time.perf_counter() - start
+
+    print(f"Compiled {len(db)} maps and {len(db.hint_names)} clue names")
+    print(f"Database size: {os.path.getsize(DB_PATH)} bytes")
+    print(f"Build time: {build_time * 1000:.1f} ms")
+    print(f"Load time: {load_time * 1000:.1f} ms")
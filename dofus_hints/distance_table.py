@@ -0,0 +1,220 @@
+"""
+Precomputed distance table: (map, direction, clue) -> steps.
+
+For every map of the clue database and each direction (0/2/4/6), stores the
+number of maps to the nearest occurrence of each clue, following the same
+probes as updateOptionClues. Clues further than MAX_DISTANCE are stored as
+UNREACHABLE, so any solve is a single array index.
+"""
+
+import os
+import mmap
+import time
+import struct
+import logging
+import numpy as np
+
+from dofus_hints.solver import (
+    DIRECTION_STEPS,
+    MAX_DISTANCE,
+    POSITION_FIXES,
+    PROBE_OVERRIDES,
+)
+
+log = logging.getLogger(__name__)
+
+DISTANCES_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "chasse_distances.bin"
+)
+
+MAGIC = b"DHDIST01"
+HEADER = struct.Struct("<8s32sIII")
+
+DIRECTIONS = (0, 2, 4, 6)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+UNREACHABLE = MAX_DISTANCE + 1
+
+
+def compute_distances(clue_db, positions):
+    """
+    Compute the distance rows for arbitrary start positions.
+
+    Args:
+        clue_db: ClueDatabase providing the clue bitsets
+        positions: int array of shape (n, 2) with the start maps
+
+    Returns:
+        np.ndarray: uint8 array of shape (n, len(DIRECTIONS), clue_count)
+    """
+    positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+    clue_count = max(clue_db.hint_names) + 1
+
+    # Bit i of a map's bitset is clue i
+    clue_bits = np.unpackbits(
+        np.ascontiguousarray(clue_db.bitsets).view(np.uint8),
+        axis=1,
+        bitorder="little",
+    )[:, :clue_count].astype(bool)
+    # Extra all-False row for probes landing outside the known maps
+    clue_bits = np.vstack([clue_bits, np.zeros((1, clue_count), dtype=bool)])
+    missing_row = len(clue_bits) - 1
+
+    # Dense grid to turn probe coordinates into database rows
+    coordinates = clue_db.coordinates.astype(np.int32)
+    low = np.minimum(coordinates.min(axis=0), positions.min(axis=0)) - MAX_DISTANCE
+    high = np.maximum(coordinates.max(axis=0), positions.max(axis=0)) + MAX_DISTANCE
+    grid = np.full(high - low + 1, missing_row, dtype=np.int32)
+    grid[coordinates[:, 0] - low[0], coordinates[:, 1] - low[1]] = np.arange(
+        len(coordinates)
+    )
+
+    index = {tuple(position): i for i, position in enumerate(positions.tolist())}
+    distances = np.full(
+        (len(positions), len(DIRECTIONS), clue_count), UNREACHABLE, dtype=np.uint8
+    )
+
+    for d, direction in enumerate(DIRECTIONS):
+        start = positions.copy()
+        for position, fixed in POSITION_FIXES[direction].items():
+            if position in index:
+                start[index[position]] = fixed
+
+        # Several start maps can share the same fixed position
+        fixed_rows = {}
+        for i, position in enumerate(start.tolist()):
+            fixed_rows.setdefault(tuple(position), []).append(i)
+        step = np.array(DIRECTION_STEPS[direction], dtype=np.int32)
+
+        for offset in range(1, MAX_DISTANCE + 1):
+            probes = start + step * offset
+            for position, overrides in PROBE_OVERRIDES[direction].items():
+                if position in fixed_rows and offset in overrides:
+                    probes[fixed_rows[position]] = overrides[offset]
+
+            rows = grid[probes[:, 0] - low[0], probes[:, 1] - low[1]]
+            found = clue_bits[rows] & (distances[:, d] == UNREACHABLE)
+            distances[:, d][found] = offset
+
+    return distances
+
+
+def build_distance_table(clue_db, path=DISTANCES_PATH):
+    """
+    Precompute the distance table for every map of the clue database.
+    """
+    distances = compute_distances(clue_db, clue_db.coordinates)
+    header = HEADER.pack(MAGIC, clue_db.sha, *distances.shape)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(distances.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+class DistanceTable:
+    """
+    Read-only, memory-mapped distance table sharing the rows of a ClueDatabase.
+    """
+
+    def __init__(self, clue_db, path=DISTANCES_PATH):
+        self.clue_db = clue_db
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.sha, map_count, direction_count, clue_count = HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"Invalid distance table: {path}")
+
+        self.distances = np.frombuffer(
+            self._mmap,
+            dtype=np.uint8,
+            count=map_count * direction_count * clue_count,
+            offset=HEADER.size,
+        ).reshape(map_count, direction_count, clue_count)
+
+        # Rows computed on demand for start maps holding no clue themselves
+        self._extra_rows = {}
+
+    def row(self, x, y, direction):
+        """
+        Return the distances to every clue from (x, y) in a direction.
+        """
+        d = DIRECTION_INDEX[direction]
+        db_row = self.clue_db.rows.get((x, y))
+        if db_row is not None and db_row < len(self.distances):
+            return self.distances[db_row, d]
+
+        extra = self._extra_rows.get((x, y))
+        if extra is None:
+            extra = compute_distances(self.clue_db, [(x, y)])[0]
+            self._extra_rows[(x, y)] = extra
+        return extra[d]
+
+    def distance(self, x, y, direction, clue_id):
+        """
+        Return the number of maps to `clue_id`, or None if it is out of range.
+        """
+        row = self.row(x, y, direction)
+        if clue_id >= len(row):
+            return None
+        steps = int(row[clue_id])
+        return steps if steps <= MAX_DISTANCE else None
+
+    def reachable(self, x, y, direction):
+        """
+        Return all clues reachable from (x, y) in a direction.
+
+        Returns:
+            tuple: (clue_ids, distances) as NumPy arrays, nearest first
+        """
+        row = self.row(x, y, direction)
+        clue_ids = np.flatnonzero(row <= MAX_DISTANCE)
+        steps = row[clue_ids]
+        order = np.argsort(steps, kind="stable")
+        return clue_ids[order], steps[order]
+
+    def close(self):
+        self.distances = None
+        self._mmap.close()
+
+
+def load_distance_table(clue_db, path=DISTANCES_PATH):
+    """
+    Open the distance table, rebuilding it if the clue database changed.
+    """
+    if os.path.exists(path):
+        try:
+            table = DistanceTable(clue_db, path)
+            if table.sha == clue_db.sha and len(table.distances) == len(clue_db):
+                return table
+            table.close()
+            log.info("Clue database changed, rebuilding distance table...")
+        except (ValueError, struct.error) as e:
+            log.warning("Invalid distance table, rebuilding: %s", e)
+
+    build_distance_table(clue_db, path)
+    return DistanceTable(clue_db, path)
+
+
+if __name__ == "__main__":
+    from dofus_hints.clue_db import load_clue_db
+
+    clue_db = load_clue_db()
+
+    start = time.perf_counter()
+    build_distance_table(clue_db)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = load_distance_table(clue_db)
+    load_time = time.perf_counter() - start
+
+    print(f"Distance table shape: {table.distances.shape}")
+    print(f"Table size: {os.path.getsize(DISTANCES_PATH)} bytes")
+    print(f"Build time: {build_time * 1000:.1f} ms")
+    print(f"Load time: {load_time * 1000:.1f} ms")
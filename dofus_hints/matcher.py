@@ -0,0 +1,260 @@
+"""
+Indexed fuzzy matcher from OCR'd hint text to clue ids.
+
+Built once over the listHintId names. Names are bucketed by token count and
+indexed by character trigrams (spaces removed, so a merged or split word
+still shares its trigrams). Only the best trigram candidates are scored
+word by word, with the same scale as the former compare_hint_texts loop.
+"""
+
+from collections import Counter
+from functools import lru_cache
+from fuzzywuzzy import fuzz
+
+# Minimum score for a hint to be accepted (same as the former option loop)
+MATCH_THRESHOLD = 95
+# Score penalty when OCR merged two words or split one
+SPLIT_MERGE_PENALTY = 2
+NGRAM_SIZE = 3
+# Number of trigram candidates scored word by word
+MAX_CANDIDATES = 8
+# Candidates below this fraction of the best trigram similarity are dropped
+CANDIDATE_CUTOFF = 0.6
+# Constrained mode: a clear winner among the clues reachable from the current
+# position is accepted with a lower score, as long as it is also the best
+# match over all the clue names (the true clue may not be reachable)
+CONSTRAINED_THRESHOLD = 75
+CONSTRAINED_MARGIN = 10
+
+
+def normalize_hint_text(text):
+    """
+    Lowercase and collapse whitespace, with typographic apostrophes unified.
+    """
+    text = text.replace("’", "'").replace("`", "'").lower()
+    return " ".join(text.split())
+
+
+@lru_cache(maxsize=65536)
+def word_ratio(word_a, word_b):
+    return fuzz.ratio(word_a, word_b)
+
+
+def compare_hint_texts(hint_text, option_text):
+    """
+    Word-by-word similarity: the minimum fuzz.ratio over the word pairs.
+    Returns 0 if the word counts differ.
+    """
+    hint_words = hint_text.lower().split()
+    option_words = option_text.lower().split()
+
+    # If different number of words, they're not the same hint
+    if len(hint_words) != len(option_words):
+        return 0
+
+    # If any word pair has low similarity, the overall score will be low
+    return min((word_ratio(a, b) for a, b in zip(hint_words, option_words)), default=0)
+
+
+def _merge_variants(words):
+    """
+    Yield every word list obtained by merging two adjacent words.
+    """
+    for i in range(len(words) - 1):
+        yield words[:i] + [words[i] + words[i + 1]] + words[i + 2 :]
+
+
+def _ngrams(text):
+    joined = f"^{text.replace(' ', '')}$"
+    return {joined[i : i + NGRAM_SIZE] for i in range(len(joined) - NGRAM_SIZE + 1)}
+
+
+class HintMatcher:
+    """
+    Match OCR'd hint text against the clue names.
+    """
+
+    def __init__(self, hint_names):
+        self.hint_names = {}
+        self.normalized = {}
+        self.exact = {}
+        self.tokens = {}
+        self.buckets = {}
+        self.ngram_counts = {}
+        self.index = {}
+
+        for clue_id, name in hint_names.items():
+            # Clue 0 is the "--Choisir un indice--" placeholder
+            if clue_id == 0:
+                continue
+            normalized = normalize_hint_text(name)
+            tokens = normalized.split()
+            grams = _ngrams(normalized)
+
+            self.hint_names[clue_id] = name
+            self.normalized[clue_id] = normalized
+            self.exact.setdefault(normalized, clue_id)
+            self.tokens[clue_id] = tokens
+            self.buckets.setdefault(len(tokens), set()).add(clue_id)
+            self.ngram_counts[clue_id] = len(grams)
+            for gram in grams:
+                self.index.setdefault(gram, []).append(clue_id)
+
+    def score(self, hint_words, clue_id):
+        """
+        Score a tokenized hint against a clue name, on a 0-100 scale.
+
+        Tolerates one word merged or split by the OCR, at a small penalty.
+        """
+        name_words = self.tokens[clue_id]
+        if len(hint_words) == len(name_words):
+            return compare_hint_texts(" ".join(hint_words), " ".join(name_words))
+
+        if len(hint_words) == len(name_words) + 1:
+            # OCR split a word in two
+            merged, other = _merge_variants(hint_words), name_words
+        elif len(hint_words) + 1 == len(name_words):
+            # OCR merged two words
+            merged, other = _merge_variants(name_words), hint_words
+        else:
+            return 0
+
+        best = max(
+            (
+                min(word_ratio(a, b) for a, b in zip(variant, other))
+                for variant in merged
+            ),
+            default=0,
+        )
+        return max(best - SPLIT_MERGE_PENALTY, 0)
+
+    def candidates(self, text, allowed=None, any_length=False):
+        """
+        Return the clue ids sharing the most trigrams with `text`.
+        Unless `any_length` is set, only names with a token count within one
+        of the hint are considered.
+        """
+        if any_length:
+            buckets = set(self.tokens)
+        else:
+            token_count = len(text.split())
+            buckets = set()
+            for count in (token_count - 1, token_count, token_count + 1):
+                buckets |= self.buckets.get(count, set())
+        if allowed is not None:
+            buckets &= set(allowed)
+
+        grams = _ngrams(text)
+        shared = Counter()
+        for gram in grams:
+            for clue_id in self.index.get(gram, ()):
+                if clue_id in buckets:
+                    shared[clue_id] += 1
+
+        # Dice coefficient, so short names are not favoured
+        similarity = {
+            clue_id: 2 * count / (len(grams) + self.ngram_counts[clue_id])
+            for clue_id, count in shared.items()
+        }
+        ranked = sorted(similarity, key=lambda clue_id: (-similarity[clue_id], clue_id))
+        if not ranked:
+            return []
+        cutoff = similarity[ranked[0]] * CANDIDATE_CUTOFF
+        return [c for c in ranked[:MAX_CANDIDATES] if similarity[c] >= cutoff]
+
+    def match(self, text, k=3, allowed=None):
+        """
+        Return the top-k (clue_id, score) pairs for a hint, best first.
+
+        Args:
+            text: OCR'd hint text
+            k: Number of results
+            allowed: Optional iterable restricting the clue ids considered
+        """
+        normalized = normalize_hint_text(text)
+        if not normalized:
+            return []
+
+        exact = self.exact.get(normalized)
+        if exact is not None and (allowed is None or exact in allowed):
+            return [(exact, 100)]
+
+        hint_words = normalized.split()
+        scored = [
+            (clue_id, self.score(hint_words, clue_id))
+            for clue_id in self.candidates(normalized, allowed)
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:k]
+
+    def best_match(self, text, threshold=MATCH_THRESHOLD, allowed=None):
+        """
+        Return (clue_id, score) of the best match, or (None, score) if the
+        best score is below the threshold.
+        """
+        results = self.match(text, k=1, allowed=allowed)
+        if not results:
+            return None, 0
+        clue_id, score = results[0]
+        if score < threshold:
+            return None, score
+        return clue_id, score
+
+    def rank(self, normalized, allowed=None):
+        """
+        Score the best trigram candidates of a normalized hint, falling back
+        to the whole-text ratio when the OCR mangled more than one word,
+        whatever the word count.
+
+        Returns:
+            list: (clue_id, score) pairs, best first
+        """
+        candidates = self.candidates(normalized, allowed, any_length=True)
+        hint_words = normalized.split()
+        scored = {clue_id: self.score(hint_words, clue_id) for clue_id in candidates}
+        if scored and max(scored.values()) < MATCH_THRESHOLD:
+            for clue_id in candidates:
+                scored[clue_id] = max(
+                    scored[clue_id], fuzz.ratio(normalized, self.normalized[clue_id])
+                )
+        return sorted(scored.items(), key=lambda item: (-item[1], item[0]))
+
+    def match_constrained(self, text, allowed):
+        """
+        Match a hint against the few clues reachable from the current position.
+
+        The best clue among the allowed ones is accepted at MATCH_THRESHOLD,
+        or at CONSTRAINED_THRESHOLD when it leads the runner-up by at least
+        CONSTRAINED_MARGIN and no other clue name, reachable or not, matches
+        the hint as well.
+
+        Returns:
+            tuple: (clue_id or None, score)
+        """
+        normalized = normalize_hint_text(text)
+        allowed = [clue_id for clue_id in allowed if clue_id in self.tokens]
+        if not normalized or not allowed:
+            return None, 0
+
+        exact = self.exact.get(normalized)
+        if exact in allowed:
+            return exact, 100
+
+        ranked = self.rank(normalized, allowed)
+        if not ranked:
+            return None, 0
+        clue_id, score = ranked[0]
+        if score >= MATCH_THRESHOLD:
+            return clue_id, score
+
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0
+        if score < CONSTRAINED_THRESHOLD or score - runner_up < CONSTRAINED_MARGIN:
+            return None, score
+        # An unreachable clue matching as well means the OCR'd text is
+        # ambiguous, or the true clue is not among the allowed ones
+        if any(
+            other != clue_id and other_score >= score
+            for other, other_score in self.rank(normalized)
+        ):
+            return None, score
+        return clue_id, score
@@ -0,0 +1,335 @@
+import os
+import re
+import json
+
+CHASSE_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "chasse.js")
+
+# Maximum number of maps a clue can be away from the current position
+MAX_DISTANCE = 10
+
+# Direction codes as returned by read_direction_arrows / force_hint_direction
+# 0 -> East, 2 -> South, 4 -> West, 6 -> North
+DIRECTION_STEPS = {
+    0: (1, 0),
+    2: (0, 1),
+    4: (-1, 0),
+    6: (0, -1),
+}
+
+# Special cases hard-coded in updateOptionClues (chasse.js).
+#
+# POSITION_FIXES moves the starting position before probing, the same way the
+# page rewrites huntposx/huntposy for a few maps.
+# PROBE_OVERRIDES replaces the map probed at a given offset (1..10) for maps
+# where the path in that direction is not a straight line.
+POSITION_FIXES = {
+    0: {  # East
+        (-81, -37): (-81, -38),
+        (16, -26): (18, -28),
+        (16, -24): (17, -28),
+        (-26, 31): (-26, 30),
+        (-34, -16): (-34, -15),
+        (-27, -51): (-27, -49),
+        (-26, -50): (-26, -49),
+    },
+    2: {  # South
+        (-31, 34): (-30, 34),
+        (-34, -16): (-33, -16),
+    },
+    4: {  # West
+        (-29, -61): (-29, -60),
+        (-25, 40): (-25, 41),
+    },
+    6: {},  # North
+}
+PROBE_OVERRIDES = {
+    0: {  # East
+        (-36, -60): {7: (-29, -61)},
+        (-35, -60): {6: (-29, -61)},
+        (-34, -60): {5: (-29, -61)},
+        (-33, -60): {4: (-29, -61)},
+        (-32, -60): {3: (-29, -61)},
+        (-31, -60): {2: (-29, -61)},
+        (-30, -60): {1: (-29, -61)},
+        (-31, 41): {6: (-25, 40)},
+        (-30, 41): {5: (-25, 40)},
+        (-29, 41): {4: (-25, 40)},
+        (-28, 41): {3: (-25, 40)},
+        (-27, 41): {2: (-25, 40)},
+        (-26, 41): {1: (-25, 40)},
+        (-24, 36): {4: (-19, 37), 5: (-18, 37)},
+        (-23, 36): {3: (-19, 37), 4: (-18, 37)},
+        (-22, 36): {2: (-19, 37), 3: (-18, 37)},
+        (-21, 36): {1: (-19, 37), 2: (-18, 37)},
+        (11, -57): {
+            2: (13, -58),
+            3: (14, -58),
+            4: (15, -58),
+            5: (16, -58),
+            6: (17, -58),
+        },
+        (12, -57): {
+            1: (13, -58),
+            2: (14, -58),
+            3: (15, -58),
+            4: (16, -58),
+            5: (17, -58),
+        },
+        (-26, 36): {2: (-23, 35), 3: (-22, 35), 4: (-21, 35)},
+        (-25, 36): {1: (-23, 35), 2: (-22, 35), 3: (-21, 35)},
+    },
+    2: {  # South
+        (20, -33): {10: (21, -23)},
+        (20, -32): {9: (21, -23)},
+        (20, -31): {8: (21, -23)},
+        (20, -30): {7: (21, -23)},
+        (20, -29): {6: (21, -23)},
+        (20, -28): {5: (21, -23)},
+        (20, -27): {4: (21, -23)},
+        (20, -26): {3: (21, -23)},
+        (20, -25): {2: (21, -23)},
+        (20, -24): {1: (21, -23)},
+        (-25, 29): {2: (-26, 31), 3: (-26, 32), 4: (-26, 33), 5: (-26, 34)},
+        (-25, 30): {1: (-26, 31), 2: (-26, 32), 3: (-26, 33), 4: (-26, 34)},
+        (-12, 32): {2: (-13, 33), 3: (-13, 34)},
+        (-12, 33): {1: (-13, 33), 2: (-13, 34)},
+        (13, -65): {8: (12, -57)},
+        (13, -64): {7: (12, -57)},
+        (13, -63): {6: (12, -57)},
+        (13, -62): {5: (12, -57)},
+        (13, -61): {4: (12, -57)},
+        (13, -60): {3: (12, -57)},
+        (13, -59): {2: (12, -57)},
+        (13, -58): {1: (12, -57)},
+    },
+    4: {  # West
+        (6, -8): {
+            3: (4, -9),
+            4: (3, -9),
+            5: (2, -9),
+            6: (1, -9),
+            7: (0, -9),
+            8: (-1, -9),
+        },
+        (5, -8): {
+            2: (4, -9),
+            3: (3, -9),
+            4: (2, -9),
+            5: (1, -9),
+            6: (0, -9),
+            7: (-1, -9),
+        },
+        (4, -8): {
+            1: (4, -9),
+            2: (3, -9),
+            3: (2, -9),
+            4: (1, -9),
+            5: (0, -9),
+            6: (-1, -9),
+        },
+        (-27, 35): {4: (-31, 34), 5: (-32, 34), 6: (-33, 34), 7: (-34, 34)},
+        (-28, 35): {3: (-31, 34), 4: (-32, 34), 5: (-33, 34), 6: (-34, 34)},
+        (-29, 35): {2: (-31, 34), 3: (-32, 34), 4: (-33, 34), 5: (-34, 34)},
+        (-30, 35): {1: (-31, 34), 2: (-32, 34), 3: (-33, 34), 4: (-34, 34)},
+        (-18, 37): {2: (-21, 36), 3: (-22, 36), 4: (-23, 36), 5: (-24, 36)},
+        (-19, 37): {1: (-21, 36), 2: (-22, 36), 3: (-23, 36), 4: (-24, 36)},
+        (-24, -15): {10: (-34, -16)},
+        (-25, -15): {9: (-34, -16)},
+        (-26, -15): {8: (-34, -16)},
+        (-27, -15): {7: (-34, -16)},
+        (-28, -15): {6: (-34, -16)},
+        (-29, -15): {5: (-34, -16)},
+        (-30, -15): {4: (-34, -16)},
+        (-31, -15): {3: (-34, -16)},
+        (-32, -15): {2: (-34, -16)},
+        (-33, -15): {1: (-34, -16)},
+        (-25, 37): {2: (-28, 36), 3: (-29, 36), 4: (-30, 36)},
+        (-26, 37): {1: (-28, 36), 2: (-29, 36), 3: (-30, 36)},
+        (-25, 36): {
+            2: (-28, 35),
+            3: (-29, 35),
+            4: (-30, 35),
+            5: (-31, 34),
+            6: (-32, 34),
+            7: (-33, 34),
+            8: (-34, 34),
+        },
+        (-26, 36): {
+            1: (-28, 35),
+            2: (-29, 35),
+            3: (-30, 35),
+            4: (-31, 34),
+            5: (-32, 34),
+            6: (-33, 34),
+            7: (-34, 34),
+        },
+        (-19, -49): {7: (-26, -50), 8: (-27, -51), 9: (-28, -52), 10: (-29, -53)},
+        (-20, -49): {
+            6: (-26, -50),
+            7: (-27, -51),
+            8: (-28, -52),
+            9: (-29, -53),
+            10: (-30, -53),
+        },
+        (-21, -49): {
+            5: (-26, -50),
+            6: (-27, -51),
+            7: (-28, -52),
+            8: (-29, -53),
+            9: (-30, -53),
+            10: (-31, -53),
+        },
+        (-22, -49): {
+            4: (-26, -50),
+            5: (-27, -51),
+            6: (-28, -52),
+            7: (-29, -53),
+            8: (-30, -53),
+            9: (-31, -53),
+            10: (-32, -53),
+        },
+    },
+    6: {  # North
+        (3, -4): {4: (4, -8)},
+        (3, -5): {3: (4, -8)},
+        (3, -6): {2: (4, -8)},
+        (3, -7): {1: (4, -8)},
+    },
+}
+
+
+def format_travel(position):
+    """
+    Format a map position as a chat travel command.
+    """
+    return f"/travel {position[0]},{position[1]}"
+
+
+def _load_js_array(source, name):
+    """
+    Extract a `const <name> = [...]` literal from chasse.js and decode it.
+    """
+    match = re.search(rf"const {name} = (\[.*?\n\]);", source, re.DOTALL)
+    if not match:
+        raise ValueError(f"Could not find {name} in chasse.js")
+
+    literal = match.group(1)
+    # Quote the object keys and drop the trailing commas to get valid JSON
+    literal = re.sub(r"(\w+):", r'"\1":', literal)
+    literal = re.sub(r",(\s*[\]}])", r"\1", literal)
+    return json.loads(literal)
+
+
+def load_chasse_js(path=CHASSE_JS):
+    """
+    Load listHuntClues and listHintId from chasse.js.
+
+    Returns:
+        tuple: ({(x, y): frozenset(clue_ids)}, {clue_id: hint_name})
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    clue_maps = {}
+    for entry in _load_js_array(source, "listHuntClues"):
+        position = (int(entry["x"]), int(entry["y"]))
+        # listHuntClues.find() returns the first match, keep the first entry
+        if position not in clue_maps:
+            clue_maps[position] = frozenset(int(c) for c in entry["clues"])
+
+    hint_names = {
+        int(entry["clueid"]): entry["hintfr"]
+        for entry in _load_js_array(source, "listHintId")
+    }
+    return clue_maps, hint_names
+
+
+class ClueSolver:
+    """
+    In-process replacement for the dofus_hints page: answers
+    (x, y, direction, clue) -> target map within MAX_DISTANCE maps.
+    """
+
+    def __init__(self, clue_maps, hint_names, distances=None):
+        self.clue_maps = clue_maps
+        self.hint_names = hint_names
+        # Optional DistanceTable answering solves with a single array index
+        self.distances = distances
+
+    @classmethod
+    def from_chasse_js(cls, path=CHASSE_JS):
+        return cls(*load_chasse_js(path))
+
+    @classmethod
+    def from_clue_db(cls, js_path=CHASSE_JS):
+        """
+        Build a solver on top of the compiled clue database (see clue_db.py).
+        """
+        from dofus_hints.clue_db import load_clue_db
+        from dofus_hints.distance_table import load_distance_table
+
+        db = load_clue_db(js_path)
+        return cls(db, db.hint_names, load_distance_table(db))
+
+    def probe_positions(self, x, y, direction):
+        """
+        Return the maps checked by updateOptionClues, nearest first.
+
+        Returns:
+            list: [(offset, (x, y)), ...] for offsets 1..MAX_DISTANCE
+        """
+        if direction not in DIRECTION_STEPS:
+            raise ValueError(f"Invalid direction: {direction}")
+
+        x, y = POSITION_FIXES[direction].get((x, y), (x, y))
+        overrides = PROBE_OVERRIDES[direction].get((x, y), {})
+        step_x, step_y = DIRECTION_STEPS[direction]
+
+        return [
+            (
+                offset,
+                overrides.get(offset, (x + step_x * offset, y + step_y * offset)),
+            )
+            for offset in range(1, MAX_DISTANCE + 1)
+        ]
+
+    def reachable_clues(self, x, y, direction):
+        """
+        Return the clue ids that can be found from (x, y) in the given direction.
+        These are the options left enabled in clue-choice-select.
+        """
+        if self.distances is not None:
+            clue_ids, _ = self.distances.reachable(x, y, direction)
+            return set(clue_ids.tolist())
+
+        reachable = set()
+        for _, position in self.probe_positions(x, y, direction):
+            reachable.update(self.clue_maps.get(position, ()))
+        return reachable
+
+    def solve(self, x, y, direction, clue_id):
+        """
+        Find the nearest map holding `clue_id` from (x, y) in the given direction.
+
+        Returns:
+            tuple: (x, y) of the target map, or None if the clue is out of range
+        """
+        if self.distances is not None:
+            steps = self.distances.distance(x, y, direction, clue_id)
+            if steps is None:
+                return None
+            return self.probe_positions(x, y, direction)[steps - 1][1]
+
+        for _, position in self.probe_positions(x, y, direction):
+            if clue_id in self.clue_maps.get(position, ()):
+                return position
+        return None
+
+    def travel_command(self, x, y, direction, clue_id):
+        """
+        Same string as the data-travel attribute of hunt-clue-travel.
+        """
+        target = self.solve(x, y, direction, clue_id)
+        if target is None:
+            return None
+        return format_travel(target)
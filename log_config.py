@@ -0,0 +1,116 @@
+"""
+Logging setup shared by the app, the OCR pipeline and the hint solver.
+
+Modules log through the standard logging module with %-style arguments
+(log.debug("read %s", lines)), so a message under the configured level is
+never formatted. Levels and sinks are set in .env:
+
+    LOG_LEVEL   default level (INFO)
+    LOG_LEVELS  per-module levels, e.g. "OCR.screenshot=DEBUG,dofus_hints=WARNING"
+    LOG_JSON    optional JSON-lines file; each record carries the hunt id and
+                step set with set_hunt_context
+
+The JSON lines are written by a background thread.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_JSON = os.getenv("LOG_JSON", "")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Hunt and step of the records logged from now on
+hunt_context = {"hunt_id": None, "step": None}
+
+_listener = None
+
+
+def set_hunt_context(hunt_id=None, step=None):
+    """
+    Set the hunt id and step added to the JSON log records.
+    """
+    hunt_context["hunt_id"] = hunt_id
+    hunt_context["step"] = step
+
+
+class HuntContextFilter(logging.Filter):
+    """
+    Stamp records with the hunt context when they are logged.
+    """
+
+    def filter(self, record):
+        record.hunt_id = hunt_context["hunt_id"]
+        record.step = hunt_context["step"]
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "hunt_id": getattr(record, "hunt_id", None),
+            "step": getattr(record, "step", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def parse_levels(levels):
+    """
+    Parse "module=LEVEL,..." into {module: level}.
+    """
+    parsed = {}
+    for item in levels.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+def configure_logging(level=LOG_LEVEL, levels=LOG_LEVELS, json_path=LOG_JSON):
+    """
+    Log to the console at `level`, with per-module levels and the optional
+    JSON-lines file. Only the first call has an effect.
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    root.setLevel(level.upper())
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT, "%H:%M:%S"))
+    root.addHandler(console)
+
+    if json_path:
+        file_handler = logging.FileHandler(json_path, encoding="utf-8")
+        file_handler.setFormatter(JsonLinesFormatter())
+        records = queue.Queue()
+        _listener = QueueListener(records, file_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+        # The context is read in the logging thread, the line written later
+        queue_handler = QueueHandler(records)
+        queue_handler.addFilter(HuntContextFilter())
+        root.addHandler(queue_handler)
+
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
@@ -1,37 +1,39 @@
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
-import pyautogui
 import threading
 import json
 import os
-import re
-import pyperclip
 import random
-import pygame
 import time
-import sqlite3
-import numpy as np
-import mouse
-from pynput.keyboard import Key, Controller
-from fuzzywuzzy import fuzz
-from io import BytesIO
+import logging
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from pywinauto.keyboard import send_keys
-from OCR.screenshot import (
-    read_hunt_from_screenshot,
-    process_coordinates_image,
-)
+from log_config import configure_logging, set_hunt_context
+from startup import Warmup
+
+# The automation (pyautogui, mouse, pynput, pywinauto), the audio (pygame),
+# the OCR (cv2, tesseract) and the clue database are imported where they are
+# used, or by the warm-up, so the window shows up before they are loaded.
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 CONFIG_FILE = "config.json"
 
+# Resources each action needs, its button stays disabled until they are loaded
+ACTION_RESOURCES = {
+    "start_hunt_button": ("clue database", "OCR"),
+    "new_hunt_button": ("OCR",),
+    "north_button": ("clue database", "OCR"),
+    "west_button": ("clue database", "OCR"),
+    "east_button": ("clue database", "OCR"),
+    "south_button": ("clue database", "OCR"),
+}
+# Interval of the readiness checks during the warm-up
+READINESS_POLL_MS = 100
+# Rows of each report of the statistics panel
+STATS_ROWS = 15
+
 
 class CoordinateHelper:
     def __init__(self):
@@ -183,16 +185,28 @@ class RegionSelector(tk.Toplevel):
 
 
 class DofusTreasureApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, started=None):
         super().__init__()
+        self.started = started if started is not None else time.perf_counter()
+        self.warmup = Warmup()
         self.title("Dofus Treasure Hunt Helper")
         self.attributes("-topmost", True)
-        self.selenium_driver = None
+        self.clue_solver = None
+        self.hint_matcher = None
         self.hunt_started = False
         self.last_travel_cmd = None
         self.is_first_hint = True
+        self.hint_position = None
+        # Target and (step, hint count) of the last travel until the next
+        # hint shows up, and a travel to send again after a restart
+        self.travel_target = None
+        self.travel_progress = None
+        self.resume_travel = None
+        # (x, y, direction, clue) of the last solved hint, confirmed on arrival
+        self.last_solved = None
         self.current_hunt_id = None
         self.hintDirection = None
+        self.frame_source = None
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
         # Position near top-right
@@ -244,6 +258,15 @@ class DofusTreasureApp(tk.Tk):
             bg="#2E2E2E",
         )
 
+        # Resources still loading in the background
+        self.readiness_label = tk.Label(
+            self.main_frame,
+            text="Loading...",
+            fg="white",
+            bg="#2E2E2E",
+            font=("Arial", 10),
+        )
+
         self.separator = tk.Frame(self.main_frame, height=2, bg="gray")
 
         self.setup_button = tk.Button(
@@ -335,6 +358,15 @@ class DofusTreasureApp(tk.Tk):
             font=("Arial", 10),
         )
 
+        self.stats_button = tk.Button(
+            self.log_frame,
+            text="Stats",
+            font=("Arial", 12),
+            bg="#4F4F4F",
+            fg="white",
+            command=self.show_stats,
+        )
+
         self.clear_log_button = tk.Button(
             self.log_frame,
             text="Clear Log",
@@ -352,39 +384,22 @@ class DofusTreasureApp(tk.Tk):
         if self.is_config_valid():
             self.place_widgets()
 
-        self.initialize_selenium()
         self.initialize_database()
+        self.start_warmup()
+        # Runs once the event loop handles the window
+        self.after_idle(self.on_interactive)
 
     def initialize_database(self):
-        self.conn = sqlite3.connect(
-            "progression.db", check_same_thread=False, timeout=10
-        )
-        self.cursor = self.conn.cursor()
-        # Create the `hunt` table with fields for the new structure
-        self.cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS hunt (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                start_pos_zone TEXT,
-                start_pos_x INTEGER,
-                start_pos_y INTEGER,
-                last_hint_pos_x INTEGER,
-                last_hint_pos_y INTEGER,
-                step INTEGER,
-                total_steps INTEGER,
-                hints TEXT,
-                remaining_tries INTEGER,
-                status TEXT CHECK(status IN ('current', 'cancelled', 'finished')) DEFAULT 'current',
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
+        from progression import ProgressionStore
+        from solution_cache import SolutionCache
 
-        self.conn.commit()
+        # Opened (and former databases migrated) by its writer thread
+        self.progression = ProgressionStore()
+        self.solution_cache = SolutionCache(self.progression)
 
     def close_database(self):
-        if self.conn:
-            self.conn.close()
+        if self.progression:
+            self.progression.close()
 
     def toggle_debugging(self):
         if self.is_debugging:
@@ -396,6 +411,8 @@ class DofusTreasureApp(tk.Tk):
             threading.Thread(target=self.update_mouse_position, daemon=True).start()
 
     def update_mouse_position(self):
+        import pyautogui
+
         while self.is_debugging:
             # Get mouse position
             x, y = pyautogui.position()
@@ -410,6 +427,7 @@ class DofusTreasureApp(tk.Tk):
     def place_widgets(self):
         # Heading Label
         self.heading_label.pack(fill=tk.X, pady=10)
+        self.readiness_label.pack()
 
         self.position_label.pack(pady=10)
         self.toggle_button.pack(pady=10)
@@ -440,6 +458,7 @@ class DofusTreasureApp(tk.Tk):
             fill=tk.BOTH, expand=True, side="top", padx=10, pady=(0, 5)
         )
         self.clear_log_button.pack(fill=tk.X, side="bottom", padx=10, pady=(5, 0))
+        self.stats_button.pack(fill=tk.X, side="bottom", padx=10, pady=(5, 0))
 
     def end_hunt(self):
         if hasattr(self, "end_hunt_button"):
@@ -449,14 +468,23 @@ class DofusTreasureApp(tk.Tk):
         self.hunt_started = False
         self.last_travel_cmd = None
         self.is_first_hint = True
+        self.hint_position = None
+        self.travel_target = None
+        self.travel_progress = None
+        self.resume_travel = None
+        self.last_solved = None
         self.hintDirection = None
-        self.selenium_driver.refresh()
         # Change hunt status to completed
         if self.current_hunt_id:
+            self.progression.record(
+                "end", hunt_id=self.current_hunt_id, status="finished"
+            )
             self.set_hunt_to_finished()
         self.log_message("Hunt ended.", "green")
 
     def move_mouse_and_click(self, target_x, target_y):
+        import mouse
+
         steps_per_second = 160
         duration = 0.3
         start_x, start_y = mouse.get_position()
@@ -482,6 +510,10 @@ class DofusTreasureApp(tk.Tk):
 
     def run_automation(self, delay_between_actions=3.2):
         """Run the automation with specified delays between actions"""
+        import pyautogui
+        from pynput.keyboard import Controller
+        from pywinauto.keyboard import send_keys
+
         config = load_config()
         if "click_positions" not in config:
             self.log_message("No coordinates found in config! Please run setup first.")
@@ -539,13 +571,16 @@ class DofusTreasureApp(tk.Tk):
 
             # Wait for the player to reach the target position
             while True:
-                current_position = self.get_current_player_position()
+                current_position = self.get_current_player_position(
+                    expected=(start_pos_x, start_pos_y)
+                )
 
                 # Check if the player has arrived
                 if current_position == (start_pos_x, start_pos_y):
                     self.log_message(
                         "Player has successfully reached the start position."
                     )
+                    self.progression.record("arrival", x=start_pos_x, y=start_pos_y)
                     break  # Exit the loop when the position matches
 
                 # Log progress and wait before the next check
@@ -565,7 +600,11 @@ class DofusTreasureApp(tk.Tk):
         threading.Thread(target=self.run_automation, daemon=True).start()
 
     def force_hint_direction(self, direction):
+        from OCR.recorder import recorder
+
         self.hintDirection = direction
+        # The forced direction is the expected value of the recorded read
+        recorder.correct_direction(direction)
 
         # convert 0, 2, 4, 6 to N, S, W, E
         direction = {0: "East", 2: "South", 4: "West", 6: "North"}[direction]
@@ -575,13 +614,62 @@ class DofusTreasureApp(tk.Tk):
         self.start_hunt()
 
     def on_closing(self):
-        # Close Selenium WebDriver if initialized
-        if self.selenium_driver:
-            self.selenium_driver.quit()
+        self.warmup.shutdown()
+
+        # Let the debug writer finish the frames already queued
+        if self.warmup.is_ready("OCR"):
+            from OCR.debug_sink import debug_sink
+
+            debug_sink.flush(timeout=2)
+
+        # Commit the progression writes still queued
+        log.info("Learned solutions: %s", self.solution_cache.stats())
+        self.close_database()
 
         # Destroy the Tkinter window
         self.destroy()
 
+    def show_stats(self):
+        """
+        Open the analytics panel: slowest zones and most misread clues.
+        """
+        import analytics
+
+        window = tk.Toplevel(self)
+        window.title("Hunt statistics")
+        window.configure(bg="#2E2E2E")
+        report = scrolledtext.ScrolledText(
+            window, width=110, height=30, font=("Consolas", 9)
+        )
+
+        def refresh():
+            start = time.perf_counter()
+            zones = self.progression.query(analytics.slowest_zones, STATS_ROWS)
+            clues = self.progression.query(analytics.most_misread_clues, STATS_ROWS)
+            elapsed = time.perf_counter() - start
+            lines = (
+                ["Slowest zones (seconds per step)"]
+                + analytics.format_table(analytics.ZONE_COLUMNS, zones)
+                + ["", "Most misread clues"]
+                + analytics.format_table(analytics.CLUE_COLUMNS, clues)
+                + ["", f"Queried in {elapsed * 1000:.1f} ms"]
+            )
+            report.configure(state="normal")
+            report.delete("1.0", tk.END)
+            report.insert(tk.END, "\n".join(lines))
+            report.configure(state="disabled")
+
+        tk.Button(
+            window,
+            text="Refresh",
+            font=("Arial", 12),
+            bg="#4F4F4F",
+            fg="white",
+            command=refresh,
+        ).pack(fill=tk.X, side="bottom", padx=10, pady=5)
+        report.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        refresh()
+
     def clear_log(self):
         """
         Clear the log display.
@@ -594,6 +682,7 @@ class DofusTreasureApp(tk.Tk):
         """
         Log a message to the log display with the specified color.
         """
+        log.log(logging.ERROR if color == "red" else logging.INFO, message)
         self.log_display.configure(state="normal")
 
         # Generate a unique tag for this message
@@ -688,33 +777,76 @@ class DofusTreasureApp(tk.Tk):
 
         return False
 
-    def initialize_selenium(self):
-        chrome_options = Options()
-        # chrome_options.add_argument("--headless")  # Run in the background
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:108.0) Gecko/20100101 Firefox/108.0"
+    def start_warmup(self):
+        """
+        Load the clue database, the OCR and the audio in parallel
+        in the background, with the actions that need them disabled meanwhile.
+        """
+        for button_name in ACTION_RESOURCES:
+            getattr(self, button_name).config(state=tk.DISABLED)
+        self.loading = {"clue database", "OCR", "audio"}
+        self.warmup.start("clue database", self.initialize_solver)
+        self.warmup.start("OCR", self.initialize_ocr)
+        self.warmup.start("audio", self.initialize_audio)
+        self.after(READINESS_POLL_MS, self.update_readiness)
+
+    def update_readiness(self):
+        """
+        Enable the actions whose resources finished loading, until all did.
+        """
+        pending = self.warmup.pending()
+        for name in sorted(self.loading - set(pending)):
+            self.loading.discard(name)
+            error = self.warmup.error(name)
+            if error:
+                self.log_message(f"Failed to load {name}: {error}", "red")
+                continue
+            for button_name, resources in ACTION_RESOURCES.items():
+                if name in resources and self.warmup.is_ready(*resources):
+                    getattr(self, button_name).config(state=tk.NORMAL)
+
+        if pending:
+            self.readiness_label.config(text=f"Loading: {', '.join(pending)}...")
+            self.after(READINESS_POLL_MS, self.update_readiness)
+            return
+
+        failed = [name for name in self.warmup.timings if self.warmup.error(name)]
+        self.readiness_label.config(
+            text=f"Unavailable: {', '.join(failed)}" if failed else "Ready"
+        )
+        self.log_message(
+            f"Startup: {self.warmup.report()}, "
+            f"ready in {(time.perf_counter() - self.started) * 1000:.1f} ms"
         )
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option("useAutomationExtension", False)
 
-        try:
-            driver = webdriver.Chrome(options=chrome_options)
-            screen_width = driver.execute_script("return screen.availWidth;")
-            screen_height = driver.execute_script("return screen.availHeight;")
-            x_position = (screen_width - 1024) // 2
-            y_position = (screen_height - 768) // 2
-            driver.set_window_position(x_position, y_position)
-
-            # Open the website
-            file_path = os.path.abspath("./dofus_hints/index.html")
-            driver.get(f"file://{file_path}")
-            self.selenium_driver = driver
-        except Exception as e:
-            self.log_message(f"Failed to initialize Selenium: {e}", "red")
-            self.selenium_driver = None
+    def on_interactive(self):
+        elapsed = time.perf_counter() - self.started
+        self.log_message(f"Time to interactive: {elapsed * 1000:.1f} ms")
+
+    def initialize_solver(self):
+        from dofus_hints.solver import ClueSolver
+        from dofus_hints.matcher import HintMatcher
+
+        clue_solver = ClueSolver.from_clue_db()
+        self.hint_matcher = HintMatcher(clue_solver.hint_names)
+        self.clue_solver = clue_solver
+
+    def initialize_ocr(self):
+        """
+        Create the OCR engines and the frame source ahead of the first read.
+        """
+        from OCR.screenshot import warm_up
+        from OCR.frame_source import create_frame_source
+
+        engines = warm_up()
+        if self.is_config_valid():
+            self.frame_source = create_frame_source(self.config_data)
+        return engines
+
+    def initialize_audio(self):
+        import pygame
+
+        pygame.mixer.init()
 
     def play_with_volume(self, file):
         """
@@ -723,8 +855,12 @@ class DofusTreasureApp(tk.Tk):
         :param file: Path to the audio file
         :param volume: Volume level (0.0 to 1.0)
         """
+        # The mixer is initialized by the warm-up
+        if not self.warmup.wait("audio"):
+            return
+        import pygame
+
         volume = 0.2
-        pygame.mixer.init()
         pygame.mixer.music.load(file)
         pygame.mixer.music.set_volume(volume)
         pygame.mixer.music.play()
@@ -733,31 +869,65 @@ class DofusTreasureApp(tk.Tk):
             continue
 
     def start_hunt(self):
-        if not self.selenium_driver:
+        if not self.clue_solver:
             return
         if not self.hunt_started:
+            self.resume_hunt()
             self.start_hunt_button.config(state=tk.NORMAL)
             self.end_hunt_button.config(state=tk.NORMAL)
             self.start_hunt_button.config(text="Next Hint")
             self.hunt_started = True
         self.next_hint()
 
+    def resume_hunt(self):
+        """
+        Restore the in-flight state of the hunt in progress from its journal.
+        """
+        start = time.perf_counter()
+        try:
+            state = self.progression.resume()
+        except Exception as e:
+            self.log_message(f"Cannot resume the hunt: {e}", "orange")
+            return
+        if state is None:
+            return
+
+        self.current_hunt_id = state["hunt_id"]
+        self.is_first_hint = state["is_first_hint"]
+        self.hint_position = state["hint_position"]
+        self.last_travel_cmd = state["last_travel_cmd"]
+        self.travel_target = state["travel_target"]
+        self.travel_progress = state["travel_progress"]
+        self.last_solved = state["last_solved"]
+        # The player may not have reached the last target before the restart
+        self.resume_travel = self.last_travel_cmd if self.travel_target else None
+        set_hunt_context(self.current_hunt_id, state["step"])
+        self.log_message(
+            f"Resumed hunt {self.current_hunt_id} at step {state['step']} "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms."
+        )
+
     def next_hint(self):
         if self.hunt_started is False:
             return
 
+        from OCR.screenshot import read_hunt_from_screenshot
+        from OCR.recorder import recorder
+
         def do_hunt():
+            import pyperclip
+
             try:
-                self.log_message("Searching new hint...")
                 self.start_hunt_button.config(state=tk.DISABLED)
+                # The target is solved already, the widget is read once there
+                if self.resume_travel:
+                    travel_cmd, self.resume_travel = self.resume_travel, None
+                    self.log_message(f"Resuming travel: {travel_cmd}")
+                    self.input_travel_command(travel_cmd)
+                    self.start_hunt_button.config(state=tk.NORMAL)
+                    return
 
-                treasure_region = self.config_data["treasure_region"]
-                region_tuple = (
-                    treasure_region["x"],
-                    treasure_region["y"],
-                    treasure_region["width"],
-                    treasure_region["height"],
-                )
+                self.log_message("Searching new hint...")
 
                 # Sending to OCR
                 required_fields = [
@@ -771,10 +941,29 @@ class DofusTreasureApp(tk.Tk):
                     "last_hint_pos_x",
                     "last_hint_pos_y",
                 ]
+                # Reachable clues only depend on the position, so compute them
+                # for every direction before the OCR result arrives
+                prefetched_candidates = None
+                if not self.is_first_hint and self.hint_position is not None:
+                    prefetched_candidates = (
+                        self.hint_position,
+                        self.get_hint_candidates(*self.hint_position),
+                    )
+
+                # Hints already recognized for this step are not read again
+                progression = (
+                    None if self.is_first_hint else self.get_last_progression()
+                )
+
                 self.log_message("Reading hints...")
-                screenshot = pyautogui.screenshot(region=region_tuple)
-                response_data = read_hunt_from_screenshot(screenshot)
+                # One grab for the widget and the arrival check of the tick
+                frame = self.capture_frame()
+                screenshot = frame["treasure_region"]
+                response_data = read_hunt_from_screenshot(
+                    screenshot, progression=progression, hint_check=self.is_known_hint
+                )
                 data = json.loads(response_data)
+                recorder.record_treasure(screenshot, data)
                 missing_fields = [
                     field for field in required_fields if field not in data
                 ]
@@ -784,6 +973,10 @@ class DofusTreasureApp(tk.Tk):
                     )
                     self.log_message("-" * 40)
                     self.log_message(f"Received response: {data}", "red")
+                    self.dump_debug_frames(f"Missing fields: {missing_fields}")
+                    self.progression.record(
+                        "ocr_retry", reason=f"Missing fields: {missing_fields}"
+                    )
                     self.start_hunt_button.config(state=tk.NORMAL)
                     # self.next_hint()
                     return
@@ -791,6 +984,8 @@ class DofusTreasureApp(tk.Tk):
                 # Check if hints exist and are valid
                 if not data["hints"] or not isinstance(data["hints"], list):
                     self.log_message("Error: No hints provided in response.", "red")
+                    self.dump_debug_frames("No hints in OCR output")
+                    self.progression.record("ocr_retry", reason="No hints")
                     # self.next_hint()
                     self.start_hunt_button.config(state=tk.NORMAL)
                     return
@@ -809,11 +1004,28 @@ class DofusTreasureApp(tk.Tk):
                         "Error: Invalid hint structure in response. Retrying...", "red"
                     )
                     self.log_message(f"Received hints: {data['hints']}", "red")
+                    self.progression.record("ocr_retry", reason="Invalid hint")
                     # self.next_hint()
                     return
 
                 # Save progression to JSON
                 self.save_progression(data)
+                # The next hint showing up means the player reached the map of
+                # the last hint, where it stands is that hint's solution
+                progress = (data["step"] or 0, len(data["hints"]))
+                if self.travel_target and progress > self.travel_progress:
+                    x, y = self.get_current_player_position(
+                        expected=self.travel_target, frame=frame
+                    )
+                    if x is None:
+                        x, y = self.travel_target
+                    elif self.last_solved:
+                        self.solution_cache.confirm(*self.last_solved, (x, y))
+                    self.progression.record(
+                        "arrival", x=x, y=y, target=self.travel_target
+                    )
+                    self.travel_target = None
+                    self.travel_progress = None
                 # Set is_first_hint to False if it's not step 1 and if the hints array is not length one
                 if data["step"] != 1 or len(data["hints"]) != 1:
                     self.is_first_hint = False
@@ -830,7 +1042,7 @@ class DofusTreasureApp(tk.Tk):
 
                 # Input data into hint finder
                 self.log_message("Searching hint...")
-                travel_cmd = self.input_dofus_hint(data)
+                travel_cmd = self.input_dofus_hint(data, prefetched_candidates)
                 if travel_cmd is None:
                     self.log_message(
                         "Hint not found, You can try again by clicking 'Next Hint'.",
@@ -838,6 +1050,7 @@ class DofusTreasureApp(tk.Tk):
                     )
                     self.start_hunt_button.config(state=tk.NORMAL)
                     self.play_with_volume("./assets/error.wav")
+                    self.dump_debug_frames(f"Hint not found: {last_hint}")
                     return
 
                 # Check clipboard for /travel
@@ -853,6 +1066,15 @@ class DofusTreasureApp(tk.Tk):
 
                 # Update the last travel command
                 self.last_travel_cmd = travel_cmd
+                self.travel_target = self.hint_position
+                self.travel_progress = progress
+                self.progression.record(
+                    "travel",
+                    command=travel_cmd,
+                    target=self.travel_target,
+                    step=progress[0],
+                    hints=progress[1],
+                )
 
                 # Paste the /travel command
                 pyperclip.copy(travel_cmd)
@@ -867,317 +1089,190 @@ class DofusTreasureApp(tk.Tk):
 
         threading.Thread(target=do_hunt).start()
 
-    def input_dofus_hint(self, json_response):
-        driver = self.selenium_driver
+    def is_known_hint(self, text):
+        """
+        Whether an OCR'd hint is close enough to a clue name to be matched.
+        """
+        if self.hint_matcher is None:
+            return True
+        clue_id, _ = self.hint_matcher.best_match(text)
+        return clue_id is not None
+
+    def get_hint_candidates(self, x, y):
+        """
+        Return the clues reachable from (x, y), keyed by direction.
+        """
+        return {
+            direction: self.clue_solver.reachable_clues(x, y, direction)
+            for direction in (0, 2, 4, 6)
+        }
+
+    def input_dofus_hint(self, json_response, prefetched_candidates=None):
         current_hunt_progression = json_response
         start_x = json_response["start_pos_x"]
         start_y = json_response["start_pos_y"]
 
         hint_text = json_response["hints"][-1]["hintText"]
-        direction_code = str(json_response["hints"][-1]["hintDirection"])
-
-        # Direction mapping
-        # "0" -> East, "2" -> South, "4" -> West, "6" -> North
-        direction_map = {
-            "6": "huntupwards",  # Upwards
-            "0": "huntright",  # Right
-            "4": "huntleft",  # Left
-            "2": "huntdownwards",  # Downwards
-        }
+        direction = self.hintDirection
+        if direction is None:
+            direction = json_response["hints"][-1]["hintDirection"]
 
         try:
-            # Check if it's the first step and hint, if yes, input the start position, else get the lastHintPosition from the progression logs
-            x_input = driver.find_element(By.ID, "huntposx")
-            y_input = driver.find_element(By.ID, "huntposy")
+            # Check if it's the first step and hint, if yes, use the start position, else the last solved hint position
             if self.is_first_hint:
-                print("Its first hint input")
-                x_input.clear()
-                x_input.send_keys(str(start_x))
-                y_input.clear()
-                y_input.send_keys(str(start_y))
+                log.debug("First hint input, starting from the start position")
+                x, y = start_x, start_y
                 self.is_first_hint = False
+            elif self.hint_position is not None:
+                x, y = self.hint_position
             else:
-                # Fill x, y inputs with current position if empty
-                x = x_input.get_attribute("value")
-                y = y_input.get_attribute("value")
-                self.log_message("in else conditon")
-                if int(x) == 0 and int(y) == 0:
-                    print("Its first dofus db input")
-                    current_hunt_progression = self.get_last_progression()
-                    self.log_message(f"in {current_hunt_progression}")
-
-                    if (
-                        current_hunt_progression is None
-                        or current_hunt_progression["last_hint_pos_x"] is None
-                        or current_hunt_progression["last_hint_pos_y"] is None
-                    ):
-                        current_position = self.get_current_player_position()
-                        self.log_message(f"Player pos: {current_position}")
-
-                        if current_position:
-                            x = current_position[0]
-                            y = current_position[1]
-                        else:
-                            self.log_message("Error loading player pos.", "red")
-                    else:
-
-                        x = current_hunt_progression["last_hint_pos_x"]
-                        y = current_hunt_progression["last_hint_pos_y"]
-                        self.log_message(f"seems to have all: {x}, {y}")
-
-                    self.log_message(f"Using pos: [{x}, {y}]")
-                    x_input.clear()
-                    x_input.send_keys(str(x))
-                    y_input.clear()
-                    y_input.send_keys(str(y))
-
-            # Click the direction button
-            direction_id = direction_map[str(direction_code)]
-            driver.execute_script(f"document.querySelector('#{direction_id}').click();")
-
-            # Normalize the hint_text (remove extra spaces, case insensitive)
-            normalized_hint_text = re.sub(r"\s+", " ", hint_text.strip().lower())
-
-            # Find the <select> element
-            select_element = driver.find_element(By.ID, "clue-choice-select")
-            select_object = Select(select_element)
-
-            # Iterate through options and find the closest match
-            enabled_options = [
-                option
-                for option in select_object.options
-                if not option.get_attribute("disabled")
-            ]
-            for option in enabled_options:
-                option_text = re.sub(r"\s+", " ", option.text.strip().lower())
-
-                # Calculate similarity score using fuzzy matching
-                similarity_score = self.compare_hint_texts(
-                    normalized_hint_text, option_text
-                )
+                log.debug("First solver input, loading the last progression")
+                current_hunt_progression = self.get_last_progression()
+                self.log_message(f"in {current_hunt_progression}")
+
                 if (
-                    similarity_score >= 95
-                ):  # Using a higher threshold since we're checking word by word
-                    select_object.select_by_visible_text(option.text)
-                    self.log_message(
-                        f"Selected hint: {option.text} (Similarity: {similarity_score}%)",
-                        "green",
-                    )
-                    break
+                    current_hunt_progression is None
+                    or current_hunt_progression["last_hint_pos_x"] is None
+                    or current_hunt_progression["last_hint_pos_y"] is None
+                ):
+                    current_position = self.get_current_player_position()
+                    self.log_message(f"Player pos: {current_position}")
+                    x, y = current_position
+                    if x is None or y is None:
+                        self.log_message("Error loading player pos.", "red")
+                        return None
+                else:
+                    x = int(current_hunt_progression["last_hint_pos_x"])
+                    y = int(current_hunt_progression["last_hint_pos_y"])
+                    self.log_message(f"seems to have all: {x}, {y}")
+
+                # Keep the OCR result as the progression to save
+                current_hunt_progression = json_response
+
+            self.log_message(f"Using pos: [{x}, {y}]")
+
+            # Solutions confirmed in past hunts come before any solving
+            from dofus_hints.matcher import normalize_hint_text
+            from dofus_hints.solver import format_travel
+
+            clue = normalize_hint_text(hint_text)
+            if self.hintDirection is not None:
+                self.progression.record(
+                    "forced",
+                    clue=clue,
+                    direction=direction,
+                    read=json_response["hints"][-1].get("hintDirection"),
+                )
+            target = self.solution_cache.get(x, y, direction, clue)
+            cached = target is not None
+            if cached:
+                self.log_message(
+                    f"Learned solution: [{target[0]}, {target[1]}]", "green"
+                )
             else:
-                self.log_message("No matching hint found.", "red")
-                return None
-
-            form = driver.find_element(By.ID, "hunt-solver-data")
-            form.submit()
-
-            # Check for the result position
-            result_element = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "//div[@class='hunt-clue-result-position' and @id='hunt-clue-travel']",
-                    )
+                target = self.solve_hint(
+                    x, y, direction, hint_text, prefetched_candidates
                 )
+                if target is None:
+                    return None
+            self.hint_position = target
+            self.last_solved = (x, y, direction, clue)
+            self.progression.record(
+                "solved",
+                x=x,
+                y=y,
+                direction=direction,
+                clue=clue,
+                target=target,
+                cached=cached,
             )
 
-            x = x_input.get_attribute("value")
-            y = y_input.get_attribute("value")
-            current_hunt_progression["last_hint_pos_x"] = x
-            current_hunt_progression["last_hint_pos_y"] = y
+            current_hunt_progression["last_hint_pos_x"] = target[0]
+            current_hunt_progression["last_hint_pos_y"] = target[1]
             self.save_progression(current_hunt_progression)
 
-            # Extract the data-travel attribute
-            return result_element.get_attribute("data-travel")
+            return format_travel(target)
         except Exception as e:
             self.log_message(f"Error while searching hint: {e}", "red")
             return None
 
-    def execute_with_retries(self, cursor, query, params, retries=5, delay=0.5):
-        for attempt in range(retries):
-            try:
-                cursor.execute(query, params)
-                return
-            except sqlite3.OperationalError as e:
-                if "database is locked" in str(e):
-                    print(f"Database is locked. Retrying {attempt + 1}/{retries}...")
-                    time.sleep(delay)
-                else:
-                    raise
-        raise ValueError("Failed to execute query after multiple retries.")
+    def solve_hint(self, x, y, direction, hint_text, prefetched_candidates=None):
+        """
+        Match a hint among the clues reachable from (x, y) in a direction and
+        return the (x, y) of its map, or None.
+        """
+        # Only the clues reachable in this direction are candidates,
+        # like the enabled options of clue-choice-select
+        if prefetched_candidates and prefetched_candidates[0] == (x, y):
+            candidates = prefetched_candidates[1][direction]
+        else:
+            candidates = self.clue_solver.reachable_clues(x, y, direction)
 
-    def save_progression(self, data):
-        try:
-            # Serialize hints into JSON
-            hints_json = json.dumps(data.get("hints", []))
-            current_hunt_id = data.get("id")
-
-            # Retry logic for database access
-            def execute_with_retries(query, params):
-                self.execute_with_retries(self.cursor, query, params)
-
-            if current_hunt_id is None:
-                self.cursor.execute(
-                    """
-                    SELECT * FROM hunt
-                    WHERE status = 'current'
-                    """
-                )
-                current_hunt = self.cursor.fetchone()
-
-                if current_hunt:
-                    self.current_hunt_id = current_hunt[0]
-                    execute_with_retries(
-                        """
-                        UPDATE hunt
-                        SET 
-                            start_pos_zone = ?,
-                            start_pos_x = ?,
-                            start_pos_y = ?,
-                            last_hint_pos_x = ?,
-                            last_hint_pos_y = ?,
-                            step = ?,
-                            total_steps = ?,
-                            hints = ?,
-                            remaining_tries = ?
-                        WHERE id = ?
-                        """,
-                        (
-                            data.get("start_pos_zone"),
-                            data.get("start_pos_x"),
-                            data.get("start_pos_y"),
-                            data.get("last_hint_pos_x"),
-                            data.get("last_hint_pos_y"),
-                            data.get("step"),
-                            data.get("total_steps"),
-                            hints_json,
-                            data.get("remaining_tries"),
-                            current_hunt[0],
-                        ),
-                    )
-                    current_hunt_id = current_hunt[0]
-                else:
-                    execute_with_retries(
-                        """
-                        INSERT INTO hunt (
-                            start_pos_zone,
-                            start_pos_x,
-                            start_pos_y,
-                            last_hint_pos_x,
-                            last_hint_pos_y,
-                            step,
-                            total_steps,
-                            hints,
-                            remaining_tries,
-                            status
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            data.get("start_pos_zone"),
-                            data.get("start_pos_x"),
-                            data.get("start_pos_y"),
-                            data.get("last_hint_pos_x"),
-                            data.get("last_hint_pos_y"),
-                            data.get("step"),
-                            data.get("total_steps"),
-                            hints_json,
-                            data.get("remaining_tries"),
-                            "current",
-                        ),
-                    )
-                    self.current_hunt_id = self.cursor.lastrowid
-            else:
-                self.current_hunt_id = current_hunt_id
-                execute_with_retries(
-                    """
-                    INSERT INTO hunt (
-                        id, start_pos_zone, start_pos_x, start_pos_y,
-                        last_hint_pos_x, last_hint_pos_y, step, total_steps, hints, remaining_tries
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(id) DO UPDATE SET
-                        start_pos_zone = excluded.start_pos_zone,
-                        start_pos_x = excluded.start_pos_x,
-                        start_pos_y = excluded.start_pos_y,
-                        last_hint_pos_x = excluded.last_hint_pos_x,
-                        last_hint_pos_y = excluded.last_hint_pos_y,
-                        step = excluded.step,
-                        total_steps = excluded.total_steps,
-                        hints = excluded.hints,
-                        remaining_tries = excluded.remaining_tries
-                    """,
-                    (
-                        current_hunt_id,
-                        data.get("start_pos_zone"),
-                        data.get("start_pos_x"),
-                        data.get("start_pos_y"),
-                        data.get("last_hint_pos_x"),
-                        data.get("last_hint_pos_y"),
-                        data.get("step"),
-                        data.get("total_steps"),
-                        hints_json,
-                        data.get("remaining_tries"),
-                    ),
-                )
+        candidate_names = sorted(
+            self.clue_solver.hint_names[clue_id] for clue_id in candidates
+        )
+        self.log_message(
+            f"Candidates ({len(candidate_names)}): {', '.join(candidate_names)}"
+        )
 
-            self.conn.commit()
-            self.log_message(f"Progression saved for id {self.current_hunt_id}.")
+        clue_id, similarity_score = self.hint_matcher.match_constrained(
+            hint_text, candidates
+        )
+        if clue_id is None:
+            from dofus_hints.matcher import normalize_hint_text
 
-        except sqlite3.OperationalError as e:
-            if "database is locked" in str(e):
-                raise ValueError("Database is locked. Please retry.")
-            else:
-                raise
-        except Exception as e:
-            raise ValueError(e)
+            self.log_message(
+                f"No matching hint found (best similarity: {similarity_score}%).",
+                "red",
+            )
+            self.progression.record(
+                "match_failure",
+                clue=normalize_hint_text(hint_text),
+                direction=direction,
+                score=similarity_score,
+            )
+            return None
+
+        clue_name = self.clue_solver.hint_names[clue_id]
+        self.log_message(
+            f"Selected hint: {clue_name} (Similarity: {similarity_score}%)",
+            "green",
+        )
+
+        target = self.clue_solver.solve(x, y, direction, clue_id)
+        if target is None:
+            self.log_message(f"{clue_name} is out of range.", "red")
+        return target
+
+    def save_progression(self, data):
+        # Written by the persistence thread, the hunt id is known once stored
+        step = data.get("step")
+        self.progression.save(data).add_done_callback(
+            lambda saved: self.on_progression_saved(saved, step)
+        )
+
+    def on_progression_saved(self, saved, step):
+        """
+        Keep the id of the hunt a progression was saved to (persistence thread).
+        """
+        error = saved.exception()
+        if error is not None:
+            self.log_message(f"Error while saving progression: {error}", "red")
+            return
+        self.current_hunt_id = saved.result()
+        set_hunt_context(self.current_hunt_id, step)
+        self.log_message(f"Progression saved for id {self.current_hunt_id}.")
 
     def get_last_progression(self):
         try:
-            # Retrieve the most recent progression entry by timestamp
-            self.cursor.execute(
-                """
-                SELECT start_pos_zone, start_pos_x, start_pos_y,
-                    last_hint_pos_x, last_hint_pos_y, step, total_steps,
-                    hints, remaining_tries, status, timestamp
-                FROM hunt
-                WHERE status = 'current'
-                ORDER BY timestamp DESC
-                LIMIT 1
-                """
-            )
-            result = self.cursor.fetchone()
-            if result:
-                # Ensure 'hints' is a valid JSON string before deserializing
-                self.current_hunt_id = result[0]
-                print(f"load last hunt {self.current_hunt_id}")
-
-                hints_raw = result[8]
-                try:
-                    hints = (
-                        json.loads(hints_raw)
-                        if isinstance(hints_raw, (str, bytes, bytearray))
-                        else []
-                    )
-                except json.JSONDecodeError:
-                    # Handle invalid JSON data gracefully
-                    self.log_message(
-                        "Invalid JSON in 'hints' column; defaulting to empty list",
-                        "orange",
-                    )
-                    hints = []
-
-                return {
-                    "start_pos_zone": result[0],
-                    "start_pos_x": result[1],
-                    "start_pos_y": result[2],
-                    "last_hint_pos_x": result[3],
-                    "last_hint_pos_y": result[4],
-                    "step": result[5],
-                    "total_steps": result[6],
-                    "hints": hints,
-                    "remaining_tries": result[7],
-                    "timestamp": result[10],
-                }
+            # Most recent hunt in progress, with the hints of its current
+            # step. Called by the hunt threads right after their saves, so
+            # the read waits for the queued writes
+            progression = self.progression.load_current(wait=True)
+            if progression:
+                self.current_hunt_id = progression["id"]
+                log.info("Loaded last hunt %s", self.current_hunt_id)
+            return progression
         except Exception as e:
             self.log_message(f"No hunt found: {e}", "orange")
             return None
@@ -1189,24 +1284,20 @@ class DofusTreasureApp(tk.Tk):
         if not self.current_hunt_id:
             raise ValueError("Current hunt ID is not set. Cannot update hunt status.")
 
-        try:
-            # Execute the update query
-            self.cursor.execute(
-                """
-                UPDATE hunt
-                SET status = ?
-                WHERE id = ?
-                """,
-                ("finished", self.current_hunt_id),
-            )
-            self.connection.commit()  # Ensure the changes are saved to the database
-            print(f"Hunt ID {self.current_hunt_id} set to 'finished'.")
-        except Exception as e:
-            # Log or raise an exception for debugging
-            print(f"Error updating hunt status: {e}")
-            raise
+        hunt_id = self.current_hunt_id
+
+        def on_finished(written):
+            if written.exception() is not None:
+                log.error("Error updating hunt status: %s", written.exception())
+            else:
+                log.info("Hunt ID %s set to 'finished'.", hunt_id)
+
+        self.progression.set_status(hunt_id, "finished").add_done_callback(on_finished)
 
     def input_travel_command(self, travel_cmd):
+        import pyautogui
+        from pywinauto.keyboard import send_keys
+
         try:
             if "chat_region" not in self.config_data:
                 raise ValueError("Chat region not set.")
@@ -1222,25 +1313,42 @@ class DofusTreasureApp(tk.Tk):
         except Exception as e:
             self.log_message(f"Error while inputting travel command: {e}", "red")
 
-    def get_current_player_position(self):
-        try:
-            # Define the region for the player position coordinates
-            player_region = self.config_data["player_region"]
-            region_tuple = (
-                player_region["x"],
-                player_region["y"],
-                player_region["width"],
-                player_region["height"],
-            )
+    def capture_frame(self):
+        """Grab a new frame and return its configured regions, {name: array}"""
+        from OCR.frame_source import REGION_NAMES, create_frame_source
 
-            # Take a screenshot of the player position region
-            screenshot = pyautogui.screenshot(region=region_tuple)
-            # Convert screenshot to numpy array
-            screenshot_array = np.array(screenshot)
+        regions = {
+            name: self.config_data[name]
+            for name in REGION_NAMES
+            if isinstance(self.config_data.get(name), dict)
+        }
+        # Regions selected again in the setup need a new frame source
+        if self.frame_source is None or self.frame_source.regions != regions:
+            self.frame_source = create_frame_source(self.config_data)
+        return self.frame_source.capture()
+
+    def get_current_player_position(self, expected=None, frame=None):
+        """
+        Read the player position, (None, None) if it could not be read.
+
+        Args:
+            expected: (x, y) the player is travelling to, see
+                process_coordinates_image
+            frame: Regions of a frame captured already in this tick, else a
+                new frame is grabbed
+        """
+        from OCR.screenshot import process_coordinates_image
+        from OCR.recorder import recorder
+
+        try:
+            if frame is None:
+                frame = self.capture_frame()
+            screenshot_array = frame["player_region"]
 
             # Process screenshot to get coordinates
             self.log_message("Reading player position...")
-            response_data = process_coordinates_image(screenshot_array)
+            response_data = process_coordinates_image(screenshot_array, expected)
+            recorder.record_player(screenshot_array, response_data)
 
             # Check if coordinates were found
             if response_data["success"] and response_data["coordinates"]:
@@ -1253,30 +1361,24 @@ class DofusTreasureApp(tk.Tk):
 
         except Exception as e:
             self.log_message(f"Error retrieving player position: {e}", "red")
+            self.dump_debug_frames(f"Player position: {e}")
             return None, None
 
-    def compare_hint_texts(self, hint_text, option_text):
-        # Split into words
-        hint_words = hint_text.lower().split()
-        option_words = option_text.lower().split()
-
-        # If different number of words, they're not the same hint
-        if len(hint_words) != len(option_words):
-            return 0
-
-        # Compare each word pair and get minimum similarity
-        word_similarities = []
-        for hint_word, option_word in zip(hint_words, option_words):
-            word_similarity = fuzz.ratio(hint_word, option_word)
-            word_similarities.append(word_similarity)
+    def dump_debug_frames(self, reason):
+        """
+        Save the last OCR debug frames after a failed step.
+        """
+        from OCR.debug_sink import debug_sink
 
-        # Return the minimum similarity found
-        # This way, if any word pair has low similarity, the overall score will be low
-        return min(word_similarities)
+        directory = debug_sink.dump_failure(reason)
+        if directory:
+            self.log_message(f"Debug frames saved to {directory}", "red")
 
 
 def main():
-    app = DofusTreasureApp()
+    started = time.perf_counter()
+    configure_logging()
+    app = DofusTreasureApp(started)
     app.mainloop()
 
 
@@ -0,0 +1,784 @@
+"""
+Hunt progression stored in progression.db.
+
+A hunt row holds the widget header (start position, current step, tries)
+and the position of the last solved hint; each step of a hunt has a step
+row, and each hint read on a step a hint row:
+
+    hunt  1 -- n  step  1 -- n  hint
+
+Hints are only ever appended: saving the widget state inserts the hints
+not stored yet for the step and updates the hunt row, so a save costs the
+same on the first and the last step of a hunt.
+
+The database is written by a single background thread, which owns the only
+write connection (WAL journal, synchronous=NORMAL). Writes are queued and
+return a Future right away; the writes queued while a transaction commits
+are committed together in the next one. Reads use a separate read-only
+connection and return what is committed, without waiting for the queue
+(the UI reads from the Tk thread); a reader that needs its own writes
+passes wait=True to also see every write queued before the read. Nothing
+else writes to the database, so "database is locked" never reaches the
+callers.
+
+Each hunt also has an append-only journal of what happened during it (the
+event table): steps and hints read, targets solved, travel commands sent
+and arrivals. A save journals its new step and hints in the same
+transaction. replay() folds the journal of the hunt in progress back into
+the in-flight state of the app (first hint or not, last solved position,
+last travel command and whether the player arrived), so a hunt resumes
+after a crash without reading the widget again or solving its hints again.
+
+The solution table keeps the hint solutions learned from past hunts (see
+solution_cache.py), and the zone_stats and clue_stats tables the analytics
+aggregates, updated with each journal event (see analytics.py).
+
+Databases with the former single-table schema (the hint list of the
+current step serialized as JSON in hunt.hints) are migrated when opened.
+"""
+
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+
+import analytics
+
+log = logging.getLogger(__name__)
+
+PROGRESSION_DB = "progression.db"
+# PRAGMA user_version of the current schema; 0 is the former hunt table,
+# 3 adds the event journal, 4 the learned solutions, 5 the analytics
+SCHEMA_VERSION = 5
+ANALYTICS_VERSION = 5
+# With WAL, NORMAL only syncs at checkpoints: a commit survives a crash of
+# the app, only a power loss can undo the last ones
+JOURNAL_MODE = "WAL"
+SYNCHRONOUS = "NORMAL"
+# Writes committed in one transaction at most
+WRITE_BATCH_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hunt (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_pos_zone TEXT,
+    start_pos_x INTEGER,
+    start_pos_y INTEGER,
+    last_hint_pos_x INTEGER,
+    last_hint_pos_y INTEGER,
+    step INTEGER,
+    total_steps INTEGER,
+    remaining_tries INTEGER,
+    status TEXT CHECK(status IN ('current', 'cancelled', 'finished')) DEFAULT 'current',
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS hunt_status_timestamp ON hunt (status, timestamp);
+CREATE INDEX IF NOT EXISTS hunt_timestamp ON hunt (timestamp);
+
+CREATE TABLE IF NOT EXISTS step (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hunt_id INTEGER NOT NULL REFERENCES hunt (id),
+    number INTEGER NOT NULL,
+    remaining_tries INTEGER,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (hunt_id, number)
+);
+CREATE INDEX IF NOT EXISTS step_timestamp ON step (timestamp);
+
+CREATE TABLE IF NOT EXISTS hint (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    step_id INTEGER NOT NULL REFERENCES step (id),
+    position INTEGER NOT NULL,
+    text TEXT,
+    direction INTEGER,
+    confidence REAL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (step_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hunt_id INTEGER REFERENCES hunt (id),
+    kind TEXT NOT NULL,
+    data TEXT,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS event_hunt ON event (hunt_id, id);
+
+CREATE TABLE IF NOT EXISTS solution (
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    direction INTEGER NOT NULL,
+    clue TEXT NOT NULL,
+    arrival_x INTEGER NOT NULL,
+    arrival_y INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    timestamp REAL,
+    PRIMARY KEY (x, y, direction, clue)
+);
+""" + analytics.SCHEMA
+
+# Journal events: widget steps and hints as read, then per hint the solved
+# target, the travel command and the arrival; and the widget reads retried,
+# the hints that matched no clue and the directions forced
+EVENT_KINDS = (
+    "step",
+    "hint",
+    "solved",
+    "travel",
+    "arrival",
+    "end",
+    "ocr_retry",
+    "match_failure",
+    "forced",
+)
+
+# Widget fields stored on the hunt row, in column order
+HUNT_FIELDS = (
+    "start_pos_zone",
+    "start_pos_x",
+    "start_pos_y",
+    "last_hint_pos_x",
+    "last_hint_pos_y",
+    "step",
+    "total_steps",
+    "remaining_tries",
+)
+# The widget never shows the last solved position, the OCR leaves it empty
+HUNT_UPDATES = tuple(
+    (
+        f"{field} = COALESCE(excluded.{field}, {field})"
+        if field.startswith("last_hint_pos")
+        else f"{field} = excluded.{field}"
+    )
+    for field in HUNT_FIELDS
+)
+# Widget fields journaled with each new step
+STEP_EVENT_FIELDS = (
+    "step",
+    "total_steps",
+    "start_pos_zone",
+    "start_pos_x",
+    "start_pos_y",
+)
+
+
+def as_int(value):
+    """
+    Return value as an int, or None when it is not a number.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_hints(raw):
+    """
+    Parse a JSON hint list of the former schema, [] when it is not one.
+    """
+    try:
+        hints = json.loads(raw) if isinstance(raw, (str, bytes, bytearray)) else []
+    except json.JSONDecodeError:
+        return []
+    return hints if isinstance(hints, list) else []
+
+
+def replay(events):
+    """
+    Fold the journal of a hunt, [(kind, data, timestamp), ...] in order,
+    into the in-flight state of the hunt.
+
+    Returns:
+        dict: step, is_first_hint, hint_position (last solved target),
+        last_travel_cmd, travel_target and travel_progress (target and
+        (step, hint count) of a travel not arrived yet, else None) and
+        last_solved, the (x, y, direction, clue) of the last solved hint
+    """
+    state = {
+        "step": None,
+        "is_first_hint": True,
+        "hint_position": None,
+        "last_travel_cmd": None,
+        "travel_target": None,
+        "travel_progress": None,
+        "last_solved": None,
+    }
+    for kind, data, _ in events:
+        if kind == "step":
+            state["step"] = data["step"]
+            # The first hint of a step after the first one starts from the
+            # last solved position
+            if data["step"] != 1:
+                state["is_first_hint"] = False
+        elif kind == "hint" and data["position"] > 0:
+            state["is_first_hint"] = False
+        elif kind == "solved":
+            state["is_first_hint"] = False
+            state["hint_position"] = tuple(data["target"])
+            state["last_solved"] = (
+                data["x"],
+                data["y"],
+                data["direction"],
+                data["clue"],
+            )
+        elif kind == "travel":
+            state["last_travel_cmd"] = data["command"]
+            state["travel_target"] = tuple(data["target"])
+            state["travel_progress"] = (data["step"], data["hints"])
+        elif kind == "arrival":
+            state["travel_target"] = None
+            state["travel_progress"] = None
+    return state
+
+
+class ProgressionStore:
+    """
+    Read and write the hunt progression.
+
+    Writes (save, set_status) are applied in order by the writer thread and
+    return a Future of their result; reads (load_current, current_hunt_id)
+    return their result, as of the last commit, or with wait=True once the
+    writes queued before them are committed.
+    """
+
+    def __init__(self, path=PROGRESSION_DB):
+        self.path = path
+        self.init_error = None
+        self.writes = 0
+        self.commits = 0
+        self._writes = queue.Queue()
+        self._ready = threading.Event()
+        # Sequence numbers of the last write queued and the last one applied
+        self._state = threading.Condition()
+        self._submitted = 0
+        self._applied = 0
+        self._closed = False
+        self._read_conn = None
+        self._read_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="progression-writer", daemon=True
+        )
+        self._thread.start()
+
+    # Writer thread
+
+    def _run(self):
+        conn = None
+        try:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+            conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+            conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+            self._initialize(conn)
+        except Exception as e:
+            self.init_error = e
+            log.error("Cannot open %s: %s", self.path, e)
+        self._ready.set()
+
+        while True:
+            batch = [self._writes.get()]
+            while batch[-1] is not None and len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            writes = [write for write in batch if write is not None]
+            if writes:
+                self._apply(conn, writes)
+            if batch[-1] is None:
+                break
+        if conn is not None:
+            conn.close()
+
+    def _apply(self, conn, writes):
+        """
+        Run the writes in one transaction, each in its own savepoint so a
+        failing write does not undo the others.
+        """
+        results = []
+        if self.init_error is not None:
+            results = [(future, None, self.init_error) for *_, future in writes]
+        else:
+            try:
+                conn.execute("BEGIN")
+                for _, function, args, future in writes:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        result = function(conn, *args)
+                        conn.execute("RELEASE write")
+                        results.append((future, result, None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        conn.execute("RELEASE write")
+                        log.error("Progression %s failed: %s", function.__name__, e)
+                        results.append((future, None, e))
+                conn.execute("COMMIT")
+                self.commits += 1
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                log.error("Progression commit failed: %s", e)
+                results = [(future, None, e) for *_, future in writes]
+
+        self.writes += len(writes)
+        with self._state:
+            self._applied = writes[-1][0]
+            self._state.notify_all()
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _initialize(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(hunt)")}
+        if version < SCHEMA_VERSION and "hints" in columns:
+            self._migrate(conn)
+        else:
+            conn.executescript(SCHEMA)
+            if 0 < version < ANALYTICS_VERSION:
+                # Aggregates of the hunts journaled before the analytics
+                conn.execute("BEGIN")
+                analytics.rebuild(conn)
+                conn.execute("COMMIT")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate(self, conn):
+        """
+        Move the hunts of the former schema into the hunt, step and hint
+        tables, in one transaction.
+        """
+        start = time.perf_counter()
+        try:
+            conn.execute("BEGIN")
+            conn.execute("ALTER TABLE hunt RENAME TO hunt_v1")
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+
+            rows = conn.execute(
+                """
+                SELECT id, start_pos_zone, start_pos_x, start_pos_y,
+                    last_hint_pos_x, last_hint_pos_y, step, total_steps,
+                    hints, remaining_tries, status, timestamp
+                FROM hunt_v1
+                ORDER BY id
+                """
+            ).fetchall()
+            for row in rows:
+                hunt_id, *header, hints, remaining_tries, status, timestamp = row
+                # Some rows were saved with the hints and the tries swapped
+                if not parse_hints(hints) and parse_hints(remaining_tries):
+                    hints, remaining_tries = remaining_tries, None
+                remaining_tries = as_int(remaining_tries)
+                conn.execute(
+                    """
+                    INSERT INTO hunt (
+                        id, start_pos_zone, start_pos_x, start_pos_y,
+                        last_hint_pos_x, last_hint_pos_y, step, total_steps,
+                        remaining_tries, status, timestamp
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (hunt_id, *header, remaining_tries, status, timestamp),
+                )
+                step = header[HUNT_FIELDS.index("step")]
+                if step is None:
+                    continue
+                step_id = self._insert_step(
+                    conn, hunt_id, step, remaining_tries, timestamp
+                )
+                self._append_hints(conn, step_id, 0, parse_hints(hints), timestamp)
+
+            conn.execute("DROP TABLE hunt_v1")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        log.info(
+            "Migrated %d hunts of %s in %.1f ms",
+            len(rows),
+            self.path,
+            (time.perf_counter() - start) * 1000,
+        )
+
+    def _insert_step(self, conn, hunt_id, number, remaining_tries, timestamp=None):
+        """
+        Insert or update the step row, and return its id.
+        """
+        conn.execute(
+            """
+            INSERT INTO step (hunt_id, number, remaining_tries, timestamp)
+            VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ON CONFLICT (hunt_id, number) DO UPDATE SET
+                remaining_tries = excluded.remaining_tries
+            """,
+            (hunt_id, number, remaining_tries, timestamp),
+        )
+        return conn.execute(
+            "SELECT id FROM step WHERE hunt_id = ? AND number = ?", (hunt_id, number)
+        ).fetchone()[0]
+
+    def _append_hints(self, conn, step_id, stored, hints, timestamp=None):
+        """
+        Insert the hints after the `stored` first ones of a step.
+        """
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO hint (
+                step_id, position, text, direction, confidence, timestamp
+            ) VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """,
+            [
+                (
+                    step_id,
+                    position,
+                    hint.get("hintText"),
+                    as_int(hint.get("hintDirection")),
+                    hint.get("hintDirectionConfidence"),
+                    timestamp,
+                )
+                for position, hint in enumerate(hints)
+                if position >= stored and isinstance(hint, dict)
+            ],
+        )
+
+    def _select_current_hunt_id(self, conn):
+        row = conn.execute(
+            """
+            SELECT id FROM hunt
+            WHERE status = 'current'
+            ORDER BY timestamp DESC
+            LIMIT 1
+            """
+        ).fetchone()
+        return row[0] if row else None
+
+    def _append_event(self, conn, hunt_id, kind, data, timestamp):
+        analytics.update(conn, hunt_id, kind, data, timestamp)
+        conn.execute(
+            "INSERT INTO event (hunt_id, kind, data, timestamp) VALUES (?, ?, ?, ?)",
+            (hunt_id, kind, json.dumps(data, ensure_ascii=False), timestamp),
+        )
+
+    def _record(self, conn, hunt_id, kind, data, timestamp):
+        # Kept without hunt when none is in progress
+        hunt_id = hunt_id or self._select_current_hunt_id(conn)
+        self._append_event(conn, hunt_id, kind, data, timestamp)
+
+    def _save(self, conn, data, timestamp):
+        values = tuple(data.get(field) for field in HUNT_FIELDS)
+        hunt_id = data.get("id") or self._select_current_hunt_id(conn)
+        if hunt_id is None:
+            cursor = conn.execute(
+                f"""
+                INSERT INTO hunt ({", ".join(HUNT_FIELDS)}, status)
+                VALUES ({", ".join("?" * len(HUNT_FIELDS))}, 'current')
+                """,
+                values,
+            )
+            hunt_id = cursor.lastrowid
+        else:
+            conn.execute(
+                f"""
+                INSERT INTO hunt (id, {", ".join(HUNT_FIELDS)})
+                VALUES (?, {", ".join("?" * len(HUNT_FIELDS))})
+                ON CONFLICT (id) DO UPDATE SET
+                    {", ".join(HUNT_UPDATES)}
+                """,
+                (hunt_id, *values),
+            )
+
+        step = data.get("step")
+        if step is not None:
+            new_step = (
+                conn.execute(
+                    "SELECT 1 FROM step WHERE hunt_id = ? AND number = ?",
+                    (hunt_id, step),
+                ).fetchone()
+                is None
+            )
+            step_id = self._insert_step(
+                conn, hunt_id, step, data.get("remaining_tries")
+            )
+            stored = conn.execute(
+                "SELECT COUNT(*) FROM hint WHERE step_id = ?", (step_id,)
+            ).fetchone()[0]
+            hints = data.get("hints") or []
+            self._append_hints(conn, step_id, stored, hints)
+
+            if new_step:
+                self._append_event(
+                    conn,
+                    hunt_id,
+                    "step",
+                    {field: data.get(field) for field in STEP_EVENT_FIELDS},
+                    timestamp,
+                )
+            for position, hint in enumerate(hints[stored:], stored):
+                if isinstance(hint, dict):
+                    self._append_event(
+                        conn,
+                        hunt_id,
+                        "hint",
+                        {
+                            "step": step,
+                            "position": position,
+                            "text": hint.get("hintText"),
+                            "direction": as_int(hint.get("hintDirection")),
+                        },
+                        timestamp,
+                    )
+        return hunt_id
+
+    def _set_status(self, conn, hunt_id, status):
+        conn.execute("UPDATE hunt SET status = ? WHERE id = ?", (status, hunt_id))
+
+    def _put_solution(self, conn, key, arrival, timestamp):
+        conn.execute(
+            """
+            INSERT INTO solution (
+                x, y, direction, clue, arrival_x, arrival_y, timestamp
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (x, y, direction, clue) DO UPDATE SET
+                arrival_x = excluded.arrival_x,
+                arrival_y = excluded.arrival_y,
+                hits = 0,
+                timestamp = excluded.timestamp
+            """,
+            (*key, *arrival, timestamp),
+        )
+
+    def _hit_solution(self, conn, key):
+        conn.execute(
+            """
+            UPDATE solution SET hits = hits + 1
+            WHERE x = ? AND y = ? AND direction = ? AND clue = ?
+            """,
+            key,
+        )
+
+    # Writes
+
+    def _submit(self, function, *args):
+        future = Future()
+        with self._state:
+            if self._closed:
+                raise RuntimeError("Progression store is closed")
+            self._submitted += 1
+            self._writes.put((self._submitted, function, args, future))
+        return future
+
+    def save(self, data):
+        """
+        Store the widget state read by the OCR (see read_hunt_from_screenshot)
+        in the hunt in progress, or in a new hunt.
+
+        Returns:
+            Future: The hunt id
+        """
+        # The caller may keep updating its dict while the write is queued
+        data = dict(data)
+        data["hints"] = [
+            dict(hint) if isinstance(hint, dict) else hint
+            for hint in data.get("hints") or []
+        ]
+        return self._submit(self._save, data, time.time())
+
+    def record(self, kind, hunt_id=None, **data):
+        """
+        Append an event to the journal of a hunt (default: the hunt in
+        progress when the write is applied, if any).
+
+        Returns:
+            Future: None once written
+        """
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"Unknown journal event: {kind}")
+        return self._submit(self._record, hunt_id, kind, data, time.time())
+
+    def set_status(self, hunt_id, status):
+        """
+        Set a hunt as 'current', 'cancelled' or 'finished'.
+
+        Returns:
+            Future: None once written
+        """
+        return self._submit(self._set_status, hunt_id, status)
+
+    def put_solution(self, key, arrival):
+        """
+        Store the confirmed arrival of a (x, y, direction, clue) hint.
+        """
+        return self._submit(self._put_solution, tuple(key), tuple(arrival), time.time())
+
+    def hit_solution(self, key):
+        """
+        Count a use of a learned solution.
+        """
+        return self._submit(self._hit_solution, tuple(key))
+
+    def rebuild_analytics(self):
+        """
+        Recompute the analytics aggregates from the whole journal.
+
+        Returns:
+            Future: The number of events
+        """
+        return self._submit(analytics.rebuild)
+
+    def flush(self, timeout=None):
+        """
+        Wait until the queued writes are committed.
+
+        Returns:
+            bool: False on timeout
+        """
+        with self._state:
+            target = self._submitted
+            return self._state.wait_for(lambda: self._applied >= target, timeout)
+
+    def close(self, timeout=5):
+        """
+        Commit the queued writes and close the connections.
+        """
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            self._writes.put(None)
+        self._thread.join(timeout)
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    # Reads
+
+    def _read(self, function, *args, wait=False):
+        """
+        Run function(read-only connection, *args), once the writes queued
+        so far are committed with `wait`.
+        """
+        self._ready.wait()
+        if self.init_error is not None:
+            raise self.init_error
+        if wait:
+            self.flush()
+        with self._read_lock:
+            if self._read_conn is None:
+                uri = f"{Path(self.path).absolute().as_uri()}?mode=ro"
+                self._read_conn = sqlite3.connect(
+                    uri, uri=True, check_same_thread=False
+                )
+            return function(self._read_conn, *args)
+
+    def query(self, function, *args, wait=False):
+        """
+        Return function(read-only connection, *args), for the reports of
+        analytics.py.
+        """
+        return self._read(function, *args, wait=wait)
+
+    def current_hunt_id(self, wait=False):
+        """
+        Return the id of the latest hunt in progress, or None.
+        """
+        return self._read(self._select_current_hunt_id, wait=wait)
+
+    def load_current(self, wait=False):
+        """
+        Return the latest hunt in progress with the hints of its current
+        step, in the format of read_hunt_from_screenshot, or None.
+        """
+        return self._read(self._load_current, wait=wait)
+
+    def journal(self, hunt_id, wait=False):
+        """
+        Return the journal of a hunt, [(kind, data, timestamp), ...] in order.
+        """
+        return self._read(self._load_journal, hunt_id, wait=wait)
+
+    def _load_journal(self, conn, hunt_id):
+        return [
+            (kind, json.loads(data), timestamp)
+            for kind, data, timestamp in conn.execute(
+                "SELECT kind, data, timestamp FROM event WHERE hunt_id = ? ORDER BY id",
+                (hunt_id,),
+            )
+        ]
+
+    def solutions(self, wait=False):
+        """
+        Return the learned solutions, {(x, y, direction, clue): (x, y)}.
+        """
+        return self._read(self._load_solutions, wait=wait)
+
+    def _load_solutions(self, conn):
+        return {
+            (x, y, direction, clue): (arrival_x, arrival_y)
+            for x, y, direction, clue, arrival_x, arrival_y in conn.execute(
+                "SELECT x, y, direction, clue, arrival_x, arrival_y FROM solution"
+            )
+        }
+
+    def resume(self, wait=False):
+        """
+        Rebuild the in-flight state of the hunt in progress from its
+        journal (see replay), with its "hunt_id", or None without a hunt.
+        """
+        return self._read(self._resume, wait=wait)
+
+    def _resume(self, conn):
+        hunt_id = self._select_current_hunt_id(conn)
+        if hunt_id is None:
+            return None
+        return {"hunt_id": hunt_id, **replay(self._load_journal(conn, hunt_id))}
+
+    def _load_current(self, conn):
+        row = conn.execute(
+            f"""
+            SELECT id, {", ".join(HUNT_FIELDS)}, timestamp
+            FROM hunt
+            WHERE status = 'current'
+            ORDER BY timestamp DESC
+            LIMIT 1
+            """
+        ).fetchone()
+        if row is None:
+            return None
+        progression = {"id": row[0], **dict(zip(HUNT_FIELDS, row[1:-1]))}
+        progression["timestamp"] = row[-1]
+
+        progression["hints"] = []
+        for text, direction, confidence in conn.execute(
+            """
+            SELECT hint.text, hint.direction, hint.confidence
+            FROM step JOIN hint ON hint.step_id = step.id
+            WHERE step.hunt_id = ? AND step.number = ?
+            ORDER BY hint.position
+            """,
+            (row[0], progression["step"]),
+        ):
+            hint = {"hintText": text}
+            if direction is not None:
+                hint["hintDirection"] = direction
+            if confidence is not None:
+                hint["hintDirectionConfidence"] = confidence
+            progression["hints"].append(hint)
+        return progression
+
+
+if __name__ == "__main__":
+    # Open (and migrate) the database, then show the hunt in progress
+    from log_config import configure_logging
+
+    configure_logging()
+    store = ProgressionStore()
+    print(json.dumps(store.load_current(), indent=2, ensure_ascii=False))
+    store.close()
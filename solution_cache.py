@@ -0,0 +1,101 @@
+"""
+Hint solutions learned from past hunts.
+
+A hint solved from (x, y) in a direction is confirmed when the player
+reaches the map and the next hint shows up: the position read then is kept
+for (x, y, direction, clue) in the solution table of progression.db, the
+clue being the normalized OCR text of the hint. Hunts cover the same zones
+again and again, so the cache is looked up before any candidate matching or
+solving, and it also keeps the maps the clue database gets wrong.
+
+An entry whose position disagrees with a later confirmed arrival is
+replaced by the new one.
+"""
+
+import time
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class SolutionCache:
+    """
+    In-memory copy of the solution table, loaded on first use; changes are
+    written through the progression store.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.entries = None
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+        self.expired = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            start = time.perf_counter()
+            self.entries = self.store.solutions()
+            log.info(
+                "Loaded %d learned solutions in %.1f ms",
+                len(self.entries),
+                (time.perf_counter() - start) * 1000,
+            )
+        return self.entries
+
+    def get(self, x, y, direction, clue):
+        """
+        Return the learned (x, y) of a hint, or None.
+        """
+        key = (x, y, direction, clue)
+        with self._lock:
+            arrival = self._load().get(key)
+            if arrival is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.store.hit_solution(key)
+        return arrival
+
+    def confirm(self, x, y, direction, clue, arrival):
+        """
+        Keep the position the player reached for a hint.
+
+        Returns:
+            str: "learned", "confirmed" or "expired" (an entry was replaced)
+        """
+        key = (x, y, direction, clue)
+        arrival = tuple(arrival)
+        with self._lock:
+            entries = self._load()
+            cached = entries.get(key)
+            if cached == arrival:
+                return "confirmed"
+            entries[key] = arrival
+            if cached is None:
+                self.learned += 1
+                outcome = "learned"
+            else:
+                self.expired += 1
+                outcome = "expired"
+                log.info(
+                    "Learned solution %s expired: %s, arrived at %s",
+                    key,
+                    cached,
+                    arrival,
+                )
+        self.store.put_solution(key, arrival)
+        return outcome
+
+    def stats(self):
+        """
+        Return "hits 12, misses 3 (80% hit rate), ..." for this session.
+        """
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return (
+            f"hits {self.hits}, misses {self.misses} ({rate:.0%} hit rate), "
+            f"learned {self.learned}, expired {self.expired}"
+        )
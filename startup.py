@@ -0,0 +1,121 @@
+"""
+Background warm-up of the slow resources of the app.
+
+The window is shown first and each resource (clue database, OCR engines,
+audio mixer) is loaded in its own background thread, in parallel. The UI
+polls is_ready() and only enables the actions whose resources are loaded;
+code that needs a resource outside of the UI calls wait().
+
+    warmup = Warmup()
+    warmup.start("audio", init_audio)
+    ...
+    if warmup.wait("audio", timeout=5):
+        play()
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# One thread per resource
+WARMUP_WORKERS = 4
+
+
+class Warmup:
+    """
+    Load named resources in parallel and keep their load time and error.
+    """
+
+    def __init__(self, max_workers=WARMUP_WORKERS):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self._futures = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="warmup"
+        )
+
+    def start(self, name, loader):
+        """
+        Run loader() in the background; its result is returned by result(name).
+        """
+        self._futures[name] = self._executor.submit(self._load, name, loader)
+
+    def _load(self, name, loader):
+        start = time.perf_counter()
+        try:
+            return loader()
+        finally:
+            self.timings[name] = time.perf_counter() - start
+            log.debug("Warm-up of %s took %.1f ms", name, self.timings[name] * 1000)
+
+    def is_ready(self, *names):
+        """
+        Whether every named resource is loaded without error.
+        """
+        for name in names:
+            future = self._futures.get(name)
+            if future is None or not future.done() or future.exception():
+                return False
+        return True
+
+    def error(self, name):
+        """
+        Return the exception raised while loading a resource, if any.
+        """
+        future = self._futures.get(name)
+        if future is None or not future.done():
+            return None
+        return future.exception()
+
+    def pending(self):
+        """
+        Names of the resources still loading.
+        """
+        return [name for name, future in self._futures.items() if not future.done()]
+
+    def wait(self, name, timeout=None):
+        """
+        Wait for a resource to load.
+
+        Returns:
+            bool: Whether it is ready (False on error or timeout)
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return False
+        try:
+            future.result(timeout)
+        except Exception:
+            # Load error, or still loading after the timeout
+            return False
+        return True
+
+    def result(self, name):
+        """
+        Return what the loader of a ready resource returned, else None.
+        """
+        return self._futures[name].result() if self.is_ready(name) else None
+
+    def elapsed(self):
+        """
+        Seconds since the warm-up was created.
+        """
+        return time.perf_counter() - self.started
+
+    def report(self):
+        """
+        Return "name 12.3 ms, ..." for the resources loaded so far.
+        """
+        return ", ".join(
+            f"{name} {'failed' if self.error(name) else f'{self.timings[name] * 1000:.1f} ms'}"
+            for name in self._futures
+            if name in self.timings
+        )
+
+    def shutdown(self):
+        """
+        Stop accepting work; loaders already running finish in the background.
+        """
+        self._executor.shutdown(wait=False)